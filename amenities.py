@@ -0,0 +1,201 @@
+import argparse
+import hashlib
+import json
+import numpy as np
+import pandas as pd
+
+# --- Configuration ---
+INPUT_FILE = "hotel_full_details.json"
+
+# Fixed amenity vocabulary of the bitmasks: the "check ..." entries of the facilitylist block,
+# lowercased. Bit i of a hotel's mask is set when entry i is listed. Together with the group bits
+# below at most 63 bits, so a mask always fits a signed 64-bit integer (numpy int64, SQLite INTEGER,
+# Parquet int64, JSON). These are the entries listed by most hotels in the current crawl (down to 54
+# of 197 hotels), most frequent first. Rarer entries are outside the masks but still counted and
+# queryable through amenity_entries().
+AMENITY_VOCABULARY = (
+    'wifi gratuit', 'tv', 'prosoape', 'cabină de duș', 'parcare', 'lenjerie de pat', 'uscător de păr',
+    'hărtie igienică', 'canale tv prin cablu', 'bucătarie la dispoziția turistului', 'umerașe pentru haine',
+    'coș de gunoi', 'săpun/gel de duș', 'frigider la comun', 'priză lângă pat', 'dulap sau garderobă',
+    'grădină/curte', 'frigider', 'veselă și tacâmuri', 'living', 'sistem de încălzire', 'fier de călcat', 'masă',
+    'balcon', 'cuptor cu microunde', 'terasă la soare', 'pardoseală cu parchet melaminat',
+    'fumatul este permis în zone speciale la exterior', 'filtru de cafea', 'vedere spre munte',
+    'produse de curățenie', 'mașină de spălat rufe', 'vedere spre curtea interioară', 'expresor cafea',
+    'cană electrică', 'camere pentru nefumători', 'fierbător apă', 'pardoseală cu gresie', 'barbeque/grătar',
+    'masă de călcat', 'sală de mese', 'vedere spre grădină/curte', 'plită electrică', 'plasă țânțari', 'aragaz',
+    'fumatul este interzis în toate spaţiile comune şi private din interior', 'masă/măsuță', 'cosmetice gratuite',
+    'foișor', 'camere de supraveghere exterior',
+    'țigările electronice și vape-urile sunt permise în zone speciale la exterior', 'cuptor', 'vedere spre stradă',
+    'toaster', 'cadă', 'alarmă de fum', 'parcare în curte', 'extinctoare', 'camere de familie', 'pernă cu puf',
+    'parcare pe stradă gratuit',
+)
+# Entry groups (Graph 8 and the 'wifi' / 'parking' query shorthands): every entry starting with the
+# group's prefix belongs to it, as with the "check WiFi gratuit" / "check parcare" substring search
+# they replace, so entries this crawl never listed still count. Each group has its own mask bit,
+# above the vocabulary bits.
+AMENITY_GROUPS = {'wifi': 'wifi gratuit', 'parking': 'parcare'}
+# Stored masks are only valid for the vocabulary they were computed with: hotel_store.py records this
+# id next to its masks (and in the Parquet metadata), and masks stored under another id are recomputed
+AMENITY_VOCABULARY_ID = hashlib.sha1("\n".join(AMENITY_VOCABULARY + tuple(
+    f"{group}={prefix}*" for group, prefix in AMENITY_GROUPS.items())).encode('utf-8')).hexdigest()[:12]
+VOCABULARY_METADATA_KEY = b"amenity_vocabulary"
+AMENITY_BITS = {name: 1 << bit for bit, name in enumerate(AMENITY_VOCABULARY)}
+GROUP_BITS = {group: 1 << bit for bit, group in enumerate(AMENITY_GROUPS, len(AMENITY_VOCABULARY))}
+ENTRY_PREFIX = "check "
+
+
+# --- Tokenizing ---
+
+def parse_facilities(text):
+    """Returns the normalized "check ..." entries of a facilities blob (section headings are dropped)."""
+    if not isinstance(text, str):
+        return []
+    entries = []
+    for line in text.split("\n"):
+        line = " ".join(line.split()).lower()
+        if line.startswith(ENTRY_PREFIX):
+            entries.append(line[len(ENTRY_PREFIX):])
+    return entries
+
+
+def amenity_mask(text):
+    """Bitmask of the vocabulary amenities and entry groups listed in a facilities blob.
+
+    Entries outside the vocabulary only set the bits of the groups they belong to.
+    """
+    mask = 0
+    for entry in parse_facilities(text):
+        mask |= AMENITY_BITS.get(entry, 0)
+        for group, prefix in AMENITY_GROUPS.items():
+            if entry.startswith(prefix):
+                mask |= GROUP_BITS[group]
+    return mask
+
+
+def amenity_masks(facilities):
+    """int64 masks for a Series of facilities blobs (each distinct blob is tokenized once)."""
+    codes, uniques = pd.factorize(facilities)
+    masks = np.array([amenity_mask(text) for text in uniques] + [0], dtype=np.int64)
+    return pd.Series(masks[codes], index=facilities.index, name='amenities')
+
+
+def mask_of(*names):
+    """Mask with the bits of the given amenity names. Raises KeyError for names outside the vocabulary."""
+    mask = 0
+    for name in names:
+        mask |= AMENITY_BITS[name]
+    return mask
+
+
+def masks_are_current(metadata):
+    """True when Parquet schema metadata says its 'amenities' masks use this vocabulary."""
+    return (metadata or {}).get(VOCABULARY_METADATA_KEY) == AMENITY_VOCABULARY_ID.encode()
+
+
+def amenity_names(mask):
+    return [name for name, bit in AMENITY_BITS.items() if mask & bit]
+
+
+# --- Bitwise Queries ---
+
+def has_all(masks, *names):
+    """Boolean array: hotels listing every one of `names`."""
+    wanted = mask_of(*names)
+    return (np.asarray(masks) & wanted) == wanted
+
+
+def has_any(masks, *names):
+    """Boolean array: hotels listing at least one of `names`."""
+    return (np.asarray(masks) & mask_of(*names)) != 0
+
+
+def has_group(masks, group):
+    """Boolean array: hotels listing any entry of an AMENITY_GROUPS group."""
+    return (np.asarray(masks) & GROUP_BITS[group]) != 0
+
+
+def amenity_matrix(masks):
+    """Hotels x vocabulary boolean matrix of the masks."""
+    bits = np.arange(len(AMENITY_VOCABULARY), dtype=np.int64)
+    return ((np.asarray(masks, dtype=np.int64)[:, None] >> bits) & 1).astype(bool)
+
+
+def cooccurrence(masks):
+    """Vocabulary x vocabulary DataFrame: how many hotels list both amenities (diagonal: each amenity's count)."""
+    matrix = amenity_matrix(masks).astype(np.int64)
+    return pd.DataFrame(matrix.T @ matrix, index=list(AMENITY_VOCABULARY), columns=list(AMENITY_VOCABULARY))
+
+
+# --- Every Listed Entry (sparse) ---
+
+def amenity_entries(facilities):
+    """All entries listed in a Series of facilities blobs, vocabulary or not, as a sparse incidence list.
+
+    Returns (names, hotel ids, entry ids): hotel hotel_ids[k] lists names[entry_ids[k]]. Names are
+    ordered by how many hotels list them, most listed first; each distinct blob is tokenized once.
+    """
+    codes, uniques = pd.factorize(pd.Series(facilities, dtype=object))
+    blob_entries = [list(dict.fromkeys(parse_facilities(text))) for text in uniques]
+    hotels = np.flatnonzero(codes >= 0)
+    listed = [blob_entries[code] for code in codes[hotels]]
+    hotel_ids = np.repeat(hotels, [len(entries) for entries in listed]).astype(np.int32)
+
+    entry_codes, names = pd.factorize(pd.Series([name for entries in listed for name in entries], dtype=object))
+    counts = np.bincount(entry_codes, minlength=len(names))
+    order = np.argsort(-counts, kind='stable')
+    rank = np.empty(len(order), dtype=np.int32)
+    rank[order] = np.arange(len(order))
+    return tuple(names[order]), hotel_ids, rank[entry_codes]
+
+
+def entry_matrix(hotel_ids, entry_ids, hotel_count, entry_count):
+    """Dense hotels x entries boolean matrix of an amenity_entries() incidence list."""
+    matrix = np.zeros((hotel_count, entry_count), dtype=bool)
+    matrix[hotel_ids, entry_ids] = True
+    return matrix
+
+
+# --- Main Execution ---
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Amenity frequencies, filters and co-occurrences from the facilities text.")
+    parser.add_argument('--input', default=INPUT_FILE)
+    parser.add_argument('--require', action='append', default=[], metavar='AMENITY',
+                        help="list hotels having this amenity (repeatable)")
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        records = json.load(f)
+    names, hotel_ids, entry_ids = amenity_entries([record.get('facilities') for record in records])
+    matrix = entry_matrix(hotel_ids, entry_ids, len(records), len(names))
+    counts = matrix.sum(axis=0)
+    outside = [i for i, name in enumerate(names) if name not in AMENITY_BITS]
+    print(f"{len(records)} hotels, {len(names)} distinct amenities listed, "
+          f"{len(names) - len(outside)} of them in the {len(AMENITY_VOCABULARY)}-entry bitmask vocabulary.")
+    if outside:
+        print(f"⚠️ {len(outside)} amenities ({int(counts[outside].sum())} listings) are outside the bitmasks; most listed: "
+              + ", ".join(f"{names[i]} ({counts[i]})" for i in outside[:5]))
+
+    if args.require:
+        columns = {name: i for i, name in enumerate(names)}
+        wanted = [" ".join(name.split()).lower() for name in args.require]
+        unknown = [name for name, key in zip(args.require, wanted) if key not in columns]
+        if unknown:
+            print(f"❌ Unknown amenity: {unknown[0]!r} (no hotel lists it; run without --require for the list)")
+            raise SystemExit(1)
+        selected = matrix[:, [columns[key] for key in wanted]].all(axis=1)
+        print(f"\n{int(selected.sum())} hotels with {' + '.join(args.require)}:")
+        for record in np.array(records, dtype=object)[selected]:
+            print(f"  - {record['property_name']} ({record['url']})")
+    else:
+        print(f"\n--- Top {args.top} amenities ---")
+        for i in range(min(args.top, len(names))):
+            print(f"{names[i]:<40}{counts[i]:>6}{'' if names[i] in AMENITY_BITS else '   (not in the bitmasks)'}")
+
+        together = matrix.astype(np.int64)
+        pairs = pd.DataFrame(together.T @ together, index=list(names), columns=list(names))
+        upper = pairs.where(np.triu(np.ones(pairs.shape, dtype=bool), k=1)).stack()
+        print(f"\n--- Top {args.top} co-occurring pairs ---")
+        for (first, second), count in upper.sort_values(ascending=False, kind='stable').head(args.top).items():
+            print(f"{first + ' + ' + second:<60}{int(count):>6}")
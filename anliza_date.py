@@ -1,5 +1,13 @@
+from checkpoint import iter_json_records
+from amenities import amenity_masks, has_group, masks_are_current
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
+import argparse
+import concurrent.futures
+import hashlib
+import heapq
+import inspect
 import json
 import os
 import re  # Import regex for parsing
@@ -9,12 +17,25 @@ INPUT_FILE = "hotel_full_details.json"
 # Set higher quality for saved images
 FIGURE_SIZE = (15, 8)
 FIGURE_DPI = 150
+CHART_WORKERS = min(8, os.cpu_count() or 1)  # Processes rendering charts in parallel (1 = render in-process)
+CHART_CACHE_FILE = "chart_cache.json"  # Input hash of every chart's last render; unchanged charts are skipped
+STREAM_CHUNK_ROWS = 10000  # Listings parsed per chunk in streaming mode (bounds its memory)
+# The only fields streaming mode keeps (images is reduced to its length while reading)
+STREAM_FIELDS = ('property_name', 'address', 'phone_number', 'capacity', 'politici_copii', 'politici_plata',
+                 'facilities')
+
+# Compiled patterns shared by the row-wise and vectorized parsers
+ADULTS_PATTERN = re.compile(r'(\d+)\s+adulți', re.IGNORECASE)
+CHILDREN_PATTERN = re.compile(r'(\d+)\s+copii', re.IGNORECASE)
+FIRST_NUMBER_PATTERN = re.compile(r'(\d+)')
 
 
 # --- Data Parsing Functions ---
 
 def parse_locality(address_str):
-    """A simple function to extract the locality from the address string."""
+    """A simple function to extract the locality from the address string (or a Series of them)."""
+    if isinstance(address_str, pd.Series):
+        return _parse_locality_series(address_str)
     if address_str == "N/A" or not isinstance(address_str, str):
         return "Unknown"
 
@@ -31,24 +52,26 @@ def parse_locality(address_str):
 
 
 def parse_capacity(text):
-    """Parses capacity text to extract total number of adults and children."""
+    """Parses capacity text to extract total number of adults and children (text may be a Series)."""
+    if isinstance(text, pd.Series):
+        return _parse_capacity_series(text)
     if not isinstance(text, str):
         return 0
 
     adults = 0
     children = 0
 
-    adults_match = re.search(r'(\d+)\s+adulți', text, re.IGNORECASE)
+    adults_match = ADULTS_PATTERN.search(text)
     if adults_match:
         adults = int(adults_match.group(1))
 
-    children_match = re.search(r'(\d+)\s+copii', text, re.IGNORECASE)
+    children_match = CHILDREN_PATTERN.search(text)
     if children_match:
         children = int(children_match.group(1))
 
     # If no specific 'adulti' text, take the first number as capacity
     if adults == 0 and children == 0:
-        first_num_match = re.search(r'(\d+)', text)
+        first_num_match = FIRST_NUMBER_PATTERN.search(text)
         if first_num_match:
             return int(first_num_match.group(1))
 
@@ -56,7 +79,9 @@ def parse_capacity(text):
 
 
 def parse_payment_method(text):
-    """Parses payment policy text to find card or cash."""
+    """Parses payment policy text to find card or cash (text may be a Series)."""
+    if isinstance(text, pd.Series):
+        return _parse_payment_method_series(text)
     if not isinstance(text, str):
         return "N/A"
 
@@ -75,7 +100,9 @@ def parse_payment_method(text):
 
 
 def parse_children_policy(text):
-    """Parses child policy to see if children are accepted."""
+    """Parses child policy to see if children are accepted (text may be a Series)."""
+    if isinstance(text, pd.Series):
+        return _parse_children_policy_series(text)
     if not isinstance(text, str):
         return "Not specified"
 
@@ -88,9 +115,84 @@ def parse_children_policy(text):
         return "Not specified"
 
 
-def plot_pie_chart(ax, data_series, labels_map, colors, title):
-    """Helper function to correctly plot a pie chart."""
-    counts = data_series.value_counts()
+# --- Vectorized Parsers ---
+# Column-at-a-time versions of the parsers above, used when they are given a whole Series.
+# Each column is factorized first, so the string operations run once per distinct value
+# (policy and capacity texts repeat across thousands of hotels), and the results are
+# expanded back with the codes. Each one returns exactly what Series.apply(parser) would.
+
+def _by_distinct_value(series, parse_values, missing):
+    """Runs `parse_values` on the distinct values of `series` and maps the results back to every row.
+
+    Missing values (None/NaN) get `missing`, the result the row-wise parser returns for them.
+    """
+    codes, uniques = pd.factorize(series)
+    values = pd.Series(uniques)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype(values.dtype.categories.dtype)
+    # Code -1 (missing) picks the appended last element
+    parsed = np.append(np.asarray(parse_values(values)), [missing])
+    return pd.Series(parsed[codes], index=series.index)
+
+
+def _strings(values):
+    """The values with anything that is not a str turned into NaN (only object columns can hold such values)."""
+    if values.dtype != object:
+        return values
+    return values.where(values.map(type) == str)
+
+
+def _locality_values(addresses):
+    strings = _strings(addresses)
+    # Same as split(',')[-1].strip().split(' ')[-1]: drop everything up to the last comma, then the last space
+    last_part = strings.str.replace(r'(?s)^.*,', '', regex=True).str.strip()
+    locality = last_part.str.replace(r'(?s)^.* ', '', regex=True)
+    return locality.where(strings.notna() & (strings != "N/A"), "Unknown").to_numpy(dtype=object)
+
+
+def _capacity_values(texts):
+    strings = _strings(texts)
+    adults = pd.to_numeric(strings.str.extract(ADULTS_PATTERN, expand=False)).fillna(0)
+    children = pd.to_numeric(strings.str.extract(CHILDREN_PATTERN, expand=False)).fillna(0)
+    first_number = pd.to_numeric(strings.str.extract(FIRST_NUMBER_PATTERN, expand=False)).fillna(0)
+    return np.where((adults == 0) & (children == 0), first_number, adults + children).astype('int64')
+
+
+def _payment_method_values(texts):
+    lower = _strings(texts).str.lower()
+    has_card = lower.str.contains('card', regex=False).fillna(False).astype(bool)
+    has_cash = lower.str.contains('numerar', regex=False).fillna(False).astype(bool)
+    return np.select([has_card & has_cash, has_card, has_cash], ["Card or Cash", "Card Only", "Cash Only"],
+                     default="N/A").astype(object)
+
+
+def _children_policy_values(texts):
+    lower = _strings(texts).str.lower()
+    refuses = lower.str.contains('nu acceptăm copii', regex=False).fillna(False).astype(bool)
+    accepts = lower.str.contains('acceptăm copii', regex=False).fillna(False).astype(bool)
+    return np.select([refuses, accepts], ["Children Not Accepted", "Children Accepted"],
+                     default="Not specified").astype(object)
+
+
+def _parse_locality_series(addresses):
+    return _by_distinct_value(addresses, _locality_values, "Unknown")
+
+
+def _parse_capacity_series(texts):
+    return _by_distinct_value(texts, _capacity_values, 0)
+
+
+def _parse_payment_method_series(texts):
+    return _by_distinct_value(texts, _payment_method_values, "N/A")
+
+
+def _parse_children_policy_series(texts):
+    return _by_distinct_value(texts, _children_policy_values, "Not specified")
+
+
+def plot_pie_chart(ax, counts, labels_map, colors, title):
+    """Helper function to correctly plot a pie chart from value counts."""
+    counts = counts.copy()
 
     # Ensure all keys from the map are present, even if 0
     for key in labels_map.keys():
@@ -108,133 +210,89 @@ def plot_pie_chart(ax, data_series, labels_map, colors, title):
     ax.set_title(title, fontsize=16)
 
 
-# --- Main Analysis Function ---
-
-def main_analysis():
-    print(f"--- Starting Phase 3: Data Analysis from {INPUT_FILE} ---")
+# --- Chart Rendering ---
+# One function per graph: each takes its aggregated input (histograms as value counts) and the
+# output path, draws one figure, saves it and closes it. They run in worker processes with the Agg backend.
 
-    if not os.path.exists(INPUT_FILE):
-        print(f"❌ ERROR: File '{INPUT_FILE}' not found.")
-        print("Please run 'every_page_scraper.py' first to generate the data.")
-        return
-
-    # 1. Load Data into Pandas DataFrame
-    try:
-        df = pd.read_json(INPUT_FILE)
-        print(f"✅ Data loaded successfully. Found {len(df)} property listings.")
-    except Exception as e:
-        print(f"❌ ERROR reading JSON file: {e}")
-        return
-
-    # 2. Data Cleaning and Feature Engineering
-    print("Parsing and cleaning data...")
-    df['locality'] = df['address'].apply(parse_locality)
-    df['photo_count'] = df['images'].apply(len)
-    df['total_capacity'] = df['capacity'].apply(parse_capacity)
-    df['payment_method'] = df['politici_plata'].apply(parse_payment_method)
-    df['accepts_children'] = df['politici_copii'].apply(parse_children_policy)
-
-    # Simple boolean flags for amenities
-    df['has_wifi'] = df['facilities'].str.contains('check WiFi gratuit', case=False, na=False)
-    df['has_parking'] = df['facilities'].str.contains('check parcare', case=False, na=False)
-    df['has_phone'] = df['phone_number'] != "N/A"
-
-    # --- 3. Generate 8 Graphs ---
-
-    # Graph 1: Top 15 Localities by Listing Count
-    print("Generating Graph 1: Top 15 Localities...")
-    plt.figure(figsize=FIGURE_SIZE)
-    locality_counts = df['locality'].value_counts().nlargest(15)
+def render_localities(locality_counts, path):
+    fig = plt.figure(figsize=FIGURE_SIZE)
     locality_counts.plot(kind='bar', color='skyblue')
     plt.title('Graph 1: Top 15 Localities by Number of Listings (Brașov County)', fontsize=18)
     plt.xlabel('Locality', fontsize=12)
     plt.ylabel('Number of Listings', fontsize=12)
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
-    plt.savefig('graph_1_localities.png', dpi=FIGURE_DPI)
-    print("  -> 'graph_1_localities.png' saved.")
+    plt.savefig(path, dpi=FIGURE_DPI)
+    plt.close(fig)
+
 
-    # Graph 2: Payment Methods Distribution (Pie Chart)
-    print("Generating Graph 2: Payment Methods...")
-    plt.figure(figsize=FIGURE_SIZE)
-    payment_counts = df['payment_method'].value_counts()
+def render_payment_methods(payment_counts, path):
+    fig = plt.figure(figsize=FIGURE_SIZE)
     plt.pie(payment_counts, labels=payment_counts.index, autopct='%1.1f%%', startangle=90,
             colors=['#4CAF50', '#FFC107', '#2196F3', '#BDBDBD'])
     plt.title('Graph 2: Distribution of Payment Methods', fontsize=18)
     plt.tight_layout()
-    plt.savefig('graph_2_payment_methods.png', dpi=FIGURE_DPI)
-    print("  -> 'graph_2_payment_methods.png' saved.")
+    plt.savefig(path, dpi=FIGURE_DPI)
+    plt.close(fig)
 
-    # Graph 3: Child Policy Distribution (Pie Chart)
-    print("Generating Graph 3: Child Policy...")
-    plt.figure(figsize=FIGURE_SIZE)
-    children_policy_counts = df['accepts_children'].value_counts()
+
+def render_child_policy(children_policy_counts, path):
+    fig = plt.figure(figsize=FIGURE_SIZE)
     plt.pie(children_policy_counts, labels=children_policy_counts.index, autopct='%1.1f%%', startangle=90,
             colors=['#4CAF50', '#FF5252', '#BDBDBD'])
     plt.title('Graph 3: Child Acceptance Policy', fontsize=18)
     plt.tight_layout()
-    plt.savefig('graph_3_child_policy.png', dpi=FIGURE_DPI)
-    print("  -> 'graph_3_child_policy.png' saved.")
-
-    # Graph 4: Distribution of Total Capacity (Histogram)
-    print("Generating Graph 4: Property Capacity Distribution...")
-    plt.figure(figsize=FIGURE_SIZE)
-    # Filter for properties where capacity > 0 and < 100 (to remove outliers)
-    capacity_data = df['total_capacity'][(df['total_capacity'] > 0) & (df['total_capacity'] < 100)]
-    capacity_data.plot(kind='hist', bins=20, color='teal', edgecolor='black')
+    plt.savefig(path, dpi=FIGURE_DPI)
+    plt.close(fig)
+
+
+def render_capacity_distribution(capacity_counts, path):
+    fig = plt.figure(figsize=FIGURE_SIZE)
+    plt.hist(capacity_counts.index, bins=20, weights=capacity_counts.to_numpy(), color='teal', edgecolor='black')
     plt.title('Graph 4: Distribution of Property Capacity (Max 100 Persons)', fontsize=18)
     plt.xlabel('Total Capacity (Adults + Children)', fontsize=12)
     plt.ylabel('Number of Properties', fontsize=12)
     plt.tight_layout()
-    plt.savefig('graph_4_capacity_distribution.png', dpi=FIGURE_DPI)
-    print("  -> 'graph_4_capacity_distribution.png' saved.")
-
-    # Graph 5: Distribution of Photo Count (Histogram)
-    print("Generating Graph 5: Photo Count Distribution...")
-    plt.figure(figsize=FIGURE_SIZE)
-    photo_data = df['photo_count'][df['photo_count'] > 0]
-    photo_data.plot(kind='hist', bins=30, color='purple', edgecolor='black')
+    plt.savefig(path, dpi=FIGURE_DPI)
+    plt.close(fig)
+
+
+def render_photo_count_distribution(photo_counts, path):
+    fig = plt.figure(figsize=FIGURE_SIZE)
+    plt.hist(photo_counts.index, bins=30, weights=photo_counts.to_numpy(), color='purple', edgecolor='black')
     plt.title('Graph 5: Distribution of Photo Count per Listing', fontsize=18)
     plt.xlabel('Number of Photos', fontsize=12)
     plt.ylabel('Number of Properties', fontsize=12)
     plt.tight_layout()
-    plt.savefig('graph_5_photo_count_distribution.png', dpi=FIGURE_DPI)
-    print("  -> 'graph_5_photo_count_distribution.png' saved.")
+    plt.savefig(path, dpi=FIGURE_DPI)
+    plt.close(fig)
+
 
-    # Graph 6: Top 10 Properties with Most Photos
-    print("Generating Graph 6: Top 10 Properties by Photo Count...")
-    plt.figure(figsize=FIGURE_SIZE)
-    top_photos = df.nlargest(10, 'photo_count').set_index('property_name')['photo_count']
+def render_top_photos(top_photos, path):
+    fig = plt.figure(figsize=FIGURE_SIZE)
     top_photos.plot(kind='barh', color='indigo')  # Horizontal bar chart
     plt.title('Graph 6: Top 10 Properties with the Most Photos', fontsize=18)
     plt.xlabel('Number of Photos', fontsize=12)
     plt.ylabel('Property Name', fontsize=12)
     plt.gca().invert_yaxis()  # Show highest on top
     plt.tight_layout()
-    plt.savefig('graph_6_top_10_photos.png', dpi=FIGURE_DPI)
-    print("  -> 'graph_6_top_10_photos.png' saved.")
-
-    # Graph 7: Average Capacity by Top 15 Localities
-    print("Generating Graph 7: Average Capacity by Locality...")
-    plt.figure(figsize=FIGURE_SIZE)
-    # Get top 15 localities by *count* first
-    top_localities_by_count = df['locality'].value_counts().nlargest(15).index
-    # Filter DataFrame for only these localities
-    df_top_localities = df[df['locality'].isin(top_localities_by_count)]
-    # Calculate average capacity
-    avg_capacity = df_top_localities.groupby('locality')['total_capacity'].mean().sort_values(ascending=False)
+    plt.savefig(path, dpi=FIGURE_DPI)
+    plt.close(fig)
 
+
+def render_avg_capacity(avg_capacity, path):
+    fig = plt.figure(figsize=FIGURE_SIZE)
     avg_capacity.plot(kind='bar', color='coral')
     plt.title('Graph 7: Average Property Capacity in Top 15 Localities', fontsize=18)
     plt.xlabel('Locality', fontsize=12)
     plt.ylabel('Average Capacity (Persons)', fontsize=12)
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
-    plt.savefig('graph_7_avg_capacity_locality.png', dpi=FIGURE_DPI)
-    print("  -> 'graph_7_avg_capacity_locality.png' saved.")
+    plt.savefig(path, dpi=FIGURE_DPI)
+    plt.close(fig)
+
 
-    # Graph 8: Key Amenities (Phone, WiFi, Parking)
-    print("Generating Graph 8: Key Amenities...")
+def render_key_amenities(amenity_counts, path):
     fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(20, 7))  # Wide figure for 3 pies
 
     # Define labels and colors
@@ -248,17 +306,284 @@ def main_analysis():
     parking_colors = {True: '#FFC107', False: '#BDBDBD'}
 
     # Plot
-    plot_pie_chart(ax1, df['has_phone'], phone_labels, phone_colors, 'Listings with Phone Number')
-    plot_pie_chart(ax2, df['has_wifi'], wifi_labels, wifi_colors, 'Listings with "Free WiFi"')
-    plot_pie_chart(ax3, df['has_parking'], parking_labels, parking_colors, 'Listings with "Parking"')
+    plot_pie_chart(ax1, amenity_counts['phone'], phone_labels, phone_colors, 'Listings with Phone Number')
+    plot_pie_chart(ax2, amenity_counts['wifi'], wifi_labels, wifi_colors, 'Listings with "Free WiFi"')
+    plot_pie_chart(ax3, amenity_counts['parking'], parking_labels, parking_colors, 'Listings with "Parking"')
 
     fig.suptitle('Graph 8: Key Amenity Distribution', fontsize=20, y=1.05)
     plt.tight_layout()
-    plt.savefig('graph_8_key_amenities.png', dpi=FIGURE_DPI)
-    print("  -> 'graph_8_key_amenities.png' saved.")
+    plt.savefig(path, dpi=FIGURE_DPI)
+    plt.close(fig)
+
+
+def chart_input_hash(render, data):
+    """Hash of a chart's aggregated input plus the code and figure settings that draw it."""
+    digest = hashlib.sha256()
+    digest.update(inspect.getsource(render).encode('utf-8'))
+    digest.update(repr((FIGURE_SIZE, FIGURE_DPI)).encode('utf-8'))
+    for key, series in sorted(data.items()) if isinstance(data, dict) else [(None, data)]:
+        digest.update(repr((key, series.name, series.index.name, str(series.dtype))).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(series, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _use_agg_backend():
+    plt.switch_backend('Agg')
+
+
+def render_charts(charts, workers=CHART_WORKERS, use_cache=True, cache_file=CHART_CACHE_FILE):
+    """Renders (path, render function, data) charts in a process pool, skipping those whose input hash is unchanged."""
+    cache = {}
+    if use_cache and os.path.exists(cache_file):
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+
+    pending = []
+    for path, render, data in charts:
+        input_hash = chart_input_hash(render, data)
+        if use_cache and cache.get(path) == input_hash and os.path.exists(path):
+            print(f"  -> '{path}' unchanged, skipped.")
+        else:
+            pending.append((path, render, data, input_hash))
+
+    def saved(path, input_hash):
+        cache[path] = input_hash
+        print(f"  -> '{path}' saved.")
+
+    if workers <= 1 or len(pending) <= 1:
+        for path, render, data, input_hash in pending:
+            render(data, path)
+            saved(path, input_hash)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, len(pending)),
+                                                    initializer=_use_agg_backend) as executor:
+            futures = {executor.submit(render, data, path): (path, input_hash)
+                       for path, render, data, input_hash in pending}
+            for future in concurrent.futures.as_completed(futures):
+                path, input_hash = futures[future]
+                try:
+                    future.result()
+                    saved(path, input_hash)
+                except Exception as e:
+                    print(f"  -> ❌ '{path}' failed: {e}")
+
+    if use_cache:
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2)
+
+
+# --- Main Analysis Function ---
+
+def add_features(df):
+    """Derives the analysis columns from the raw fields (also used on every chunk in streaming mode)."""
+    df['locality'] = parse_locality(df['address'])
+    if 'images' in df:
+        df['photo_count'] = df['images'].str.len()
+    df['total_capacity'] = parse_capacity(df['capacity'])
+    df['payment_method'] = parse_payment_method(df['politici_plata'])
+    df['accepts_children'] = parse_children_policy(df['politici_copii'])
+
+    # Amenity flags from the bitmask index (a Parquet export already carries the masks)
+    if 'amenities' not in df:
+        df['amenities'] = amenity_masks(df['facilities'])
+    df['has_wifi'] = has_group(df['amenities'], 'wifi')
+    df['has_parking'] = has_group(df['amenities'], 'parking')
+    df['has_phone'] = df['phone_number'] != "N/A"
+    return df
+
+
+# --- Graph Aggregates ---
+
+def _add_counts(totals, counts):
+    """Adds value counts into a dict that keeps keys in order of first appearance."""
+    for key, count in counts.items():
+        totals[key] = totals.get(key, 0) + int(count)
+
+
+def _counts_series(totals, name):
+    """Same Series value_counts() returns: counts descending, ties in order of first appearance."""
+    counts = pd.Series(list(totals.values()), index=pd.Index(list(totals.keys()), name=name), name='count',
+                       dtype='int64')
+    return counts.sort_values(ascending=False, kind='stable')
+
+
+class GraphAggregates:
+    """Everything the 8 graphs need, maintained incrementally over chunks of feature rows.
+
+    Memory depends only on the number of distinct localities and values, never on the number
+    of rows: counts per locality / payment / child policy / amenity flag, capacity and photo
+    count histograms (as value counts), a top-10 photo heap and per-locality capacity sums.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.localities = {}
+        self.payment_methods = {}
+        self.children_policies = {}
+        self.capacities = {}
+        self.photo_counts = {}
+        self.amenities = {'has_phone': {}, 'has_wifi': {}, 'has_parking': {}}
+        self.capacity_sums = {}
+        self.capacity_rows = {}
+        self.top_photos = []  # min-heap of (photo_count, -row number, property_name)
+
+    def update(self, df):
+        """Adds a DataFrame that went through add_features."""
+        _add_counts(self.localities, df['locality'].value_counts(sort=False))
+        _add_counts(self.payment_methods, df['payment_method'].value_counts(sort=False))
+        _add_counts(self.children_policies, df['accepts_children'].value_counts(sort=False))
+        for column, totals in self.amenities.items():
+            _add_counts(totals, df[column].value_counts(sort=False))
+
+        # Filter for properties where capacity > 0 and < 100 (to remove outliers)
+        capacity = df['total_capacity']
+        _add_counts(self.capacities, capacity[(capacity > 0) & (capacity < 100)].value_counts(sort=False))
+        photos = df['photo_count']
+        _add_counts(self.photo_counts, photos[photos > 0].value_counts(sort=False))
+
+        by_locality = capacity.groupby(df['locality'], sort=False).agg(['sum', 'count'])
+        for locality, (total, rows) in by_locality.iterrows():
+            self.capacity_sums[locality] = self.capacity_sums.get(locality, 0) + int(total)
+            self.capacity_rows[locality] = self.capacity_rows.get(locality, 0) + int(rows)
+
+        # Ties keep the earliest row, as DataFrame.nlargest does
+        top = df.nlargest(10, 'photo_count')
+        for position, name, count in zip(df.index.get_indexer(top.index), top['property_name'], top['photo_count']):
+            entry = (int(count), -(self.rows + int(position)), name)
+            if len(self.top_photos) < 10:
+                heapq.heappush(self.top_photos, entry)
+            elif entry > self.top_photos[0]:
+                heapq.heapreplace(self.top_photos, entry)
+        self.rows += len(df)
+
+    def charts(self):
+        """Returns the (path, render function, aggregated input) list render_charts draws."""
+        locality_counts = _counts_series(self.localities, 'locality')
+        top_localities = locality_counts.nlargest(15)
+
+        avg_index = pd.Index(sorted(top_localities.index), name='locality')
+        avg_capacity = pd.Series([self.capacity_sums[locality] / self.capacity_rows[locality] for locality in avg_index],
+                                 index=avg_index, name='total_capacity', dtype='float64').sort_values(ascending=False)
+
+        top = sorted(self.top_photos, reverse=True)
+        top_photos = pd.Series([count for count, _, _ in top], name='photo_count', dtype='int64',
+                               index=pd.Index([name for _, _, name in top], name='property_name'))
+
+        return [
+            ('graph_1_localities.png', render_localities, top_localities),
+            ('graph_2_payment_methods.png', render_payment_methods,
+             _counts_series(self.payment_methods, 'payment_method')),
+            ('graph_3_child_policy.png', render_child_policy,
+             _counts_series(self.children_policies, 'accepts_children')),
+            ('graph_4_capacity_distribution.png', render_capacity_distribution,
+             _counts_series(self.capacities, 'total_capacity').sort_index()),
+            ('graph_5_photo_count_distribution.png', render_photo_count_distribution,
+             _counts_series(self.photo_counts, 'photo_count').sort_index()),
+            ('graph_6_top_10_photos.png', render_top_photos, top_photos),
+            ('graph_7_avg_capacity_locality.png', render_avg_capacity, avg_capacity),
+            ('graph_8_key_amenities.png', render_key_amenities, {
+                'phone': _counts_series(self.amenities['has_phone'], 'has_phone'),
+                'wifi': _counts_series(self.amenities['has_wifi'], 'has_wifi'),
+                'parking': _counts_series(self.amenities['has_parking'], 'has_parking'),
+            }),
+        ]
+
+
+# --- Streaming Input ---
+
+def read_parquet_details(path):
+    """Loads a Parquet export, dropping stored amenity masks computed with another vocabulary (add_features redoes them)."""
+    import pyarrow.parquet as pq
+
+    df = pd.read_parquet(path)
+    if 'amenities' in df and not masks_are_current(pq.read_schema(path).metadata):
+        df = df.drop(columns='amenities')
+    return df
+
+
+def iter_feature_chunks(path, chunk_rows=STREAM_CHUNK_ROWS):
+    """Yields DataFrames of at most `chunk_rows` records holding only the fields the graphs use."""
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(path)
+        columns = list(STREAM_FIELDS) + ['images']
+        if 'amenities' in parquet.schema_arrow.names and masks_are_current(parquet.schema_arrow.metadata):
+            columns[columns.index('facilities')] = 'amenities'  # Stored masks replace the facilities text
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield add_features(batch.to_pandas())
+        return
+
+    yield from iter_record_chunks(iter_json_records(path), chunk_rows)
+
+
+def iter_record_chunks(records, chunk_rows=STREAM_CHUNK_ROWS):
+    """Same chunks as iter_feature_chunks, from any iterable of detail records (e.g. the pipeline's queue)."""
+    rows = []
+    for record in records:
+        row = {field: record.get(field, "N/A") for field in STREAM_FIELDS}
+        row['photo_count'] = len(record.get('images') or [])
+        rows.append(row)
+        if len(rows) >= chunk_rows:
+            yield add_features(pd.DataFrame(rows))
+            rows = []
+    if rows:
+        yield add_features(pd.DataFrame(rows))
+
+
+# --- Main Analysis Function ---
+
+def main_analysis(workers=CHART_WORKERS, use_cache=True, streaming=False, chunk_rows=STREAM_CHUNK_ROWS):
+    print(f"--- Starting Phase 3: Data Analysis from {INPUT_FILE} ---")
+
+    if not os.path.exists(INPUT_FILE):
+        print(f"❌ ERROR: File '{INPUT_FILE}' not found.")
+        print("Please run 'every_page_scraper.py' first to generate the data.")
+        return
+
+    aggregates = GraphAggregates()
+    if streaming:
+        # 1-3. Read, parse and aggregate chunk by chunk; only the graph aggregates stay in memory
+        print(f"Streaming {INPUT_FILE} in chunks of {chunk_rows} listings...")
+        try:
+            for chunk in iter_feature_chunks(INPUT_FILE, chunk_rows):
+                aggregates.update(chunk)
+        except Exception as e:
+            print(f"❌ ERROR reading {INPUT_FILE}: {e}")
+            return
+        print(f"✅ Aggregated {aggregates.rows} property listings.")
+    else:
+        # 1. Load Data into Pandas DataFrame
+        try:
+            # Parquet exported by hotel_store.py loads columnar, with the policy texts already categorical
+            df = read_parquet_details(INPUT_FILE) if INPUT_FILE.endswith('.parquet') else pd.read_json(INPUT_FILE)
+            print(f"✅ Data loaded successfully. Found {len(df)} property listings.")
+        except Exception as e:
+            print(f"❌ ERROR reading JSON file: {e}")
+            return
+
+        # 2. Data Cleaning and Feature Engineering
+        print("Parsing and cleaning data...")
+        add_features(df)
+
+        # 3. Aggregate the Inputs of the 8 Graphs
+        aggregates.update(df)
+
+    # --- 4. Render the Graphs (in parallel, skipping unchanged ones) ---
+    # Only the small aggregated series cross into the render processes and feed the chart cache hashes
+    render_charts(aggregates.charts(), workers=workers, use_cache=use_cache)
 
     print("\n✅ Analysis complete! Check your project folder for 8 new '.png' graph files.")
 
 
 if __name__ == '__main__':
-    main_analysis()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Phase 3: analyze the scraped data and draw the graphs.")
+    parser.add_argument('--workers', type=int, default=CHART_WORKERS, help="chart rendering processes")
+    parser.add_argument('--no-chart-cache', action='store_true', help="redraw every chart")
+    parser.add_argument('--streaming', action='store_true',
+                        help="aggregate chunk by chunk in bounded memory (JSON, JSONL or Parquet input)")
+    parser.add_argument('--chunk-rows', type=int, default=STREAM_CHUNK_ROWS)
+    args = parser.parse_args()
+
+    main_analysis(workers=args.workers, use_cache=not args.no_chart_cache, streaming=args.streaming,
+                  chunk_rows=args.chunk_rows)
\ No newline at end of file
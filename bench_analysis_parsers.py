@@ -0,0 +1,70 @@
+from anliza_date import parse_capacity, parse_children_policy, parse_locality, parse_payment_method
+import argparse
+import numpy as np
+import pandas as pd
+import time
+
+# --- Configuration ---
+INPUT_FILE = "hotel_full_details.json"
+ROWS = 1_000_000
+SEED = 42
+
+PARSERS = [
+    ('locality', 'address', parse_locality),
+    ('total_capacity', 'capacity', parse_capacity),
+    ('payment_method', 'politici_plata', parse_payment_method),
+    ('accepts_children', 'politici_copii', parse_children_policy),
+]
+
+
+def synthetic_dataset(source, rows, seed=SEED):
+    """Samples the real column values to `rows` rows.
+
+    Addresses get a random street number so most are distinct (as at national scale); capacities
+    get random head counts, while the policy texts repeat as they do on the site.
+    """
+    rng = np.random.default_rng(seed)
+    sample = source.iloc[rng.integers(0, len(source), rows)].reset_index(drop=True)
+    street_numbers = pd.Series(rng.integers(1, 5000, rows)).astype(str)
+    numbers = pd.Series(rng.integers(1, 60, rows)).astype(str)
+
+    return pd.DataFrame({
+        'address': np.where(sample['address'] == "N/A", sample['address'],
+                            "nr. " + street_numbers + ", " + sample['address']),
+        'capacity': np.where(rng.random(rows) < 0.5, sample['capacity'],
+                             "Capacitate: " + numbers + " adulți și " + numbers.str[-1] + " copii"),
+        'politici_plata': sample['politici_plata'].to_numpy(),
+        'politici_copii': sample['politici_copii'].to_numpy(),
+    })
+
+
+def time_call(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Row-wise apply vs vectorized analysis parsers.")
+    parser.add_argument('--rows', type=int, default=ROWS)
+    parser.add_argument('--input', default=INPUT_FILE)
+    args = parser.parse_args()
+
+    source = pd.read_json(args.input)
+    print(f"Checking on {args.input} ({len(source)} rows)...")
+    for feature, column, parse in PARSERS:
+        identical = source[column].apply(parse).equals(parse(source[column]))
+        print(f"  {feature:<18} {'✅ identical' if identical else '❌ DIFFERS'}")
+
+    df = synthetic_dataset(source, args.rows)
+    print(f"\nBenchmarking on {len(df):,} synthetic rows...")
+    print(f"{'feature':<18}{'apply':>10}{'vectorized':>12}{'speedup':>9}   output")
+    total_apply = total_vectorized = 0.0
+    for feature, column, parse in PARSERS:
+        expected, apply_seconds = time_call(lambda: df[column].apply(parse))
+        result, vectorized_seconds = time_call(lambda: parse(df[column]))
+        total_apply += apply_seconds
+        total_vectorized += vectorized_seconds
+        print(f"{feature:<18}{apply_seconds:>9.2f}s{vectorized_seconds:>11.2f}s{apply_seconds / vectorized_seconds:>8.1f}x"
+              f"   {'✅ identical' if expected.equals(result) else '❌ DIFFERS'}")
+    print(f"{'all four':<18}{total_apply:>9.2f}s{total_vectorized:>11.2f}s{total_apply / total_vectorized:>8.1f}x")
@@ -0,0 +1,77 @@
+from bs4 import BeautifulSoup
+from fixture_pages import load_listings, render_listing_page
+from main_page_scraper import (URL, find_pagination_urls, iter_listing_hotels, parse_hotel_listing,
+                               parse_listing_document, resolve_parser_backend)
+import argparse
+import glob
+import time
+
+# --- Configuration ---
+REPEAT = 20  # Times every page is parsed per backend
+BACKENDS = ["html.parser", "lxml", "selectolax"]
+
+
+def parse_listing_page_baseline(html):
+    """The original Phase 1 parse: whole document with html.parser, no SoupStrainer. Returns (hotels, page links)."""
+    soup = BeautifulSoup(html, 'html.parser')
+    links = find_pagination_urls([link['href'] for link in soup.find_all('a', href=True)], URL, URL)
+    main_list = soup.find('ul', class_='liste-cazare')
+    if not main_list:
+        return None, links
+    return [parse_hotel_listing(hotel) for hotel in main_list.find_all('li', class_='liste-unitate')], links
+
+
+def parse_listing_page_backend(html, backend):
+    """One parse_listing_document pass, as iter_listing_pages does it. Returns (hotels, page links)."""
+    items, hrefs = parse_listing_document(html, backend)
+    hotels = None if items is None else list(iter_listing_hotels(items))
+    return hotels, find_pagination_urls(hrefs, URL, URL)
+
+
+def load_pages(patterns):
+    """Loads saved listing pages, or renders one from hotels_for_deep_scrape.json when none are given."""
+    pages = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            with open(path, 'r', encoding='utf-8') as f:
+                pages.append(f.read())
+    if not pages:
+        print("No saved pages given; rendering a listing page from hotels_for_deep_scrape.json.")
+        page_links = [(str(page), URL.replace('.html', f'-{page}.html')) for page in range(2, 11)]
+        pages.append(render_listing_page(load_listings(), page_links=page_links))
+    return pages
+
+
+def time_parser(parse, pages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            parse(html)
+    return (time.perf_counter() - start) / (repeat * len(pages))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Micro-benchmark the listing parser backends.")
+    parser.add_argument('pages', nargs='*', help="saved listing pages (glob patterns allowed)")
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages)
+    expected = [parse_listing_page_baseline(html) for html in pages]
+    listings = sum(len(hotels or []) for hotels, _ in expected)
+    print(f"Benchmarking {len(pages)} page(s), {listings} listings, {args.repeat} repetitions.\n")
+
+    baseline = time_parser(parse_listing_page_baseline, pages, args.repeat)
+    print(f"{'baseline (full html.parser)':<30} {baseline * 1000:8.2f} ms/page   1.00x")
+
+    for backend in BACKENDS:
+        try:
+            resolve_parser_backend(backend)
+        except ImportError as e:
+            print(f"{backend:<30} skipped: {e}")
+            continue
+
+        identical = [parse_listing_page_backend(html, backend) for html in pages] == expected
+        seconds = time_parser(lambda html: parse_listing_page_backend(html, backend), pages, args.repeat)
+        print(f"{backend:<30} {seconds * 1000:8.2f} ms/page {baseline / seconds:6.2f}x"
+              f"   output {'✅ identical' if identical else '❌ DIFFERS'}")
@@ -0,0 +1,414 @@
+from contextlib import redirect_stdout
+from detail_extraction import extract_details_js, parse_detail_html
+from driver_pool import get_new_driver, quit_driver
+from fixture_pages import (CONTACTS_FILE, DETAILS_FILE, LISTINGS_FILE, FixtureSite, expected_detail_record,
+                           load_listings)
+from hotel_record import HotelRecord
+from main_page_scraper import BASE_URL, create_session, crawl_listings
+from metrics import metrics, percentile
+from pipeline import run_pipeline
+from scheduler import AdaptiveScheduler, HostRateLimiter
+from selenium.common.exceptions import WebDriverException
+import every_page_scraper
+import argparse
+import concurrent.futures
+import io
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import threading
+import time
+
+import matplotlib
+matplotlib.use("Agg")  # Render the analysis charts without a display
+import anliza_date
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# --- Configuration ---
+PAGE_LATENCY = 0.0  # Seconds the fixture site waits before answering a listing or detail page
+REVEAL_LATENCY = 0.1  # Seconds the fake "vezitel" endpoint waits before answering
+RATE_PER_HOST = 1000.0  # The fixture site is local, so the per-host rate limit is effectively lifted
+GRAPH_COUNT = 8
+
+
+# --- Measurement Helpers ---
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def timed_session(pool_size, latencies, rate_limiter=None):
+    """A scraper session that records the latency of every response it receives."""
+    session = create_session(pool_size=pool_size, rate_limiter=rate_limiter)
+    session.hooks['response'].append(lambda response, *args, **kwargs: latencies.append(response.elapsed.total_seconds()))
+    return session
+
+
+def no_browser():
+    raise WebDriverException("the offline benchmark runs without Chrome")
+
+
+def report(phase, items, unit, seconds, latencies, ok):
+    latencies = sorted(latencies)
+    rss = peak_rss_mb()
+    print(f"{phase:<18}{items:>6} {unit:<9}{seconds:>8.2f}s{items / max(seconds, 1e-9):>9.1f}/s"
+          f"{percentile(latencies, 50) * 1000:>9.1f}{percentile(latencies, 95) * 1000:>9.1f}"
+          f"{rss if rss is not None else float('nan'):>10.1f}   {'✅ matches golden' if ok else '❌ DIFFERS'}")
+
+
+def show_differences(label, got, expected, limit=3):
+    shown = 0
+    for key in expected:
+        if got.get(key) != expected[key] and shown < limit:
+            print(f"  -> {label} [{key}]: got {str(got.get(key))[:80]!r}, expected {str(expected[key])[:80]!r}")
+            shown += 1
+
+
+# --- Phases ---
+
+def run_phase1(site, concurrency, golden, quiet):
+    latencies = []
+    session = timed_session(concurrency, latencies)
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO() if quiet else sys.stdout):
+        hotels = crawl_listings([site.listing_url], session, max_workers=concurrency)
+    seconds = time.perf_counter() - start
+
+    ok = hotels == golden
+    if not ok:
+        print(f"  -> Phase 1 returned {len(hotels)} listings, golden has {len(golden)}.")
+        for got, expected in zip(hotels, golden):
+            if got != expected:
+                show_differences(expected['details_url'], got, expected)
+                break
+    return hotels, seconds, latencies, ok
+
+
+def fixture_scraper(site, concurrency, rate, latencies):
+    """(scrape, scheduler) for the HTTP deep scrape against the fixture site.
+
+    scrape takes a (site URL, total, index) tuple and returns the record with its URL on the fixture site.
+    """
+    rate_limiter = HostRateLimiter(rate, concurrency)
+    session = timed_session(concurrency, latencies, rate_limiter)
+    phone_client = every_page_scraper.PhoneRevealClient(session)
+    metrics.path = None  # Keep the benchmark's timings out of scrape_metrics.jsonl
+    metrics.reset()
+    # Masked numbers fall back to the browser; without Chrome that fallback fails fast and leaves N/A
+    pool = every_page_scraper.DriverPool(size=1, driver_factory=no_browser, rate_limiter=rate_limiter)
+    scrape = metrics.timed(lambda args: every_page_scraper.scrape_url_http(
+        *args, session=session, pool=pool, phone_client=phone_client))
+    scheduler = AdaptiveScheduler(initial_concurrency=every_page_scraper.MAX_WORKERS, max_concurrency=concurrency,
+                                  log=lambda message: None, rate_limiter=rate_limiter)
+    return scrape, scheduler
+
+
+def site_record(site, record):
+    """A record scraped from the fixture site, with its URL mapped back to turistinfo.ro."""
+    return {**record, 'url': BASE_URL + record['url'][len(site.base_url):]}
+
+
+def check_records(records, hotels, golden_by_url, expected_count):
+    order = {url: i for i, url in enumerate(hotel['details_url'] for hotel in hotels)}
+    records.sort(key=lambda record: order.get(record['url'], len(order)))
+
+    mismatches = 0
+    for record in records:
+        expected = golden_by_url.get(record['url'])
+        if record != expected:
+            mismatches += 1
+            if mismatches <= 3:
+                show_differences(record['url'], record, expected or {'url': None})
+    ok = mismatches == 0 and len(records) == expected_count
+    if mismatches:
+        print(f"  -> {mismatches} of {len(records)} detail records differ from golden.")
+    return ok
+
+
+def run_phase2(site, hotels, concurrency, rate, golden_by_url, quiet):
+    latencies = []
+    scrape, scheduler = fixture_scraper(site, concurrency, rate, latencies)
+    urls = [site.local_url(hotel['details_url']) for hotel in hotels if hotel['details_url'] != "N/A"]
+    tasks = [(url, len(urls), i + 1) for i, url in enumerate(urls)]
+
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO() if quiet else sys.stdout):
+        results = list(scheduler.map_unordered(scrape, tasks))
+    seconds = time.perf_counter() - start
+
+    records = [site_record(site, result) for result in results if result is not None]
+    return records, seconds, latencies, check_records(records, hotels, golden_by_url, len(urls))
+
+
+def run_selenium(site, hotels, golden_by_url, pooled, limit, quiet):
+    """Phase 2 through Chrome (scrape_url_parallel) with MAX_WORKERS threads, as the browser path runs it.
+
+    `pooled` reuses the sessions of one DriverPool; otherwise every URL starts and quits its own
+    driver with get_new_driver. The fixture's "vezitel" button does nothing without the live site's
+    script, so the phone is left out of the golden comparison.
+    """
+    urls = [site.local_url(hotel['details_url']) for hotel in hotels if hotel['details_url'] != "N/A"][:limit]
+    tasks = [(url, len(urls), i + 1) for i, url in enumerate(urls)]
+    metrics.path = None
+    metrics.reset()
+    pool = every_page_scraper.DriverPool(size=every_page_scraper.MAX_WORKERS,
+                                         max_pages=every_page_scraper.MAX_PAGES_PER_DRIVER) if pooled else None
+    scrape = metrics.timed(lambda args: every_page_scraper.scrape_url_parallel(*args, pool=pool))
+
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO() if quiet else sys.stdout), \
+            concurrent.futures.ThreadPoolExecutor(max_workers=every_page_scraper.MAX_WORKERS) as executor:
+        results = list(executor.map(scrape, tasks))
+    seconds = time.perf_counter() - start
+    if pool:
+        pool.close()
+
+    records = [site_record(site, result) for result in results]
+    for record in records:
+        record['phone_number'] = golden_by_url.get(record['url'], {}).get('phone_number')
+    return records, seconds, check_records(records, hotels, golden_by_url, len(urls))
+
+
+def chrome_error():
+    """None when a Chrome session can be started here, otherwise the error that stopped it."""
+    try:
+        quit_driver(get_new_driver())
+    except Exception as e:
+        return e
+    return None
+
+
+def compare_saved_pages(paths):
+    """Extracts saved detail pages both ways and reports every field where the two differ.
+
+    The static path is parse_detail_html on the file; the browser path opens it in Chrome, expands
+    the description and runs extract_details_js, as scrape_url_parallel does.
+    """
+    driver = get_new_driver()
+    identical = 0
+    try:
+        for path in paths:
+            url = pathlib.Path(path).resolve().as_uri()
+            with open(path, 'r', encoding='utf-8') as f:
+                static = parse_detail_html(f.read(), url)
+            driver.get(url)
+            try:
+                every_page_scraper.wait_strategy.expand_description(driver)
+            except Exception:
+                pass  # No "read more" toggle on this page
+            browser = extract_details_js(driver, url)
+            if static == browser:
+                identical += 1
+            else:
+                show_differences(f"{path} (static vs browser)", static, browser)
+    finally:
+        quit_driver(driver)
+    print(f"  -> saved pages: {identical}/{len(paths)} give the same fields statically and in Chrome")
+    return identical == len(paths)
+
+
+def run_pipelined(site, concurrency, rate, golden_listings, golden_by_url, quiet):
+    """All three phases overlapped by pipeline.run_pipeline, then the charts rendered as pipeline.py does."""
+    latencies = []
+    scrape, scheduler = fixture_scraper(site, concurrency, rate, latencies)
+    records = []
+
+    def scrape_site(args):
+        record = site_record(site, scrape((site.local_url(args[0]),) + tuple(args[1:])))
+        records.append(record)
+        return record
+
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO() if quiet else sys.stdout), tempfile.TemporaryDirectory() as directory:
+        result = run_pipeline([site.listing_url], scrape_site, scheduler, session=timed_session(concurrency, []),
+                              max_workers=concurrency)
+        anliza_date.render_charts([(os.path.join(directory, path), render, data)
+                                   for path, render, data in result['aggregates'].charts()], use_cache=False)
+    seconds = time.perf_counter() - start
+
+    hotels = [{**hotel, 'details_url': BASE_URL + hotel['details_url'][len(site.base_url):]}
+              if hotel['details_url'].startswith(site.base_url) else hotel for hotel in result['hotels']]
+    ok = (not result['errors'] and hotels == golden_listings and result['aggregates'].rows == len(records)
+          and check_records(records, hotels, golden_by_url, len(golden_by_url)))
+    return result, seconds, latencies, ok
+
+
+class FailingCheckpoint:
+    """Checkpoint stand-in whose append raises after `limit` records, like a full disk mid-run."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.records = []
+
+    def append(self, record):
+        if len(self.records) >= self.limit:
+            raise OSError("fixture: checkpoint write failed")
+        self.records.append(record)
+
+
+def run_pipeline_failure(site, concurrency, rate, expected_count, quiet, timeout=60):
+    """Fails Phase 2 part-way with queues of 2, so Phase 1 is blocked on a full queue, then resumes the run.
+
+    True if the failed run still returns and the resumed one skips what the failed one checkpointed.
+    """
+    scrape, scheduler = fixture_scraper(site, concurrency, rate, [])
+    checkpoint = FailingCheckpoint(5)
+    outcome = {}
+
+    def scrape_site(args):
+        return site_record(site, scrape((site.local_url(args[0]),) + tuple(args[1:])))
+
+    def run():
+        outcome['result'] = run_pipeline([site.listing_url], scrape_site, scheduler,
+                                         session=timed_session(concurrency, []), checkpoint=checkpoint,
+                                         max_workers=concurrency, url_queue_size=2, record_queue_size=2)
+
+    start = time.perf_counter()
+    runner = threading.Thread(target=run, daemon=True)
+    with redirect_stdout(io.StringIO() if quiet else sys.stdout):
+        runner.start()
+        runner.join(timeout)
+    seconds = time.perf_counter() - start
+    if runner.is_alive():
+        print(f"  -> ❌ Phase 2 failure: the pipeline was still running after {timeout}s")
+        return False
+    errors = outcome.get('result', {}).get('errors', [])
+    ok = any(isinstance(error, OSError) for error in errors)
+    print(f"  -> {'✅' if ok else '❌'} Phase 2 failure: pipeline returned after {seconds:.2f}s "
+          f"with {len(errors)} stage error(s)")
+
+    finished = {record['url']: HotelRecord.from_dict(record) for record in checkpoint.records
+                if record['property_name'] != 'N/A'}
+    with redirect_stdout(io.StringIO() if quiet else sys.stdout):
+        result = run_pipeline([site.listing_url], scrape_site, scheduler, session=timed_session(concurrency, []),
+                              max_workers=concurrency, finished=finished)
+    resumed_ok = (not result['errors'] and result['resumed'] == len(finished) > 0
+                  and result['aggregates'].rows == expected_count
+                  and len(result['scraped']) <= expected_count - len(finished))
+    print(f"  -> {'✅' if resumed_ok else '❌'} Resume: {result['resumed']} records from the failed run's checkpoint, "
+          f"{len(result['scraped'])} pages scraped, {result['aggregates'].rows} records aggregated")
+    return ok and resumed_ok
+
+
+def run_phase3(records, quiet):
+    with tempfile.TemporaryDirectory() as directory:
+        input_file = os.path.join(directory, "hotel_full_details.json")
+        with open(input_file, 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False)
+
+        original_dir, original_input = os.getcwd(), anliza_date.INPUT_FILE
+        os.chdir(directory)
+        anliza_date.INPUT_FILE = input_file
+        start = time.perf_counter()
+        try:
+            with redirect_stdout(io.StringIO() if quiet else sys.stdout):
+                anliza_date.main_analysis()
+        finally:
+            seconds = time.perf_counter() - start
+            anliza_date.INPUT_FILE = original_input
+            os.chdir(original_dir)
+            matplotlib.pyplot.close('all')
+
+        graphs = [name for name in os.listdir(directory) if name.startswith('graph_') and name.endswith('.png')]
+    ok = len(graphs) == GRAPH_COUNT
+    if not ok:
+        print(f"  -> Phase 3 produced {len(graphs)} graphs, expected {GRAPH_COUNT}.")
+    return seconds, ok
+
+
+# --- Main Execution ---
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark against a local turistinfo.ro fixture site.")
+    parser.add_argument('--listings', default=LISTINGS_FILE, help="Phase 1 records the listing pages are built from")
+    parser.add_argument('--details', default=DETAILS_FILE, help="Phase 2 records the detail pages are built from")
+    parser.add_argument('--contacts', default=CONTACTS_FILE, help="owner names returned by the fake reveal")
+    parser.add_argument('--page-latency', type=float, default=PAGE_LATENCY)
+    parser.add_argument('--reveal-latency', type=float, default=REVEAL_LATENCY)
+    parser.add_argument('--concurrency', type=int, default=every_page_scraper.HTTP_WORKERS)
+    parser.add_argument('--rate', type=float, default=RATE_PER_HOST, help="per-host requests/second for Phase 2")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="also run the three phases overlapped (pipeline.py) and compare with their sum, then check a Phase 2 failure neither hangs it nor loses the resume")
+    parser.add_argument('--selenium', type=int, nargs='?', const=40, default=0, metavar='PAGES',
+                        help="also time the browser path on the first PAGES detail pages (default 40): "
+                             "a new driver per URL vs the DriverPool")
+    parser.add_argument('--compare-saved', nargs='+', default=[], metavar='HTML',
+                        help="saved detail pages (e.g. from the live site) to extract both statically and in "
+                             "Chrome; any field that differs fails the run")
+    parser.add_argument('--verbose', action='store_true', help="show the scrapers' own output")
+    args = parser.parse_args()
+
+    listings = load_listings(args.listings)
+    details = load_listings(args.details)
+    contacts = load_listings(args.contacts) if os.path.exists(args.contacts) else []
+    listed_urls = {hotel['details_url'] for hotel in listings}
+    details = [record for record in details if record['url'] in listed_urls]
+
+    # Golden records: what each phase must extract from pages rendered out of the saved data
+    golden_details = {record['url']: {**expected_detail_record(record), 'phone_number': record['phone_number']}
+                      for record in details}
+
+    with FixtureSite(listings, details, contacts, page_latency=args.page_latency,
+                     reveal_latency=args.reveal_latency) as site:
+        print(f"Fixture site at {site.base_url}: {len(listings)} listings, {len(details)} detail pages, "
+              f"reveal latency {args.reveal_latency * 1000:.0f} ms, page latency {args.page_latency * 1000:.0f} ms.\n")
+        print(f"{'phase':<18}{'items':>6} {'':<9}{'wall':>9}{'rate':>11}{'p50 ms':>9}{'p95 ms':>9}"
+              f"{'peak MB':>10}   golden")
+
+        hotels, phase1_seconds, latencies, phase1_ok = run_phase1(site, args.concurrency, listings, not args.verbose)
+        report("1 listings", len(hotels), "listings", phase1_seconds, latencies, phase1_ok)
+
+        records, phase2_seconds, latencies, phase2_ok = run_phase2(site, hotels, args.concurrency, args.rate,
+                                                                   golden_details, not args.verbose)
+        report("2 deep scrape", len(records), "pages", phase2_seconds, metrics.stage_seconds['total'], phase2_ok)
+        report("  (requests)", len(latencies), "requests", phase2_seconds, latencies, phase2_ok)
+        stage_report = metrics.summary()
+
+        phase3_seconds, phase3_ok = run_phase3(records, not args.verbose)
+        report("3 analysis", len(records), "records", phase3_seconds, [phase3_seconds], phase3_ok)
+
+        pipeline_ok = True
+        if args.pipeline:
+            result, seconds, latencies, pipeline_ok = run_pipelined(site, args.concurrency, args.rate, listings,
+                                                                    golden_details, not args.verbose)
+            report("1+2+3 pipelined", result['aggregates'].rows, "records", seconds, latencies, pipeline_ok)
+            timings = result['timings']
+            print(f"  -> sum of the separate phases {phase1_seconds + phase2_seconds + phase3_seconds:.2f}s; "
+                  f"pipelined Phase 1 done at {timings['phase1']:.2f}s, Phase 2 at {timings['phase2']:.2f}s, "
+                  f"aggregates at {timings['phase3']:.2f}s, charts at {seconds:.2f}s")
+            pipeline_ok = run_pipeline_failure(site, args.concurrency, args.rate, len(golden_details),
+                                               not args.verbose) and pipeline_ok
+
+        selenium_ok = True
+        if args.selenium or args.compare_saved:
+            error = chrome_error()
+            if error is not None:
+                print(f"  -> Browser path skipped, Chrome could not be started: {str(error).splitlines()[0]}")
+            if error is None and args.compare_saved:
+                selenium_ok = compare_saved_pages(args.compare_saved)
+            if error is None and args.selenium:
+                rates = {}
+                for label, pooled in (("2 per-URL driver", False), ("2 DriverPool", True)):
+                    browser_records, seconds, ok = run_selenium(site, hotels, golden_details, pooled, args.selenium,
+                                                                not args.verbose)
+                    report(label, len(browser_records), "pages", seconds, metrics.stage_seconds['total'], ok)
+                    rates[pooled] = len(browser_records) / max(seconds, 1e-9) * 60
+                    selenium_ok = selenium_ok and ok
+                print(f"  -> browser path: {rates[False]:.1f} pages/min with a driver per URL, "
+                      f"{rates[True]:.1f} pages/min pooled ({rates[True] / max(rates[False], 1e-9):.1f}x)")
+
+    print(stage_report)
+    if not (phase1_ok and phase2_ok and phase3_ok and pipeline_ok and selenium_ok):
+        print("\n❌ Extraction output differs from the golden records.")
+        sys.exit(1)
+    print("\n✅ All phases match the golden records.")
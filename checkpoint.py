@@ -0,0 +1,169 @@
+import json
+import os
+import threading
+
+# --- Configuration ---
+CHECKPOINT_FILE = "hotel_full_details.jsonl"
+ARCHIVE_SUFFIX = ".done"  # A compacted checkpoint is renamed to hotel_full_details.jsonl.done
+
+
+MISSING_VALUES = ('N/A', [])  # Field values a failed or partial scrape leaves behind
+
+
+def merge_found(previous, record):
+    """`record` with each field it left missing (N/A or an empty list) taken from `previous` when that has it."""
+    merged = dict(record)
+    for field, value in record.items():
+        if value in MISSING_VALUES:
+            old = previous.get(field)
+            if old is not None and old not in MISSING_VALUES:
+                merged[field] = old
+    return merged
+
+
+def load_checkpoint(path=CHECKPOINT_FILE, key='url', factory=None, merge=False):
+    """Returns {key: record} for every complete line of a JSONL checkpoint (later lines win).
+
+    A line cut short by a crash is ignored, so the URL it belonged to is simply scraped again.
+    `factory`, if given, converts each record dict (e.g. HotelRecord.from_dict). With `merge`,
+    later lines win field by field instead: a field a re-scrape left as N/A keeps the earlier value,
+    so a transient failure never replaces a good record.
+    """
+    records = {}
+    if not os.path.exists(path):
+        return records
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if merge and record[key] in records:
+                record = merge_found(records[record[key]], record)
+            records[record[key]] = factory(record) if factory else record
+    return records
+
+
+def iter_json_records(path, chunk_size=1024 * 1024):
+    """Yields records one at a time from a JSONL file or a JSON array, without loading the whole file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue  # Line cut short by an interrupted scrape
+            return
+
+        decoder = json.JSONDecoder()
+        buffer, started = "", False
+        while True:
+            chunk = f.read(chunk_size)
+            buffer += chunk
+            position = 0
+            while True:
+                while position < len(buffer) and (buffer[position].isspace() or buffer[position] == ','):
+                    position += 1
+                if position == len(buffer):
+                    break
+                if not started:
+                    if buffer[position] != '[':
+                        raise ValueError(f"{path} is not a JSON array")
+                    started, position = True, position + 1
+                    continue
+                if buffer[position] == ']':
+                    return
+                try:
+                    record, position = decoder.raw_decode(buffer, position)
+                except ValueError:
+                    if not chunk:
+                        raise
+                    break  # Record continues in the next chunk
+                yield record
+            buffer = buffer[position:]
+            if not chunk:
+                return
+
+
+class CheckpointWriter:
+    """Thread-safe JSONL appender: one record per line, flushed and fsynced as soon as it is written."""
+
+    def __init__(self, path=CHECKPOINT_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+        # Terminate a line left half-written by a crash so the next record starts on its own line
+        if self._file.tell() > 0:
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")
+
+    def append(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def write_json_array(path, records):
+    """Atomically writes records (dicts, or objects with to_dict()) as the pretty-printed JSON array the phases read.
+
+    Records are serialized one at a time; the file is byte-identical to json.dump(..., ensure_ascii=False, indent=4).
+    Returns the record count.
+    """
+    count = 0
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for record in records:
+            if hasattr(record, 'to_dict'):
+                record = record.to_dict()
+            text = json.dumps(record, ensure_ascii=False, indent=4)
+            f.write(("[\n    " if count == 0 else ",\n    ") + text.replace("\n", "\n    "))
+            count += 1
+        f.write("\n]" if count else "[]")
+    os.replace(tmp_path, path)
+    return count
+
+
+def compact_checkpoint(output_file, path=CHECKPOINT_FILE, url_order=None, key='url', factory=None, merge=False):
+    """Writes the checkpoint as the pretty-printed JSON array the other phases read. Returns the record count.
+
+    Records follow `url_order` when given (URLs missing from the checkpoint are left out),
+    otherwise checkpoint order. `factory` and `merge` are passed to load_checkpoint.
+    """
+    records = load_checkpoint(path, key, factory, merge)
+    if url_order is not None:
+        ordered = (records[url] for url in dict.fromkeys(url_order) if url in records)
+    else:
+        ordered = records.values()
+    return write_json_array(output_file, ordered)
+
+
+def archive_checkpoint(path=CHECKPOINT_FILE):
+    """Renames a checkpoint out of the way (replacing the previous archive), so the next run starts fresh.
+
+    Returns the archive path, or None if there was no checkpoint.
+    """
+    if not os.path.exists(path):
+        return None
+    archive_path = path + ARCHIVE_SUFFIX
+    os.replace(path, archive_path)
+    return archive_path
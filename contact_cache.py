@@ -0,0 +1,50 @@
+from checkpoint import CheckpointWriter, load_checkpoint
+import threading
+import time
+
+# --- Configuration ---
+CONTACT_CACHE_FILE = "contact_cache.jsonl"
+CONTACT_MAX_AGE_DAYS = 30  # Revealed numbers older than this are revealed again
+
+
+class ContactCache:
+    """Per-URL cache of revealed contacts, shared by the deep scrape and the contacts-only mode.
+
+    Backed by an append-only JSONL file (same format as the deep scrape checkpoint), so a number
+    revealed by one run is never revealed again by the next until it expires.
+    """
+
+    def __init__(self, path=CONTACT_CACHE_FILE, max_age_days=CONTACT_MAX_AGE_DAYS):
+        self.max_age = max_age_days * 24 * 3600
+        self._lock = threading.Lock()
+        self._contacts = load_checkpoint(path)
+        self._writer = CheckpointWriter(path)
+
+    def get(self, url):
+        """Returns {'phone_number', 'owner_name', 'property_name'} for a fresh cached reveal, or None."""
+        with self._lock:
+            contact = self._contacts.get(url)
+        if contact is None or time.time() - contact.get('revealed_at', 0) > self.max_age:
+            return None
+        return contact
+
+    def put(self, url, phone_number, owner_name='N/A', property_name='N/A'):
+        """Stores a successful reveal. Masked or missing numbers are not cached."""
+        if not phone_number or phone_number == 'N/A':
+            return
+        contact = {
+            'url': url, 'property_name': property_name, 'phone_number': phone_number,
+            'owner_name': owner_name or 'N/A', 'revealed_at': time.time(),
+        }
+        with self._lock:
+            self._contacts[url] = contact
+        self._writer.append(contact)
+
+    def close(self):
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,159 @@
+from bs4 import BeautifulSoup, NavigableString, Tag
+from urllib.parse import urljoin
+import re
+
+# --- Configuration ---
+# <h2 class="titlu"> headings on a detail page and the details key each one maps to
+POLICY_TITLES = {
+    'politici_copii': 'Copiii',
+    'politici_mese': 'Mesele',
+    'politici_rezervari': 'Politica de rezervări',
+    'politici_plata': 'Plata',
+}
+
+# Elements the browser lays out as blocks (a line break before and after); <p> gets a blank line
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'center', 'dd', 'details', 'dialog', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header',
+    'hgroup', 'hr', 'li', 'main', 'nav', 'ol', 'pre', 'section', 'summary', 'table', 'tr', 'ul',
+}
+SKIPPED_TAGS = {'script', 'style', 'template', 'noscript', 'head'}
+COLLAPSIBLE_SPACE = re.compile(r'[ \t\n\r\f]+')  # CSS white-space: normal; &nbsp; is kept
+
+# --- In-Browser Extraction (single WebDriver round trip) ---
+# Collects every static field of the details dict in one execute_script call.
+# Missing or empty elements come back as null and are turned into "N/A" on the Python side.
+EXTRACT_DETAILS_JS = """
+const policyTitles = arguments[0];
+const text = (el) => {
+    if (!el) return null;
+    const value = (el.innerText || '').trim();
+    return value || null;
+};
+const policy = (title) => {
+    const heading = Array.from(document.querySelectorAll('h2')).find(
+        (h) => h.className === 'titlu' && h.textContent.includes(title));
+    return heading ? text(heading.nextElementSibling) : null;
+};
+const result = {
+    property_name: text(document.querySelector("span[itemprop='name']")),
+    address: text(document.querySelector("span[itemprop='address']")),
+    capacity: text(document.querySelector('.capacitate')),
+    facilities: text(document.querySelector('.facilitylist')),
+    full_description: text(document.querySelector("div[itemprop='description']")),
+    images: Array.from(document.querySelectorAll("div[class*='picture'] a[rel='gallery-2']"))
+        .map((a) => a.getAttribute('href'))
+        .filter((href) => href),
+};
+for (const [key, title] of Object.entries(policyTitles)) {
+    result[key] = policy(title);
+}
+return result;
+"""
+
+
+def or_default(value, default_value="N/A"):
+    """Converts a missing or blank extracted value to the default."""
+    if value is None:
+        return default_value
+    value = value.strip()
+    return value if value else default_value
+
+
+def extract_details_js(driver, url):
+    """Extracts name, address, capacity, facilities, description, images and policies in one round trip."""
+    raw = driver.execute_script(EXTRACT_DETAILS_JS, POLICY_TITLES) or {}
+
+    fields = {
+        key: or_default(raw.get(key))
+        for key in ('property_name', 'address', 'capacity', 'facilities', 'full_description', *POLICY_TITLES)
+    }
+    fields['images'] = [urljoin(url, href) for href in raw.get('images') or []]
+    return fields
+
+
+# --- Static HTML Extraction (no browser) ---
+# Same approach as the listing parser in main_page_scraper.py: BeautifulSoup over the raw HTML.
+
+def _collect_text(node, items):
+    """Flattens `node` into ('text', s), ('br', 1) and ('break', n) items, the way innerText walks the layout."""
+    for child in node.children:
+        if isinstance(child, Tag):
+            if child.name in SKIPPED_TAGS:
+                continue
+            if child.name == 'br':
+                items.append(('br', 1))
+                continue
+            breaks = 2 if child.name == 'p' else 1 if child.name in BLOCK_TAGS else 0
+            if breaks:
+                items.append(('break', breaks))
+            _collect_text(child, items)
+            if child.name in ('td', 'th') and child.find_next_sibling(['td', 'th']):
+                items.append(('text', '\t'))
+            if breaks:
+                items.append(('break', breaks))
+        elif type(child) is NavigableString:
+            items.append(('text', COLLAPSIBLE_SPACE.sub(' ', str(child))))
+
+
+def inner_text(tag):
+    """What the browser's innerText (and Selenium's .text) gives for `tag`, computed from static HTML.
+
+    Whitespace collapses to one space and is dropped at line edges, <br> ends a line, block elements
+    sit on their own lines and paragraphs are separated by a blank line, so the texts match the
+    browser path line for line, blank lines included. The one difference: elements hidden by CSS
+    (e.g. the collapsed part of the description) are included, as the browser shows them after
+    expand_description.
+    """
+    if tag is None:
+        return None
+    items = []
+    _collect_text(tag, items)
+
+    lines, pieces, pending = [], [], 0  # `pending`: line breaks the surrounding blocks require
+    for kind, value in items + [('break', 0)]:
+        if kind == 'text':
+            pieces.append(value)
+            continue
+        text = re.sub(' {2,}', ' ', "".join(pieces)).strip(' ')
+        pieces = []
+        if text or kind == 'br':
+            if lines and pending > 1:
+                lines.extend([""] * (pending - 1))
+            lines.append(text)
+            pending = 0
+        if kind == 'break':
+            pending = max(pending, value)
+    return "\n".join(lines).strip()
+
+
+def _policy_text(soup, title):
+    for heading in soup.find_all('h2', class_='titlu'):
+        if heading.get('class') == ['titlu'] and title in heading.get_text():
+            return inner_text(heading.find_next_sibling())
+    return None
+
+
+def parse_property_name(html):
+    """Returns only the property name from a detail page's static HTML."""
+    soup = BeautifulSoup(html, 'html.parser')
+    return or_default(inner_text(soup.find('span', itemprop='name')))
+
+
+def parse_detail_html(html, url):
+    """Parses a detail page's static HTML into the same fields extract_details_js returns (no phone number)."""
+    soup = BeautifulSoup(html, 'html.parser')
+
+    gallery_links = soup.select("div[class*='picture'] a[rel='gallery-2'][href]")
+
+    fields = {
+        'property_name': or_default(inner_text(soup.find('span', itemprop='name'))),
+        'address': or_default(inner_text(soup.find('span', itemprop='address'))),
+        'capacity': or_default(inner_text(soup.find(class_='capacitate'))),
+        'facilities': or_default(inner_text(soup.find(class_='facilitylist'))),
+        'full_description': or_default(inner_text(soup.find('div', itemprop='description'))),
+        'images': [urljoin(url, link['href']) for link in gallery_links],
+    }
+    for key, title in POLICY_TITLES.items():
+        fields[key] = or_default(_policy_text(soup, title))
+    return fields
@@ -0,0 +1,163 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service as ChromeService
+from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import WebDriverException
+from contextlib import contextmanager
+import queue
+import threading
+
+# --- Configuration ---
+POOL_SIZE = 4  # One long-lived Chrome session per worker thread
+MAX_PAGES_PER_DRIVER = 50  # Recycle a session after this many pages to keep memory in check
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# --- Driver Binary Resolution (once per run) ---
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def resolve_driver_path():
+    """Resolves the ChromeDriver binary once per run and reuses the cached path afterwards."""
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = ChromeDriverManager().install()
+        return _driver_path
+
+
+def build_chrome_options():
+    """Returns the stealth headless Chrome options shared by all scrapers."""
+    chrome_options = webdriver.ChromeOptions()
+
+    # Stealth Configuration (Headless)
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--window-size=1920,1080')
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+    chrome_options.add_argument(f'user-agent={USER_AGENT}')
+    chrome_options.add_argument('--headless')
+
+    return chrome_options
+
+
+def get_new_driver():
+    """Initializes and returns a new WebDriver instance with stealth options."""
+    return webdriver.Chrome(service=ChromeService(resolve_driver_path()), options=build_chrome_options())
+
+
+def reset_driver(driver):
+    """Clears cookies and web storage and parks the session on about:blank between URLs."""
+    driver.delete_all_cookies()
+    try:
+        driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+    except WebDriverException:
+        # about:blank and some error pages do not expose storage
+        pass
+    driver.get("about:blank")
+
+
+def quit_driver(driver):
+    """Quits a session, ignoring errors from an already crashed browser."""
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+# --- Driver Pool ---
+
+class DriverPool:
+    """Bounded, thread-safe pool of long-lived Chrome sessions.
+
+    At most `size` sessions exist at any time. A session is reset after every URL,
+    and replaced after `max_pages` pages or as soon as it is released as broken.
+    open() loads a page after taking a token from `rate_limiter` (a scheduler.HostRateLimiter), if given.
+    """
+
+    def __init__(self, size=POOL_SIZE, max_pages=MAX_PAGES_PER_DRIVER, driver_factory=get_new_driver,
+                 rate_limiter=None):
+        self.size = size
+        self.max_pages = max_pages
+        self.driver_factory = driver_factory
+        self.rate_limiter = rate_limiter
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._page_counts = {}
+        self._closed = False
+
+    def acquire(self):
+        """Blocks until a slot is free and returns an idle or freshly started driver."""
+        self._slots.acquire()
+        try:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                driver = self.driver_factory()
+                with self._lock:
+                    self._page_counts[id(driver)] = 0
+                return driver
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, driver, broken=False):
+        """Returns a driver to the pool, recycling it when broken or worn out."""
+        try:
+            with self._lock:
+                pages = self._page_counts.get(id(driver), 0) + 1
+                self._page_counts[id(driver)] = pages
+
+            if not broken and not self._closed and pages < self.max_pages:
+                try:
+                    reset_driver(driver)
+                    self._idle.put(driver)
+                    return
+                except Exception:
+                    pass
+
+            self._discard(driver)
+        finally:
+            self._slots.release()
+
+    def open(self, driver, url):
+        """driver.get(url), counted against the host's request rate like an HTTP request."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.take(url)
+        driver.get(url)
+
+    @contextmanager
+    def driver(self):
+        """Context manager that acquires a driver and releases it as broken if the browser crashed."""
+        driver = self.acquire()
+        broken = False
+        try:
+            yield driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    def close(self):
+        """Quits every idle session. Call once all workers have finished."""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+
+    def _discard(self, driver):
+        with self._lock:
+            self._page_counts.pop(id(driver), None)
+        quit_driver(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -1,22 +1,46 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-from urllib.parse import urljoin
+import argparse
 import json
 import time
 import os
-import concurrent.futures  # 🚀 NEW IMPORT for parallel processing
 import threading
+from driver_pool import DriverPool, get_new_driver
+from page_waits import WaitStrategy, long_wait_strategy
+from detail_extraction import extract_details_js, parse_detail_html, parse_property_name
+from main_page_scraper import create_session, fetch_page
+from phone_reveal import PhoneRevealClient
+from http_cache import HttpCache
+from checkpoint import CHECKPOINT_FILE, CheckpointWriter, archive_checkpoint, compact_checkpoint, load_checkpoint
+from collections import Counter
+from contact_cache import ContactCache
+from hotel_record import HotelRecord, load_records, save_records
+from scheduler import AdaptiveScheduler, HostRateLimiter, is_dead_page
+from metrics import failed_fields, metrics
+from work_queue import QUEUE_FILE, Heartbeat, default_worker_id, open_queue
+from incremental import (PREVIOUS_INDEX_FILE, STALE_AFTER_DAYS, STATE_FILE, load_json, plan_incremental,
+                         record_scraped, save_state, tombstone)
+import requests
 
 # --- Configuration ---
 INPUT_FILE = "hotels_for_deep_scrape.json"
 OUTPUT_FILE = "hotel_full_details.json"
-MAX_WORKERS = 4  # ⚡ Run 4 browser sessions (URLs) concurrently
-WAIT_TIME = 1  # Optimized initial wait time
+CONTACTS_OUTPUT_FILE = "hotel_contacts_final.json"  # Output of the contacts-only mode
+MAX_WORKERS = 4  # ⚡ Run 4 browser sessions (URLs) concurrently (also the scheduler's starting concurrency)
+MAX_PAGES_PER_DRIVER = 50  # ♻️ Recycle each pooled Chrome session after this many pages
+USE_HTTP_FAST_PATH = True  # 🌐 Parse static fields over plain HTTP; use Chrome only for the phone reveal
+HTTP_WORKERS = 16  # Concurrency ceiling on the fast path (browser use stays capped at MAX_WORKERS)
+USE_HTTP_CACHE = True  # 💾 Revalidate detail pages with conditional GETs against the on-disk cache
+# 🩹 Retry pass: records missing any of these fields are revisited for just their missing fields
+CRITICAL_FIELDS = ('property_name', 'phone_number', 'politici_copii', 'politici_mese', 'politici_rezervari',
+                   'politici_plata')
+MAX_FIELD_RETRIES = 2  # Retry passes per hotel before its gaps are taken as really missing on the site
+
+# --- Wait Strategy ---
+# Shared by all worker threads so the adaptive timeouts learn from every page
+wait_strategy = WaitStrategy()
+# Fixed long timeouts for the retry pass, where the adaptive ones already proved too short
+retry_wait_strategy = long_wait_strategy()
 
 # --- Thread-Safe Printing ---
 # Use a lock to prevent print statements from jumbling when multiple threads run simultaneously
@@ -28,157 +52,560 @@ def safe_print(message):
         print(message)
 
 
-# --- WebDriver Initialization Function ---
-def get_new_driver():
-    """Initializes and returns a new WebDriver instance with stealth options."""
-    chrome_options = webdriver.ChromeOptions()
+# --- Core Scraping Functions ---
 
-    # Stealth Configuration (Headless)
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--disable-dev-shm-usage')
-    chrome_options.add_argument('--window-size=1920,1080')
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    chrome_options.add_experimental_option('useAutomationExtension', False)
-    chrome_options.add_argument(
-        'user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-    chrome_options.add_argument('--headless')
+def empty_details(url):
+    """Returns a details record with every field defaulted to N/A."""
+    return {
+        'url': url, 'property_name': 'N/A', 'address': 'N/A', 'phone_number': 'N/A',
+        'full_description': 'N/A', 'capacity': 'N/A', 'images': [],
+        'politici_copii': 'N/A', 'politici_mese': 'N/A', 'politici_rezervari': 'N/A',
+        'politici_plata': 'N/A', 'facilities': 'N/A'
+    }
 
-    return webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=chrome_options)
 
+def log_field_status(details):
+    safe_print(f"  -> Images: {'✅ SUCCESS' if details['images'] else '❌ FAILURE'}")
+    safe_print(
+        f"  -> Description: {'✅ SUCCESS' if details['full_description'] != 'N/A' and len(details['full_description']) > 100 else '❌ FAILURE'}")
+    safe_print(
+        f"  -> Policies: Copii {'✅' if details['politici_copii'] != 'N/A' else '❌'} | Mese {'✅' if details['politici_mese'] != 'N/A' else '❌'} | Rezervari {'✅' if details['politici_rezervari'] != 'N/A' else '❌'} | Plata {'✅' if details['politici_plata'] != 'N/A' else '❌'}")
 
-# --- Helper Functions (UNCHANGED logic) ---
 
-def extract_text_or_default(driver, by_method, locator, default_value="N/A"):
-    """Safely extracts text and ensures an empty string is converted to N/A."""
+def extract_owner_name(driver):
+    """Returns the owner name shown next to the revealed phone number, or 'N/A'."""
     try:
-        element = driver.find_element(by_method, locator)
-        text = element.text.strip()
-        if not text:
-            return default_value
-        return text
-    except (NoSuchElementException, Exception):
-        return default_value
-
+        owner_name = driver.find_element(By.XPATH, "//div[contains(@class, 'contact-info')]//strong[1]").text.strip()
+        return owner_name or 'N/A'
+    except NoSuchElementException:
+        return 'N/A'
 
-def extract_policy_details_v2(driver, policy_name):
-    """Extracts text from the element following the specific <h2> policy title and ensures an empty string is converted to N/A."""
-    try:
-        label_xpath = f"//h2[@class='titlu' and contains(text(), '{policy_name}')]/following-sibling::*[1]"
-        try:
-            policy_detail_element = driver.find_element(By.XPATH, label_xpath)
-            text = policy_detail_element.text.strip()
-            if not text:
-                return "N/A"
-            return text
-        except NoSuchElementException:
-            return "N/A"
-    except Exception:
-        return "N/A"
 
+def read_contact_from_driver(driver, waits=None):
+    """Clicks the phone button on the open page and returns {'phone_number', 'owner_name'}."""
+    phone_number = (waits or wait_strategy).reveal_phone(driver) or 'N/A'
+    return {'phone_number': phone_number, 'owner_name': extract_owner_name(driver)}
 
-# --- Core Scraping Function (UNCHANGED logic) ---
 
-def scrape_url_parallel(url, total_urls, current_index):
-    """Initializes driver, scrapes one URL, logs details, and quits driver."""
+def scrape_url_parallel(url, total_urls, current_index, pool=None, contact_cache=None):
+    """Borrows a pooled driver (or starts one), scrapes one URL, logs details, and hands the driver back."""
 
     driver = None
-    details = {
-        'url': url, 'property_name': 'N/A', 'address': 'N/A', 'phone_number': 'N/A',
-        'full_description': 'N/A', 'capacity': 'N/A', 'images': [],
-        'politici_copii': 'N/A', 'politici_mese': 'N/A', 'politici_rezervari': 'N/A',
-        'politici_plata': 'N/A', 'facilities': 'N/A'
-    }
+    driver_broken = False
+    details = empty_details(url)
 
     try:
-        # 1. Initialize driver for this thread
-        driver = get_new_driver()
+        # 1. Borrow a long-lived driver from the pool (or start one when running standalone)
+        with metrics.stage("driver_acquire"):
+            driver = pool.acquire() if pool else get_new_driver()
         safe_print(f"\n[{current_index}/{total_urls}] -> Processing: {url}")
 
-        # 2. Open URL and wait
-        driver.get(url)
-        safe_print(f"  -> Opened URL: {url} | Waiting {WAIT_TIME} second...")
-        time.sleep(WAIT_TIME)
+        # 2. Open URL
+        with metrics.stage("driver_get"):
+            pool.open(driver, url) if pool else driver.get(url)
+        safe_print(f"  -> Opened URL: {url}")
 
         # --- Property Name (Critical) ---
         try:
-            name_element = WebDriverWait(driver, 1).until(
-                EC.presence_of_element_located((By.XPATH, "//span[@itemprop='name']"))
-            )
-            details['property_name'] = name_element.text.strip()
+            # Presence only; the name text is read together with the other fields below
+            with metrics.stage("name_wait"):
+                wait_strategy.wait_for_name(driver)
         except Exception:
             safe_print("  -> ERROR: Could not find Hotel Name. Skipping.")
             return details
 
-            # --- Data Extraction ---
-        details['address'] = extract_text_or_default(driver, By.XPATH, "//span[@itemprop='address']")
-        details['capacity'] = extract_text_or_default(driver, By.CLASS_NAME, "capacitate")
-        details['facilities'] = extract_text_or_default(driver, By.CLASS_NAME, "facilitylist")
-
-        # Images Extraction
-        gallery_links = driver.find_elements(By.XPATH, "//div[contains(@class, 'picture')]//a[@rel='gallery-2']")
-        details['images'] = [urljoin(url, link.get_attribute('href')) for link in gallery_links if
-                             link.get_attribute('href')]
-        safe_print(f"  -> Images: {'✅ SUCCESS' if details['images'] else '❌ FAILURE'}")
-
-        # Description (Force Click & N/A check)
+        # Description (Force Click) - expand first so the single extraction sees the full text
         try:
-            desc_button = driver.find_element(By.ID, "sLongDesc")
-            driver.execute_script("arguments[0].click();", desc_button)
-            time.sleep(0.5)
-            text = driver.find_element(By.XPATH, "//div[@itemprop='description']").text.strip()
-            if text:
-                details['full_description'] = text
+            with metrics.stage("description_expand"):
+                wait_strategy.expand_description(driver)
         except (NoSuchElementException, Exception):
-            details['full_description'] = extract_text_or_default(driver, By.XPATH, "//div[@itemprop='description']")
-
-        safe_print(
-            f"  -> Description: {'✅ SUCCESS' if details['full_description'] != 'N/A' and len(details['full_description']) > 100 else '❌ FAILURE'}")
+            pass
 
-        # Policies Extraction
-        details['politici_copii'] = extract_policy_details_v2(driver, 'Copiii')
-        details['politici_mese'] = extract_policy_details_v2(driver, 'Mesele')
-        details['politici_rezervari'] = extract_policy_details_v2(driver, 'Politica de rezervări')
-        details['politici_plata'] = extract_policy_details_v2(driver, 'Plata')
+        # --- Data Extraction (one execute_script round trip for every static field, policies included) ---
+        with metrics.stage("field_extraction"):
+            details.update(extract_details_js(driver, url))
 
-        safe_print(
-            f"  -> Policies: Copii {'✅' if details['politici_copii'] != 'N/A' else '❌'} | Mese {'✅' if details['politici_mese'] != 'N/A' else '❌'} | Rezervari {'✅' if details['politici_rezervari'] != 'N/A' else '❌'} | Plata {'✅' if details['politici_plata'] != 'N/A' else '❌'}")
+        log_field_status(details)
 
-        # Contact Information (Click Phone Button)
+        # Contact Information (Click Phone Button, unless another run already revealed it)
         try:
-            contact_button_locator = (By.XPATH, "//div[@class='phone vezitel']/a[@class='btn blue darken-1']")
-            contact_button = WebDriverWait(driver, 1).until(EC.element_to_be_clickable(contact_button_locator))
-            contact_button.click()
-
-            phone_locator = (By.CLASS_NAME, "telnr")
-            WebDriverWait(driver, 2).until(
-                lambda driver: "XXX" not in driver.find_element(*phone_locator).text and driver.find_element(
-                    *phone_locator).text.strip() != ''
-            )
-
-            phone_element = driver.find_element(*phone_locator)
-            phone_number = phone_element.text.strip()
-            if phone_number:
-                details['phone_number'] = phone_number
+            contact = contact_cache.get(url) if contact_cache else None
+            if contact is None:
+                with metrics.stage("phone_reveal"):
+                    contact = read_contact_from_driver(driver)
+                if contact_cache:
+                    contact_cache.put(url, contact['phone_number'], contact['owner_name'], details['property_name'])
+            details['phone_number'] = contact['phone_number']
 
             safe_print(f"  -> Contact: ✅ SUCCESS! {details['property_name']}: {details['phone_number']}")
 
         except Exception:
             safe_print(f"  -> Contact: ❌ FAILURE to Click/Extract Phone Number.")
 
+    except WebDriverException as e:
+        driver_broken = True
+        safe_print(f"  -> CRITICAL DRIVER ERROR while scraping {url}: {e}")
+
     except Exception as e:
         safe_print(f"  -> CRITICAL ERROR while scraping {url}: {e}")
 
     finally:
-        # 3. Quit the browser session for this thread
+        # 3. Hand the session back to the pool (it is reset or recycled there), or quit it
+        if driver:
+            with metrics.stage("driver_release"):
+                if pool:
+                    pool.release(driver, broken=driver_broken)
+                else:
+                    driver.quit()
+
+    return details
+
+
+def reveal_contact_in_browser(url, pool=None):
+    """Opens the page in a (pooled) browser only to click the phone button.
+
+    Returns {'property_name', 'phone_number', 'owner_name'}, with 'N/A' for anything that failed.
+    """
+    contact = {'property_name': 'N/A', 'phone_number': 'N/A', 'owner_name': 'N/A'}
+    driver = None
+    driver_broken = False
+    try:
+        with metrics.stage("driver_acquire"):
+            driver = pool.acquire() if pool else get_new_driver()
+        with metrics.stage("driver_get"):
+            pool.open(driver, url) if pool else driver.get(url)
+        with metrics.stage("name_wait"):
+            contact['property_name'] = wait_strategy.wait_for_name(driver).text.strip() or 'N/A'
+        with metrics.stage("phone_reveal"):
+            contact.update(read_contact_from_driver(driver))
+    except WebDriverException as e:
+        # TimeoutException is a WebDriverException too, but it leaves the browser healthy
+        driver_broken = not isinstance(e, TimeoutException)
+    finally:
         if driver:
-            driver.quit()
+            with metrics.stage("driver_release"):
+                if pool:
+                    pool.release(driver, broken=driver_broken)
+                else:
+                    driver.quit()
+    return contact
+
+
+def resolve_contact(url, html=None, property_name='N/A', pool=None, phone_client=None, contact_cache=None):
+    """Returns {'property_name', 'phone_number', 'owner_name'} from the shared cache, the HTTP reveal or the browser.
+
+    Every successful reveal is stored in `contact_cache`, so no phone is revealed twice across runs and modes.
+    """
+    contact = contact_cache.get(url) if contact_cache else None
+    if contact is not None:
+        return {**contact, 'property_name': property_name if property_name != 'N/A' else contact['property_name']}
+
+    with metrics.stage("phone_reveal_http"):
+        revealed = phone_client.reveal(url, html) if phone_client and html is not None else None
+    if revealed:
+        contact = {'property_name': property_name, **revealed}
+    else:
+        contact = reveal_contact_in_browser(url, pool)
+        if property_name != 'N/A':
+            contact['property_name'] = property_name
+
+    if contact_cache:
+        contact_cache.put(url, contact['phone_number'], contact['owner_name'], contact['property_name'])
+    return contact
+
+
+def scrape_url_http(url, total_urls, current_index, session, pool=None, phone_client=None, cache=None,
+                    contact_cache=None):
+    """Fast path: parses the static detail page over HTTP and reveals the phone over HTTP when possible.
+
+    Falls back to the full Selenium scrape when the page cannot be fetched or does not render its name statically.
+    A 4xx page (is_dead_page) raises its HTTPError instead: the scheduler gives up on it without a retry.
+    """
+    details = empty_details(url)
+    safe_print(f"\n[{current_index}/{total_urls}] -> Processing (HTTP): {url}")
+
+    try:
+        with metrics.stage("http_fetch"):
+            html = fetch_page(url, session, cache)
+        with metrics.stage("field_extraction"):
+            details.update(parse_detail_html(html, url))
+    except requests.exceptions.RequestException as e:
+        if is_dead_page(e):
+            safe_print(f"  -> ❌ Page is gone ({e}); not opening it in the browser.")
+            raise
+        safe_print(f"  -> HTTP fetch failed ({e}). Falling back to the browser.")
+        return scrape_url_parallel(url, total_urls, current_index, pool=pool, contact_cache=contact_cache)
+
+    if details['property_name'] == 'N/A':
+        safe_print("  -> Name not in static HTML. Falling back to the browser.")
+        return scrape_url_parallel(url, total_urls, current_index, pool=pool, contact_cache=contact_cache)
+
+    log_field_status(details)
+
+    # Contact Information: shared cache first, then the "vezitel" request; the browser is only a fallback
+    contact = resolve_contact(url, html, details['property_name'], pool, phone_client, contact_cache)
+    details['phone_number'] = contact['phone_number']
+    if details['phone_number'] != 'N/A':
+        safe_print(f"  -> Contact: ✅ SUCCESS! {details['property_name']}: {details['phone_number']}")
+    else:
+        safe_print(f"  -> Contact: ❌ FAILURE to Click/Extract Phone Number.")
 
     return details
 
 
+def scrape_contact_parallel(url, total_urls, current_index, session, pool=None, phone_client=None, cache=None,
+                            contact_cache=None):
+    """Contacts-only mode: returns one hotel_contacts_final.json record (url, property_name, phone_number, owner_name).
+
+    Like scrape_url_http, raises the HTTPError of a 4xx page instead of revealing it in the browser.
+    """
+    safe_print(f"\n[{current_index}/{total_urls}] -> Contact: {url}")
+
+    try:
+        with metrics.stage("http_fetch"):
+            html = fetch_page(url, session, cache)
+        property_name = parse_property_name(html)
+    except requests.exceptions.RequestException as e:
+        if is_dead_page(e):
+            safe_print(f"  -> ❌ Page is gone ({e}).")
+            raise
+        html, property_name = None, 'N/A'
+
+    contact = resolve_contact(url, html, property_name, pool, phone_client, contact_cache)
+    if contact['phone_number'] != 'N/A':
+        safe_print(f"  -> SUCCESS! {contact['property_name']}: {contact['phone_number']}")
+    else:
+        safe_print(f"  -> FAILURE to Click/Extract Phone Number.")
+
+    return {
+        'url': url,
+        'property_name': contact['property_name'],
+        'phone_number': contact['phone_number'],
+        'owner_name': contact['owner_name'],
+    }
+
+
+def report_metrics(prometheus=None):
+    """Prints the run's stage timings, closes the metrics file and writes `prometheus` (a path) if given."""
+    safe_print(metrics.summary())
+    metrics.close()
+    if prometheus:
+        metrics.write_prometheus(prometheus)
+        safe_print(f"📈 Prometheus metrics written to {prometheus}")
+
+
+# --- Retry Pass (missing fields only) ---
+
+def _found(fields, wanted):
+    """The `wanted` entries of extracted `fields` that actually have a value."""
+    return {field: fields[field] for field in wanted if fields.get(field) not in (None, 'N/A', [])}
+
+
+def extract_missing_in_browser(url, fields, pool=None, waits=None):
+    """Opens the page with the long-wait profile and extracts only `fields`. Returns {field: value} for those found."""
+    waits = waits or retry_wait_strategy
+    found = {}
+    driver = None
+    driver_broken = False
+    try:
+        with metrics.stage("driver_acquire"):
+            driver = pool.acquire() if pool else get_new_driver()
+        with metrics.stage("driver_get"):
+            pool.open(driver, url) if pool else driver.get(url)
+        with metrics.stage("name_wait"):
+            waits.wait_for_name(driver)
+
+        static_fields = [field for field in fields if field != 'phone_number']
+        if 'full_description' in static_fields:
+            try:
+                with metrics.stage("description_expand"):
+                    waits.expand_description(driver)
+            except NoSuchElementException:
+                pass
+        if static_fields:
+            with metrics.stage("field_extraction"):
+                found.update(_found(extract_details_js(driver, url), static_fields))
+
+        if 'phone_number' in fields:
+            with metrics.stage("phone_reveal"):
+                contact = read_contact_from_driver(driver, waits)
+            found.update(_found(contact, ('phone_number', 'owner_name')))
+    except WebDriverException as e:
+        # TimeoutException is a WebDriverException too, but it leaves the browser healthy
+        driver_broken = not isinstance(e, TimeoutException)
+    finally:
+        if driver:
+            with metrics.stage("driver_release"):
+                if pool:
+                    pool.release(driver, broken=driver_broken)
+                else:
+                    driver.quit()
+    return found
+
+
+def retry_missing_fields(record, missing, total_urls, current_index, session, pool=None, phone_client=None,
+                         contact_cache=None):
+    """Recovers the `missing` fields of one HotelRecord and merges them into it. Returns the record as a dict.
+
+    Static fields are parsed from a fresh HTTP fetch and the phone comes from the contact cache or the
+    "vezitel" request; only what is still missing after that opens a browser, with the long-wait profile.
+    """
+    url = record.url
+    safe_print(f"\n[{current_index}/{total_urls}] -> Retrying {', '.join(missing)}: {url}")
+    static_fields = [field for field in missing if field != 'phone_number']
+    found, html = {}, None
+
+    try:
+        with metrics.stage("http_fetch"):
+            html = fetch_page(url, session)
+        with metrics.stage("field_extraction"):
+            found.update(_found(parse_detail_html(html, url), static_fields))
+    except requests.exceptions.RequestException as e:
+        if is_dead_page(e):
+            # Nothing left to recover; the pass still counts the attempt against MAX_FIELD_RETRIES
+            safe_print(f"  -> ❌ Page is gone ({e}); nothing recovered.")
+            return record.to_dict()
+        safe_print(f"  -> HTTP fetch failed ({e}).")
+
+    if 'phone_number' in missing:
+        contact = contact_cache.get(url) if contact_cache else None
+        if contact is None and phone_client and html is not None:
+            with metrics.stage("phone_reveal_http"):
+                contact = phone_client.reveal(url, html)
+        if contact:
+            found.update(_found(contact, ('phone_number', 'owner_name')))
+
+    still_missing = [field for field in missing if field not in found]
+    if still_missing:
+        found.update(extract_missing_in_browser(url, still_missing, pool))
+
+    owner_name = found.pop('owner_name', 'N/A')
+    if contact_cache and 'phone_number' in found:
+        contact_cache.put(url, found['phone_number'], owner_name, found.get('property_name', record.property_name))
+    for field, value in found.items():
+        setattr(record, field, value)
+
+    recovered = [field for field in missing if field in found]
+    safe_print(f"  -> Recovered: {', '.join(recovered) if recovered else 'nothing'}")
+    return record.to_dict()
+
+
+def triage(records, fields=CRITICAL_FIELDS, state=None, max_attempts=MAX_FIELD_RETRIES):
+    """Splits records by what they miss.
+
+    Returns (retry list of (record, missing fields), Counter of missing fields over all records,
+    number of records skipped because they already had `max_attempts` retry passes).
+    """
+    retry, missing_counts, exhausted = [], Counter(), 0
+    for record in records:
+        missing = failed_fields(record)
+        missing_counts.update(missing)
+        if not any(field in missing for field in fields):
+            continue
+        if state and state.get(record.url, {}).get('retry_attempts', 0) >= max_attempts:
+            exhausted += 1
+            continue
+        retry.append((record, missing))
+    return retry, missing_counts, exhausted
+
+
+def run_retry_pass(output_file=OUTPUT_FILE, fields=CRITICAL_FIELDS, max_attempts=MAX_FIELD_RETRIES, prometheus=None):
+    """Re-scrapes only the missing fields of records that lack a critical field and merges them into `output_file`."""
+    start_time = time.time()
+    records = load_records(output_file)
+    state = load_json(STATE_FILE, {})
+    retry, missing_counts, exhausted = triage(records, fields, state, max_attempts)
+
+    safe_print(f"🩺 Triage of {len(records)} records in {output_file}: missing " + (", ".join(
+        f"{field} {count}" for field, count in missing_counts.most_common()) or "nothing"))
+    safe_print(f"Retrying {len(retry)} records missing any of {', '.join(fields)}"
+               + (f" ({exhausted} skipped after {max_attempts} retry passes)." if exhausted else "."))
+    if not retry:
+        return
+
+    recovered = Counter()
+    missing_by_url = {record.url: missing for record, missing in retry}
+    tasks = [(record.url, len(retry), i + 1, record, missing) for i, (record, missing) in enumerate(retry)]
+    # Keep the resume checkpoint in step, so a later compaction does not bring the gaps back
+    checkpoint = CheckpointWriter(CHECKPOINT_FILE) if os.path.exists(CHECKPOINT_FILE) else None
+    metrics.reset()
+
+    try:
+        rate_limiter = HostRateLimiter()  # Shared by the HTTP session, the browsers and the scheduler
+        with DriverPool(size=MAX_WORKERS, max_pages=MAX_PAGES_PER_DRIVER, rate_limiter=rate_limiter) as pool, \
+                ContactCache() as contact_cache:
+            session = create_session(pool_size=HTTP_WORKERS, rate_limiter=rate_limiter)
+            phone_client = PhoneRevealClient(session, log=safe_print)
+            scheduler = AdaptiveScheduler(initial_concurrency=MAX_WORKERS, max_concurrency=HTTP_WORKERS,
+                                          is_failure=lambda result: False, log=safe_print, rate_limiter=rate_limiter)
+            retry_one = metrics.timed(lambda args: retry_missing_fields(
+                args[3], args[4], args[1], args[2], session, pool=pool, phone_client=phone_client,
+                contact_cache=contact_cache))
+
+            for result in scheduler.map_unordered(retry_one, tasks):
+                if result is None:
+                    continue
+                url = result['url']
+                gained = set(missing_by_url[url]) - set(failed_fields(result))
+                recovered.update(gained)
+                state.setdefault(url, {})['retry_attempts'] = state.get(url, {}).get('retry_attempts', 0) + 1
+                if gained and checkpoint:
+                    checkpoint.append(result)
+            safe_print(scheduler.summary())
+    finally:
+        # Records are only ever filled in, so whatever was recovered before an error is still worth keeping
+        if checkpoint:
+            checkpoint.close()
+        save_state(state, STATE_FILE)
+        save_records(records, output_file)
+
+    safe_print("\n--- Retry Pass Complete ---")
+    safe_print(f"Total time taken: {time.time() - start_time:.2f} seconds for {len(retry)} records.")
+    safe_print("Recovered: " + (", ".join(f"{field} {count}" for field, count in recovered.most_common())
+                                or "nothing"))
+    report_metrics(prometheus)
+    safe_print(f"✅ Merged into {output_file}")
+
+
+def make_scrape_function(pool, contact_cache, rate_limiter=None):
+    """Returns (scrape, max concurrency) for the configured path; scrape takes a (url, total_urls, index) tuple.
+
+    Every HTTP request of the fast path takes a token from `rate_limiter` (the scheduler's).
+    """
+    if USE_HTTP_FAST_PATH:
+        session = create_session(pool_size=HTTP_WORKERS, rate_limiter=rate_limiter)
+        phone_client = PhoneRevealClient(session, log=safe_print)
+        cache = HttpCache() if USE_HTTP_CACHE else None
+        scrape = lambda args: scrape_url_http(*args, session=session, pool=pool, phone_client=phone_client,
+                                              cache=cache, contact_cache=contact_cache)
+        return metrics.timed(scrape), HTTP_WORKERS
+
+    return metrics.timed(lambda args: scrape_url_parallel(*args, pool=pool, contact_cache=contact_cache)), MAX_WORKERS
+
+
+def run_queue_worker(queue, worker_id=None, batch_size=MAX_WORKERS * 4, poll_interval=5.0, prometheus=None):
+    """Claims batches from the shared WorkQueue until it is drained, reporting each result back to it."""
+    worker_id = worker_id or default_worker_id()
+    scraped = 0
+    metrics.reset()
+
+    rate_limiter = HostRateLimiter()  # Shared by the HTTP session, the browsers and the scheduler
+    with DriverPool(size=MAX_WORKERS, max_pages=MAX_PAGES_PER_DRIVER, rate_limiter=rate_limiter) as pool, \
+            ContactCache() as contact_cache:
+        scrape, worker_count = make_scrape_function(pool, contact_cache, rate_limiter)
+        scheduler = AdaptiveScheduler(initial_concurrency=MAX_WORKERS, max_concurrency=worker_count, log=safe_print,
+                                      rate_limiter=rate_limiter)
+
+        while True:
+            batch = queue.claim(worker_id, batch_size)
+            if not batch:
+                counts = queue.counts()
+                if counts['leased'] == 0:
+                    break
+                # Other workers still hold leases; wait in case they expire and come back to the queue
+                with metrics.idle():
+                    time.sleep(poll_interval)
+                continue
+
+            total = sum(queue.counts().values())
+            safe_print(f"\n📦 Worker {worker_id} claimed {len(batch)} URLs.")
+            with Heartbeat(queue, worker_id):
+                unfinished = {url for url, _ in batch}
+                for result in scheduler.map_unordered(scrape, [(url, total, position) for url, position in batch]):
+                    if result is None:
+                        continue
+                    unfinished.discard(result['url'])
+                    if result['property_name'] == 'N/A':
+                        # Back to the queue (or failed after MAX_ATTEMPTS) instead of exporting an empty record
+                        queue.fail(worker_id, result['url'], "property name not found")
+                        continue
+                    queue.complete(worker_id, result['url'], result)
+                    scraped += 1
+                for url in unfinished:
+                    queue.fail(worker_id, url, "scrape raised an error")
+
+    safe_print(f"\n✅ Worker {worker_id} finished: {scraped} URLs scraped. {scheduler.summary()}")
+    report_metrics(prometheus)
+
+
+def run_contacts_only(all_urls_to_process, output_file=CONTACTS_OUTPUT_FILE, prometheus=None):
+    """Collects contacts for (url, total_urls, index) tuples on the parallel engine and writes `output_file`."""
+    start_time = time.time()
+    contact_data = []
+    metrics.reset()
+
+    rate_limiter = HostRateLimiter()  # Shared by the HTTP session, the browsers and the scheduler
+    with DriverPool(size=MAX_WORKERS, max_pages=MAX_PAGES_PER_DRIVER, rate_limiter=rate_limiter) as pool, \
+            ContactCache() as contact_cache:
+        session = create_session(pool_size=HTTP_WORKERS, rate_limiter=rate_limiter)
+        phone_client = PhoneRevealClient(session, log=safe_print)
+        cache = HttpCache() if USE_HTTP_CACHE else None
+
+        scheduler = AdaptiveScheduler(initial_concurrency=MAX_WORKERS, max_concurrency=HTTP_WORKERS, log=safe_print,
+                                      rate_limiter=rate_limiter)
+        results = {result['url']: result for result in scheduler.map_unordered(
+            metrics.timed(lambda args: scrape_contact_parallel(*args, session=session, pool=pool,
+                                                               phone_client=phone_client, cache=cache,
+                                                               contact_cache=contact_cache)),
+            all_urls_to_process) if result is not None}
+        contact_data = [results[args[0]] for args in all_urls_to_process if args[0] in results]
+        safe_print(scheduler.summary())
+
+    safe_print("\n--- Contact Scraping Complete ---")
+    safe_print(f"Total time taken: {time.time() - start_time:.2f} seconds.")
+    report_metrics(prometheus)
+    safe_print(f"Writing {len(contact_data)} results to {output_file}...")
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(contact_data, f, ensure_ascii=False, indent=4)
+    safe_print(f"✅ Data saved successfully to {output_file}")
+
+
+def load_finished(path=CHECKPOINT_FILE):
+    """{url: HotelRecord} of the checkpoint records scraped successfully (with a property name).
+
+    Finished records stay in memory for the whole run, so they are kept in the compact slotted form.
+    Failed records stay in the checkpoint but are not counted as done, so a resume scrapes them again.
+    """
+    records = load_checkpoint(path, factory=HotelRecord.from_dict, merge=True)
+    return {url: record for url, record in records.items() if record.property_name != 'N/A'}
+
+
 # --- Main Execution (PARALLEL RUN - CORRECTED) ---
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Phase 2: deep scrape every hotel detail page.")
+    parser.add_argument('--incremental', action='store_true',
+                        help="only scrape new, changed or stale hotels from the latest index")
+    parser.add_argument('--stale-days', type=float, default=STALE_AFTER_DAYS,
+                        help="re-scrape unchanged hotels after this many days (incremental mode)")
+    parser.add_argument('--fresh', action='store_true',
+                        help=f"archive {CHECKPOINT_FILE} and scrape every URL instead of resuming")
+    parser.add_argument('--contacts-only', action='store_true',
+                        help=f"only collect name, phone and owner into {CONTACTS_OUTPUT_FILE}")
+    parser.add_argument('--enqueue', action='store_true',
+                        help="put the URL list into the shared work queue instead of scraping it")
+    parser.add_argument('--worker', action='store_true', help="scrape URLs claimed from the shared work queue")
+    parser.add_argument('--queue', default=QUEUE_FILE,
+                        help="shared work queue: a SQLite file on this machine, or the http:// URL of "
+                             "`python work_queue.py serve` on another one")
+    parser.add_argument('--batch-size', type=int, default=MAX_WORKERS * 4, help="URLs claimed per lease (worker)")
+    parser.add_argument('--prometheus', metavar='PATH', help="also write the run's metrics in Prometheus text format")
+    parser.add_argument('--retry-missing', action='store_true',
+                        help=f"re-scrape only the missing fields of records in {OUTPUT_FILE} lacking a critical field")
+    parser.add_argument('--retry-fields', nargs='+', default=list(CRITICAL_FIELDS), metavar='FIELD',
+                        help="critical fields that trigger a retry")
+    cli_args = parser.parse_args()
+
+    if cli_args.retry_missing:
+        # 🩹 Targeted retry pass over the existing output; no new index needed
+        run_retry_pass(fields=cli_args.retry_fields, prometheus=cli_args.prometheus)
+        exit()
+
+    if cli_args.worker:
+        # 🛰️ Queue worker: claims its URLs from the shared queue (file or server), so it needs no local index
+        run_queue_worker(open_queue(cli_args.queue), batch_size=cli_args.batch_size, prometheus=cli_args.prometheus)
+        exit()
+
     all_urls_data = []
 
     # 1. Load data
@@ -194,37 +621,104 @@ if __name__ == '__main__':
         ]
 
         # 🐛 CORRECTED LINE: Using all_urls_to_process for the count
-        safe_print(f"Successfully loaded {len(all_urls_to_process)} hotel URLs. Starting parallel scrape...")
+        safe_print(f"Successfully loaded {len(all_urls_to_process)} hotel URLs.")
 
     except Exception as e:
         safe_print(f"ERROR: Failed to load/parse input file '{INPUT_FILE}': {e}")
         exit()
 
-    # 2. START PARALLEL PROCESSING
+    if cli_args.contacts_only:
+        # 📞 Contacts-only mode on the same parallel engine, sharing the contact cache with full scrapes
+        run_contacts_only(all_urls_to_process, prometheus=cli_args.prometheus)
+        exit()
+
+    hotels_by_url = {hotel['details_url']: hotel for hotel in all_hotels_data if hotel.get('details_url')}
+    state = load_json(STATE_FILE, {})
+    if cli_args.fresh and archive_checkpoint(CHECKPOINT_FILE):
+        safe_print("🗄️ Archived the previous checkpoint; scraping from scratch.")
+    already_done = load_finished(CHECKPOINT_FILE)
+
+    if cli_args.incremental:
+        # 2a. Incremental: diff the new index against the last scrape and only revisit what needs it
+        if not already_done and os.path.exists(OUTPUT_FILE):
+            # No checkpoint (first incremental run, or the last one was archived): seed it with the full output
+            with CheckpointWriter(CHECKPOINT_FILE) as checkpoint:
+                for record in load_json(OUTPUT_FILE, []):
+                    checkpoint.append(record)
+            already_done = load_finished(CHECKPOINT_FILE)
+
+        default_scraped_at = os.path.getmtime(OUTPUT_FILE) if os.path.exists(OUTPUT_FILE) else 0
+        plan = plan_incremental(all_hotels_data, already_done, state, load_json(PREVIOUS_INDEX_FILE, []),
+                                cli_args.stale_days, default_scraped_at)
+        tombstone(state, plan['removed'])
+        to_scrape = set(plan['new']) | set(plan['changed']) | set(plan['stale'])
+        remaining_urls = [args for args in all_urls_to_process if args[0] in to_scrape]
+        safe_print(f"🔎 Incremental plan: {len(plan['new'])} new, {len(plan['changed'])} changed, "
+                   f"{len(plan['stale'])} stale, {len(plan['unchanged'])} unchanged, {len(plan['removed'])} removed.")
+    else:
+        # 2b. Resume: skip every URL already in the checkpoint
+        remaining_urls = [args for args in all_urls_to_process if args[0] not in already_done]
+        if already_done:
+            safe_print(f"♻️ Resuming from {CHECKPOINT_FILE}: {len(already_done)} done, {len(remaining_urls)} remaining.")
+
+    if cli_args.enqueue:
+        # 📬 Distributed mode: hand the URLs to the shared queue; workers claim them with --worker
+        added = open_queue(cli_args.queue).enqueue([args[0] for args in remaining_urls])
+        save_state(state, STATE_FILE)
+        safe_print(f"✅ Enqueued {added} new URLs into {cli_args.queue}. Start workers with --worker, "
+                   f"then export with: python work_queue.py export")
+        exit()
+    safe_print("Starting parallel scrape...")
+
+    # 3. START PARALLEL PROCESSING
     start_time = time.time()
+    completed = 0
+    finished = False
+    metrics.reset()  # Pages/sec counts from here, not from loading the index and checkpoint
 
     try:
-        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            # Map the function to the list of arguments (url, total_urls, index)
-            results = list(executor.map(lambda args: scrape_url_parallel(*args), all_urls_to_process))
-
-            contact_data = [r for r in results if r is not None]
+        # One long-lived Chrome session per browser worker, reused across URLs
+        rate_limiter = HostRateLimiter()  # Shared by the HTTP session, the browsers and the scheduler
+        with DriverPool(size=MAX_WORKERS, max_pages=MAX_PAGES_PER_DRIVER, rate_limiter=rate_limiter) as pool, \
+                CheckpointWriter(CHECKPOINT_FILE) as checkpoint, ContactCache() as contact_cache:
+            scrape, worker_count = make_scrape_function(pool, contact_cache, rate_limiter)
+
+            # 🚦 AIMD concurrency, per-host rate limit and jittered retries around the worker pool
+            scheduler = AdaptiveScheduler(initial_concurrency=MAX_WORKERS, max_concurrency=worker_count,
+                                          log=safe_print, rate_limiter=rate_limiter)
+
+            # 💾 Append each record to the checkpoint the moment its URL finishes
+            for result in scheduler.map_unordered(scrape, remaining_urls):
+                if result is not None:
+                    checkpoint.append(result)
+                    completed += 1
+                    if result['property_name'] != 'N/A' and result['url'] in hotels_by_url:
+                        record_scraped(state, hotels_by_url[result['url']])
+
+            safe_print(scheduler.summary())
+            finished = True
 
     except Exception as e:
         safe_print(f"\n!!! FATAL CRITICAL ERROR during parallel execution: {e}")
-        contact_data = []
+        safe_print(f"    {completed} new results are safe in {CHECKPOINT_FILE}; rerun to resume.")
 
         # --- Final Output ---
     end_time = time.time()
     total_time = end_time - start_time
 
+    save_state(state, STATE_FILE)
+
     safe_print("\n--- Full Data Scraping Complete ---")
-    safe_print(f"Total time taken: {total_time:.2f} seconds.")
-    safe_print(f"Writing {len(contact_data)} results to {OUTPUT_FILE}...")
+    safe_print(f"Total time taken: {total_time:.2f} seconds ({completed} URLs scraped this run).")
+    report_metrics(cli_args.prometheus)
+    safe_print(f"Compacting {CHECKPOINT_FILE} into {OUTPUT_FILE}...")
 
     try:
-        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-            json.dump(contact_data, f, ensure_ascii=False, indent=4)
-        safe_print(f"✅ Data saved successfully to {OUTPUT_FILE}")
+        written = compact_checkpoint(OUTPUT_FILE, CHECKPOINT_FILE, url_order=[args[0] for args in all_urls_to_process],
+                                     factory=HotelRecord.from_dict, merge=True)
+        safe_print(f"✅ {written} results saved successfully to {OUTPUT_FILE}")
+        if finished:
+            # The output now holds everything; the next run starts a new checkpoint instead of resuming this one
+            safe_print(f"🗄️ Checkpoint archived to {archive_checkpoint(CHECKPOINT_FILE)}")
     except Exception as e:
-        safe_print(f"❌ ERROR: Could not write final output file: {e}")
\ No newline at end of file
+        safe_print(f"❌ ERROR: Could not write final output file: {e}")
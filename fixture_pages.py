@@ -0,0 +1,245 @@
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import json
+import re
+import threading
+import time
+
+# --- Configuration ---
+BASE_URL = "https://www.turistinfo.ro"
+LISTINGS_FILE = "hotels_for_deep_scrape.json"
+DETAILS_FILE = "hotel_full_details.json"
+CONTACTS_FILE = "hotel_contacts_final.json"
+LISTING_PATH = "/brasov/cazare-hoteluri-vile-pensiuni-brasov.html"
+LISTING_PAGE_SIZE = 20  # Hotels per fixture listing page (the rest goes to "-2.html", "-3.html", ...)
+REVEAL_PATH = "/ajax/vezitel.php"
+MASKED_PHONE = "07XX XXX XXX"
+
+
+# --- Listing Page Rendering ---
+# Rebuilds turistinfo.ro-style listing markup from Phase 1 records, so parsers can be
+# benchmarked and checked offline: parsing a rendered page must give the records back.
+
+def _site_path(url, base_url=BASE_URL):
+    return url[len(base_url):] if url.startswith(base_url) else url
+
+
+def render_listing_item(hotel, base_url=BASE_URL):
+    """Renders one <li class="liste-unitate"> the way the live site marks it up."""
+    stars = ""
+    if hotel['star_rating'] != "N/A":
+        star_count = int(hotel['star_rating'].split()[0])
+        stars = ('<span style="white-space: nowrap;">'
+                 + '<i class="material-icons stars">star</i>' * star_count + '</span>')
+
+    parts = ['<li class="liste-unitate">', '<div class="col">']
+    if hotel['image_url'] != "N/A":
+        parts.append(f'<img itemprop="image" src="{escape(_site_path(hotel["image_url"], base_url))}" alt="">')
+    parts.append('</div><div class="col">')
+    if hotel['details_url'] != "N/A":
+        parts.append(f'<h3><a href="{escape(_site_path(hotel["details_url"], base_url))}">'
+                     f'<span itemprop="name">{escape(hotel["name"])}</span></a> {stars}</h3>')
+    else:
+        parts.append(f'<h3><span itemprop="name">{escape(hotel["name"])}</span> {stars}</h3>')
+    if hotel['address'] != "N/A":
+        parts.append(f'<span itemprop="address">{escape(hotel["address"])}</span>')
+    if hotel['reviews'] != "N/A":
+        parts.append(f'<div class="ucrecenzii"><i class="material-icons">question_answer</i> '
+                     f'{escape(hotel["reviews"])}</div>')
+    if hotel['capacity'] != "N/A":
+        parts.append(f'<div class="uclocuri"><i class="material-icons">supervisor_account</i> '
+                     f'{escape(hotel["capacity"])}</div>')
+    if hotel['description'] != "N/A":
+        parts.append(f'<p itemprop="description">{escape(hotel["description"])}</p>')
+    if hotel['price'] != "N/A":
+        parts.append(f'<div itemprop="priceRange">{escape(hotel["price"])}</div>')
+    parts.append('</div></li>')
+    return "".join(parts)
+
+
+def render_listing_page(hotels, page_links=(), base_url=BASE_URL, title="Cazare Brașov"):
+    """Renders a full listing page: header noise, the ul.liste-cazare block and pagination links."""
+    pagination = "".join(f'<a href="{escape(href)}">{label}</a>' for label, href in page_links)
+    items = "\n".join(render_listing_item(hotel, base_url) for hotel in hotels)
+    return f"""<!DOCTYPE html>
+<html lang="ro"><head><meta charset="utf-8"><title>{escape(title)}</title></head>
+<body>
+<nav class="menu">{'<a href="/">TuristInfo</a>' * 40}</nav>
+<h1>{escape(title)}</h1>
+<ul class="liste-cazare">
+{items}
+</ul>
+<div class="pagination">{pagination}</div>
+<footer>{'<p>Informații turistice</p>' * 40}</footer>
+</body></html>"""
+
+
+# --- Detail Page Rendering ---
+# Detail pages carry the markup detail_extraction.py reads: itemprop name/address/description,
+# .capacitate, .facilitylist, the h2.titlu policy sections, the gallery and the "vezitel" button.
+# Text keeps its blank lines (<br><br>), and the facilities' "check" marks are icon elements
+# inline with their entry, as on the live site.
+
+def _multiline(text, icons=False):
+    lines = []
+    for line in text.split("\n"):
+        if icons and line.startswith("check "):
+            lines.append(f'<i class="material-icons">check</i> {escape(line[len("check "):])}')
+        else:
+            lines.append(escape(line))
+    return "<br>".join(lines)
+
+
+def browser_text(text):
+    """`text` as the browser shows it once written into HTML: runs of whitespace collapse and lines are trimmed."""
+    return "\n".join(" ".join(part for part in re.split(r'[ \t\r\f]+', line) if part)
+                     for line in text.split("\n")).strip()
+
+
+def render_detail_page(details, reveal_url=None):
+    """Renders a hotel_full_details.json record as a turistinfo.ro-style detail page (phone masked)."""
+    parts = ['<div class="header">', f'<h1><span itemprop="name">{escape(details["property_name"])}</span></h1>']
+    if details['address'] != "N/A":
+        parts.append(f'<span itemprop="address">{_multiline(details["address"])}</span>')
+    parts.append('</div>')
+    if details['capacity'] != "N/A":
+        parts.append(f'<div class="capacitate">{_multiline(details["capacity"])}</div>')
+    if reveal_url:
+        parts.append(f'<div class="phone vezitel"><a href="#" data-url="{escape(reveal_url)}">'
+                     f'<span class="telnr">{MASKED_PHONE}</span> vezi telefon</a></div>')
+    if details['full_description'] != "N/A":
+        parts.append(f'<div itemprop="description">{_multiline(details["full_description"])}</div>'
+                     '<a class="sLongDesc" href="#">citește mai mult</a>')
+    if details['facilities'] != "N/A":
+        parts.append(f'<div class="facilitylist">{_multiline(details["facilities"], icons=True)}</div>')
+    for key, title in (('politici_copii', 'Copiii'), ('politici_mese', 'Mesele'),
+                       ('politici_rezervari', 'Politica de rezervări'), ('politici_plata', 'Plata')):
+        if details[key] != "N/A":
+            parts.append(f'<h2 class="titlu">{title}</h2><div>{_multiline(details[key])}</div>')
+    gallery = "".join(f'<a rel="gallery-2" href="{escape(image)}"><img src="{escape(image)}" alt=""></a>'
+                      for image in details['images'])
+    parts.append(f'<div class="pictures">{gallery}</div>')
+
+    return f"""<!DOCTYPE html>
+<html lang="ro"><head><meta charset="utf-8"><title>{escape(details["property_name"])}</title></head>
+<body>
+<nav class="menu">{'<a href="/">TuristInfo</a>' * 40}</nav>
+{"".join(parts)}
+<footer>{'<p>Informații turistice</p>' * 40}</footer>
+</body></html>"""
+
+
+def expected_detail_record(details):
+    """The record parse_detail_html (and the browser path) should return for render_detail_page(details).
+
+    The phone is left out. Text fields are what a browser shows for them (browser_text): blank
+    lines and inline icons are kept, so a parser that drops or splits lines does not match.
+    """
+    expected = {'url': details['url']}
+    for key, value in details.items():
+        if key in ('url', 'phone_number', 'images'):
+            continue
+        if value != "N/A":
+            value = browser_text(value) or "N/A"
+        expected[key] = value
+    expected['images'] = list(details['images'])
+    return expected
+
+
+def load_listings(path=LISTINGS_FILE):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# --- Local Fixture Site ---
+
+class FixtureSite:
+    """Local HTTP server that mimics turistinfo.ro for offline benchmarks.
+
+    Serves the listing (paginated like the live site), one detail page per details record at the
+    same path as on turistinfo.ro, and a fake "vezitel" endpoint that answers after
+    `reveal_latency` seconds. `page_latency` delays every listing and detail page.
+    """
+
+    def __init__(self, listings, details, contacts=(), page_latency=0.0, reveal_latency=0.0,
+                 page_size=LISTING_PAGE_SIZE, host="127.0.0.1", port=0):
+        self.page_latency = page_latency
+        self.reveal_latency = reveal_latency
+        self.requests_served = 0
+        owners = {contact['url']: contact.get('owner_name', 'N/A') for contact in contacts}
+
+        stem = LISTING_PATH[:-len('.html')]
+        chunks = [listings[i:i + page_size] for i in range(0, len(listings), page_size)] or [[]]
+        page_paths = [LISTING_PATH] + [f"{stem}-{n}.html" for n in range(2, len(chunks) + 1)]
+        page_links = [(str(n), path) for n, path in enumerate(page_paths, start=1)]
+        self.pages = {path: render_listing_page(chunk, page_links) for path, chunk in zip(page_paths, chunks)}
+
+        self.reveals = {}
+        for index, record in enumerate(details):
+            reveal_url = f"{REVEAL_PATH}?id={index}"
+            self.pages[_site_path(record['url'])] = render_detail_page(record, reveal_url)
+            phone = record['phone_number'] if record['phone_number'] != "N/A" else MASKED_PHONE
+            self.reveals[str(index)] = json.dumps(
+                {'telnr': phone, 'owner': owners.get(record['url'], 'N/A')}, ensure_ascii=False)
+
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def listing_url(self):
+        return self.base_url + LISTING_PATH
+
+    def local_url(self, url):
+        """Maps a turistinfo.ro URL to the same path on this server."""
+        return self.base_url + _site_path(url)
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the live site
+
+            def do_GET(self):
+                split = urlsplit(self.path)
+                site.requests_served += 1
+                if split.path == REVEAL_PATH:
+                    time.sleep(site.reveal_latency)
+                    body = site.reveals.get(parse_qs(split.query).get('id', [''])[0])
+                    content_type = "application/json"
+                else:
+                    time.sleep(site.page_latency)
+                    body = site.pages.get(split.path)
+                    content_type = "text/html; charset=utf-8"
+
+                data = (body if body is not None else "Not Found").encode('utf-8')
+                self.send_response(200 if body is not None else 404)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -0,0 +1,280 @@
+from amenities import AMENITY_GROUPS, amenity_entries
+from anliza_date import add_features, read_parquet_details
+from checkpoint import iter_json_records
+import argparse
+import json
+import os
+import re
+import time
+import numpy as np
+import pandas as pd
+
+# --- Configuration ---
+DETAILS_FILE = "hotel_full_details.json"  # JSON, JSONL checkpoint or Parquet export
+LISTINGS_FILE = "hotels_for_deep_scrape.json"  # Phase 1 output; the only source of star ratings
+INDEX_FILE = "hotel_index.npz"
+INDEX_VERSION = 2
+
+# Columns kept per hotel and returned by lookups
+ROW_FIELDS = ('url', 'property_name', 'locality', 'star_rating', 'total_capacity', 'photo_count', 'payment_method',
+              'accepts_children', 'phone_number')
+# Inverted indexes: value -> sorted row ids
+INVERTED_FIELDS = ('locality', 'star_rating', 'payment_method', 'accepts_children', 'amenities')
+# Sorted arrays for range lookups
+RANGE_FIELDS = ('total_capacity', 'photo_count')
+
+# Shorthands expanded to several index values (a hotel matches if it has any of them); the amenity
+# shorthands are the AMENITY_GROUPS, expanded to every indexed entry starting with the group's prefix
+ALIASES = {
+    'payment_method': {'card': ('Card or Cash', 'Card Only'), 'cash': ('Card or Cash', 'Cash Only')},
+    'accepts_children': {'yes': ('Children Accepted',), 'no': ('Children Not Accepted',)},
+}
+STAR_PATTERN = re.compile(r'(\d+)')
+
+
+def parse_star_rating(text):
+    """"3 stars" -> 3; unrated listings ("N/A") -> 0."""
+    match = STAR_PATTERN.search(text) if isinstance(text, str) else None
+    return int(match.group(1)) if match else 0
+
+
+def file_signature(path):
+    """(path, size, mtime) of a source file, or None when it does not exist."""
+    if not path or not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
+
+
+def load_details(path=DETAILS_FILE):
+    if path.endswith('.parquet'):
+        return read_parquet_details(path)
+    if path.endswith('.jsonl'):
+        return pd.DataFrame(list(iter_json_records(path)))
+    return pd.read_json(path)
+
+
+def _postings(values):
+    """{value: sorted row ids} for a column."""
+    codes, uniques = pd.factorize(pd.Series(values), sort=True)
+    order = np.argsort(codes, kind='stable').astype(np.int32)
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    return {uniques[i]: order[bounds[i]:bounds[i + 1]] for i in range(len(uniques))}
+
+
+class HotelIndex:
+    """In-memory query index over the scraped hotels.
+
+    Categorical fields (locality, star rating, payment method, child policy, amenities) have
+    inverted indexes of sorted row ids; capacity and photo count are kept sorted for range
+    lookups. A query intersects the matching id lists, smallest first. The index is saved as
+    one .npz file and rebuilt only when the source files change.
+    """
+
+    def __init__(self, rows, postings, ranges, sources=None):
+        self.rows = rows  # field -> array, one entry per hotel
+        self.postings = postings  # field -> {value: sorted int32 row ids}
+        self.ranges = ranges  # field -> (sorted values, row ids in that order)
+        self.sources = sources or {}
+        self._lookup = {field: {str(value).casefold(): value for value in values}
+                        for field, values in postings.items()}
+
+    def __len__(self):
+        return len(self.rows['url'])
+
+    # --- Building ---
+
+    @classmethod
+    def build(cls, details_path=DETAILS_FILE, listings_path=LISTINGS_FILE):
+        df = load_details(details_path)
+        add_features(df)  # parse_locality / parse_capacity / parse_payment_method / amenity masks, as in Phase 3
+        if 'photo_count' not in df:
+            df['photo_count'] = 0
+
+        stars = {}
+        if listings_path and os.path.exists(listings_path):
+            with open(listings_path, 'r', encoding='utf-8') as f:
+                stars = {hotel['details_url']: parse_star_rating(hotel.get('star_rating')) for hotel in json.load(f)}
+        df['star_rating'] = [stars.get(url, 0) for url in df['url']]
+
+        # Fixed-width numpy arrays only, so the saved index loads without pickle
+        numeric = {'star_rating': np.int64, 'total_capacity': np.float64, 'photo_count': np.int64}
+        rows = {field: df[field].to_numpy(dtype=numeric[field]) if field in numeric
+                else df[field].astype(str).to_numpy(dtype=str) for field in ROW_FIELDS}
+
+        postings = {field: _postings(rows[field]) for field in INVERTED_FIELDS if field != 'amenities'}
+        # Every listed entry, not only the 63 of the bitmask vocabulary
+        names, hotel_ids, entry_ids = amenity_entries(df['facilities'])
+        order = np.lexsort((hotel_ids, entry_ids))
+        bounds = np.searchsorted(entry_ids[order], np.arange(len(names) + 1))
+        postings['amenities'] = {name: hotel_ids[order[bounds[i]:bounds[i + 1]]] for i, name in enumerate(names)}
+
+        ranges = {}
+        for field in RANGE_FIELDS:
+            order = np.argsort(rows[field], kind='stable').astype(np.int32)
+            ranges[field] = (rows[field][order], order)
+
+        sources = {'version': INDEX_VERSION, 'details': file_signature(details_path),
+                   'listings': file_signature(listings_path)}
+        return cls(rows, postings, ranges, sources)
+
+    # --- Persistence ---
+
+    def save(self, path=INDEX_FILE):
+        arrays = {f"row_{field}": values for field, values in self.rows.items()}
+        for field, postings in self.postings.items():
+            keys = list(postings)
+            arrays[f"keys_{field}"] = np.array([str(key) for key in keys]) if field != 'star_rating' else np.array(keys)
+            arrays[f"offsets_{field}"] = np.cumsum([0] + [len(postings[key]) for key in keys])
+            arrays[f"ids_{field}"] = np.concatenate([postings[key] for key in keys] or [np.empty(0, np.int32)])
+        for field, (values, order) in self.ranges.items():
+            arrays[f"range_{field}"] = values
+            arrays[f"order_{field}"] = order
+        arrays['sources'] = np.array(json.dumps(self.sources))
+        with open(path, 'wb') as f:  # A file object, so numpy does not append ".npz" to the name
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        with np.load(path, allow_pickle=False) as data:
+            rows = {field: data[f"row_{field}"] for field in ROW_FIELDS}
+            postings = {}
+            for field in INVERTED_FIELDS:
+                keys, offsets, ids = data[f"keys_{field}"], data[f"offsets_{field}"], data[f"ids_{field}"]
+                postings[field] = {key.item(): ids[offsets[i]:offsets[i + 1]] for i, key in enumerate(keys)}
+            ranges = {field: (data[f"range_{field}"], data[f"order_{field}"]) for field in RANGE_FIELDS}
+            sources = json.loads(data['sources'].item())
+        return cls(rows, postings, ranges, sources)
+
+    # --- Queries ---
+
+    def _ids_for(self, field, values):
+        """Union of the postings of `values` (aliases expanded, case-insensitive).
+
+        Values nobody has match no hotel; amenities no hotel lists raise KeyError (most likely a typo).
+        """
+        if isinstance(values, (str, int)):
+            values = [values]
+        lists = []
+        for value in values:
+            keys = ALIASES.get(field, {}).get(str(value).casefold(), (value,))
+            if field == 'amenities' and str(value).casefold() in AMENITY_GROUPS:
+                prefix = AMENITY_GROUPS[str(value).casefold()]
+                keys = [name for name in self.postings[field] if name.startswith(prefix)]
+            for key in keys:
+                key = self._lookup[field].get(str(key).casefold(), key)
+                if key in self.postings[field]:
+                    lists.append(self.postings[field][key])
+                elif field == 'amenities':
+                    raise KeyError(f"Unknown amenity: {value!r}")
+        if len(lists) == 1:
+            return lists[0]
+        return np.unique(np.concatenate(lists)) if lists else np.empty(0, dtype=np.int32)
+
+    def _ids_between(self, field, low=None, high=None):
+        values, order = self.ranges[field]
+        start = 0 if low is None else np.searchsorted(values, low, side='left')
+        stop = len(values) if high is None else np.searchsorted(values, high, side='right')
+        return np.sort(order[start:stop])
+
+    def query(self, locality=None, stars=None, payment=None, children=None, amenities=(),
+              min_capacity=None, max_capacity=None, min_photos=None, max_photos=None):
+        """Row ids (ascending) of the hotels matching every given filter.
+
+        `locality`, `stars`, `payment` and `children` take one value or a list (any of them);
+        `amenities` are all required, each one a facilities entry (e.g. "piscină") or an alias such as "parking".
+        """
+        candidates = []
+        for field, values in (('locality', locality), ('star_rating', stars), ('payment_method', payment),
+                              ('accepts_children', children)):
+            if values is not None:
+                candidates.append(self._ids_for(field, values))
+        for amenity in ([amenities] if isinstance(amenities, str) else amenities):
+            candidates.append(self._ids_for('amenities', amenity))
+        if min_capacity is not None or max_capacity is not None:
+            candidates.append(self._ids_between('total_capacity', min_capacity, max_capacity))
+        if min_photos is not None or max_photos is not None:
+            candidates.append(self._ids_between('photo_count', min_photos, max_photos))
+
+        if not candidates:
+            return np.arange(len(self), dtype=np.int32)
+        candidates.sort(key=len)
+        ids = candidates[0]
+        for other in candidates[1:]:
+            if not len(ids):
+                break
+            ids = np.intersect1d(ids, other, assume_unique=True)
+        return ids
+
+    def records(self, ids):
+        """The stored fields of the given rows as dicts."""
+        return [{field: self.rows[field][i].item() for field in ROW_FIELDS} for i in ids]
+
+    def values(self, field):
+        """Distinct values of an inverted index with their hotel counts."""
+        return {key: len(ids) for key, ids in self.postings[field].items()}
+
+
+def open_index(details_path=DETAILS_FILE, listings_path=LISTINGS_FILE, index_path=INDEX_FILE, rebuild=False):
+    """Loads the saved index, rebuilding (and saving) it when missing or older than the source files."""
+    sources = {'version': INDEX_VERSION, 'details': file_signature(details_path),
+               'listings': file_signature(listings_path)}
+    if not rebuild and os.path.exists(index_path):
+        try:
+            index = HotelIndex.load(index_path)
+            if index.sources == sources:
+                return index
+        except (OSError, ValueError, KeyError):
+            pass
+    index = HotelIndex.build(details_path, listings_path)
+    index.save(index_path)
+    return index
+
+
+# --- Command Line ---
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Filtered lookups over the scraped hotels.",
+                                     epilog='Example: --locality Râșnov --min-capacity 10 --amenity parking --payment card')
+    parser.add_argument('--details', default=DETAILS_FILE)
+    parser.add_argument('--listings', default=LISTINGS_FILE)
+    parser.add_argument('--index', default=INDEX_FILE)
+    parser.add_argument('--rebuild', action='store_true', help="rebuild the saved index")
+    parser.add_argument('--locality', action='append')
+    parser.add_argument('--stars', type=int, action='append', help="star rating, 0 for unrated")
+    parser.add_argument('--payment', action='append', help="'card', 'cash' or a payment category")
+    parser.add_argument('--children', action='append', help="'yes', 'no' or a child policy category")
+    parser.add_argument('--amenity', action='append', default=[],
+                        help="required amenity (any facilities entry, 'wifi' or 'parking'); repeatable")
+    parser.add_argument('--min-capacity', type=float)
+    parser.add_argument('--max-capacity', type=float)
+    parser.add_argument('--min-photos', type=int)
+    parser.add_argument('--max-photos', type=int)
+    parser.add_argument('--values', choices=INVERTED_FIELDS, help="list the indexed values of a field and exit")
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = open_index(args.details, args.listings, args.index, rebuild=args.rebuild)
+    print(f"Index of {len(index)} hotels ready in {(time.perf_counter() - start) * 1000:.1f} ms.")
+
+    if args.values:
+        for value, count in sorted(index.values(args.values).items(), key=lambda item: -item[1]):
+            print(f"{count:>6}  {value}")
+    else:
+        start = time.perf_counter()
+        try:
+            ids = index.query(locality=args.locality, stars=args.stars, payment=args.payment, children=args.children,
+                              amenities=args.amenity, min_capacity=args.min_capacity, max_capacity=args.max_capacity,
+                              min_photos=args.min_photos, max_photos=args.max_photos)
+        except KeyError as e:
+            print(f"❌ {e.args[0]} (see --values amenities)")
+            raise SystemExit(1)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"✅ {len(ids)} hotels match ({elapsed:.3f} ms).\n")
+        for record in index.records(ids[:args.limit]):
+            stars = f"{record['star_rating']}★" if record['star_rating'] else "--"
+            print(f"{record['property_name'][:40]:<42}{record['locality']:<14}{stars:<4}"
+                  f"{record['total_capacity']:>5.0f} pers  {record['payment_method']:<13}{record['url']}")
+        if len(ids) > args.limit:
+            print(f"... and {len(ids) - args.limit} more (--limit)")
@@ -0,0 +1,144 @@
+from array import array
+from checkpoint import iter_json_records, write_json_array
+import argparse
+import re
+import sys
+import tracemalloc
+
+# --- Configuration ---
+INPUT_FILE = "hotel_full_details.json"
+IMAGE_URL_TEMPLATE = "https://www.turistinfo.ro/images/cazare/{}.jpg"
+IMAGE_URL_PATTERN = re.compile(r'^https://www\.turistinfo\.ro/images/cazare/(\d+)\.jpg$')
+IMAGE_ID_MAX = 2 ** 32 - 1  # array('I') holds unsigned 32-bit ids
+
+# Key order of the details JSON schema (as empty_details builds it)
+RECORD_FIELDS = ('url', 'property_name', 'address', 'phone_number', 'full_description', 'capacity', 'images',
+                 'politici_copii', 'politici_mese', 'politici_rezervari', 'politici_plata', 'facilities')
+# Fields whose texts repeat across hotels: one shared string object per distinct value
+INTERNED_FIELDS = ('capacity', 'politici_copii', 'politici_mese', 'politici_rezervari', 'politici_plata', 'facilities')
+TEXT_FIELDS = tuple(field for field in RECORD_FIELDS if field != 'images')
+
+
+def intern_text(value):
+    """One shared string object per distinct text; sys.intern does not keep a text alive once no record uses it."""
+    if not isinstance(value, str):
+        return value
+    return sys.intern(value)
+
+
+class HotelRecord:
+    """Compact in-memory form of one hotel_full_details.json record.
+
+    Slots instead of a per-record dict; the policy, capacity and facilities texts (and every
+    "N/A") point to one shared string per distinct value; gallery images are kept as an
+    array('I') of the numeric ids in .../images/cazare/<id>.jpg, and the URLs are rebuilt on
+    access. A gallery with any other URL shape is kept as a tuple of URLs instead.
+    to_dict() returns the record in the current JSON schema, key order included.
+    """
+
+    __slots__ = TEXT_FIELDS + ('_image_ids', '_image_urls')
+
+    def __init__(self, url, property_name='N/A', address='N/A', phone_number='N/A', full_description='N/A',
+                 capacity='N/A', images=(), politici_copii='N/A', politici_mese='N/A', politici_rezervari='N/A',
+                 politici_plata='N/A', facilities='N/A'):
+        self.url = url
+        self.property_name = property_name
+        self.address = intern_text(address) if address == 'N/A' else address
+        self.phone_number = intern_text(phone_number) if phone_number == 'N/A' else phone_number
+        self.full_description = intern_text(full_description) if full_description == 'N/A' else full_description
+        self.capacity = intern_text(capacity)
+        self.politici_copii = intern_text(politici_copii)
+        self.politici_mese = intern_text(politici_mese)
+        self.politici_rezervari = intern_text(politici_rezervari)
+        self.politici_plata = intern_text(politici_plata)
+        self.facilities = intern_text(facilities)
+        self.images = images
+
+    @classmethod
+    def from_dict(cls, record):
+        """Builds a record from a details dict (keys outside the schema are dropped)."""
+        return cls(**{field: record[field] for field in RECORD_FIELDS if field in record})
+
+    # --- Images ---
+
+    @property
+    def images(self):
+        """The gallery URLs, rebuilt from the stored ids."""
+        if self._image_urls is not None:
+            return list(self._image_urls)
+        return [IMAGE_URL_TEMPLATE.format(image_id) for image_id in self._image_ids]
+
+    @images.setter
+    def images(self, urls):
+        ids = array('I')
+        for url in urls or ():
+            match = IMAGE_URL_PATTERN.match(url) if isinstance(url, str) else None
+            # Keep "0123"-style ids as URLs too: the int would not rebuild the same string
+            if match is None or int(match.group(1)) > IMAGE_ID_MAX or str(int(match.group(1))) != match.group(1):
+                self._image_ids, self._image_urls = None, tuple(urls)
+                return
+            ids.append(int(match.group(1)))
+        self._image_ids, self._image_urls = ids, None
+
+    @property
+    def image_count(self):
+        return len(self._image_urls if self._image_urls is not None else self._image_ids)
+
+    # --- Dict Interface ---
+
+    def to_dict(self):
+        """The record in the details JSON schema."""
+        return {field: getattr(self, field) for field in RECORD_FIELDS}
+
+    def __getitem__(self, field):
+        if field not in RECORD_FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def get(self, field, default=None):
+        return getattr(self, field) if field in RECORD_FIELDS else default
+
+    def __eq__(self, other):
+        if isinstance(other, HotelRecord):
+            other = other.to_dict()
+        return isinstance(other, dict) and self.to_dict() == other
+
+    def __repr__(self):
+        return f"HotelRecord({self.url!r}, {self.property_name!r}, {self.image_count} images)"
+
+
+def load_records(path=INPUT_FILE):
+    """Reads a details JSON array or JSONL checkpoint into HotelRecords, one record at a time."""
+    return [HotelRecord.from_dict(record) for record in iter_json_records(path)]
+
+
+def save_records(records, path=INPUT_FILE):
+    """Writes HotelRecords (or dicts) in the hotel_full_details.json format. Returns the record count."""
+    return write_json_array(path, records)
+
+
+# --- Memory Comparison ---
+
+def measure(load):
+    """(result, bytes allocated and still held) of load()."""
+    tracemalloc.start()
+    result = load()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, held
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Memory held by dict records vs HotelRecord for a details file.")
+    parser.add_argument('--input', default=INPUT_FILE, help="details JSON array or JSONL checkpoint")
+    args = parser.parse_args()
+
+    dicts, dict_bytes = measure(lambda: list(iter_json_records(args.input)))
+    records, record_bytes = measure(lambda: load_records(args.input))
+    same = all(record.to_dict() == record_dict for record, record_dict in zip(records, dicts)) and len(records) == len(dicts)
+
+    print(f"{len(dicts)} records from {args.input}")
+    print(f"  dicts:       {dict_bytes / 1024 / 1024:>8.2f} MB ({dict_bytes / max(len(dicts), 1) / 1024:.1f} KB/record)")
+    print(f"  HotelRecord: {record_bytes / 1024 / 1024:>8.2f} MB ({record_bytes / max(len(records), 1) / 1024:.1f} KB/record)")
+    print(f"  {dict_bytes / max(record_bytes, 1):.1f}x smaller, "
+          f"{'✅ round-trips to the same JSON' if same else '❌ round-trip DIFFERS'}")
@@ -0,0 +1,291 @@
+from amenities import AMENITY_VOCABULARY_ID, VOCABULARY_METADATA_KEY, amenity_mask
+from detail_extraction import POLICY_TITLES
+import argparse
+import json
+import sqlite3
+import time
+
+# --- Configuration ---
+DB_FILE = "hotels.sqlite3"
+PARQUET_FILE = "hotel_full_details.parquet"
+JSON_FILES = {
+    'listings': "hotels_for_deep_scrape.json",
+    'details': "hotel_full_details.json",
+    'contacts': "hotel_contacts_final.json",
+}
+BATCH_SIZE = 5000  # Rows per executemany during bulk upserts
+
+# Column order of each record type (the same keys the JSON files use)
+LISTING_FIELDS = ('details_url', 'name', 'star_rating', 'address', 'reviews', 'capacity', 'description', 'price',
+                  'image_url')
+DETAIL_FIELDS = ('url', 'property_name', 'address', 'phone_number', 'full_description', 'capacity', 'images',
+                 'politici_copii', 'politici_mese', 'politici_rezervari', 'politici_plata', 'facilities')
+CONTACT_FIELDS = ('url', 'property_name', 'phone_number', 'owner_name')
+
+# Policy texts repeat across thousands of hotels: stored once in `texts` and referenced by id
+DICTIONARY_FIELDS = tuple(POLICY_TITLES)
+# Columns exported as pandas categoricals, i.e. dictionary-encoded in Parquet
+CATEGORY_COLUMNS = DICTIONARY_FIELDS + ('capacity',)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS texts (
+    id INTEGER PRIMARY KEY,
+    value TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS listings (
+    details_url TEXT PRIMARY KEY,
+    {", ".join(f"{field} TEXT" for field in LISTING_FIELDS[1:])},
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS details (
+    url TEXT PRIMARY KEY,
+    {", ".join(f"{field} INTEGER REFERENCES texts (id)" if field in DICTIONARY_FIELDS else f"{field} TEXT"
+               for field in DETAIL_FIELDS[1:])},
+    amenities INTEGER,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS contacts (
+    url TEXT PRIMARY KEY,
+    {", ".join(f"{field} TEXT" for field in CONTACT_FIELDS[1:])},
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS details_phone_number ON details (phone_number);
+CREATE INDEX IF NOT EXISTS contacts_phone_number ON contacts (phone_number);
+"""
+# Derived details columns, kept in sync with their source field on every write: column -> (source
+# field, derive function, version). A database whose column was filled under another version is recomputed.
+DERIVED_COLUMNS = {'amenities': ('facilities', amenity_mask, AMENITY_VOCABULARY_ID)}
+
+TABLES = {
+    'listings': ('details_url', LISTING_FIELDS),
+    'details': ('url', DETAIL_FIELDS),
+    'contacts': ('url', CONTACT_FIELDS),
+}
+
+
+class HotelStore:
+    """Indexed SQLite storage for listings, details and contacts, keyed by URL.
+
+    Records go in and come out as the same dicts the JSON files hold. Writes are upserts, so a
+    re-scrape only rewrites the rows it touched; policy texts are dictionary-encoded in a shared
+    `texts` table, each details row carries its amenity bitmask (see amenities.py), and
+    `export_parquet` writes the details as columnar Parquet for the analysis.
+    """
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._text_ids = {}
+        self._sync_derived_columns()
+
+    def _sync_derived_columns(self):
+        """Adds the derived columns missing from an older database and recomputes those filled under another version."""
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(details)")}
+        for column, (source, derive, version) in DERIVED_COLUMNS.items():
+            stored = self.conn.execute("SELECT value FROM meta WHERE key = ?", (f"{column}_version",)).fetchone()
+            if column in existing and stored is not None and stored[0] == version:
+                continue
+            with self.conn:
+                if column not in existing:
+                    self.conn.execute(f"ALTER TABLE details ADD COLUMN {column} INTEGER")
+                rows = self.conn.execute(f"SELECT url, {source} FROM details").fetchall()
+                self.conn.executemany(f"UPDATE details SET {column} = ? WHERE url = ?",
+                                      [(derive(value), url) for url, value in rows])
+                self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (f"{column}_version", version))
+
+    # --- Dictionary Encoding ---
+
+    def _encode_texts(self, values):
+        """Returns {text: id} for `values`, inserting the ones not stored yet."""
+        missing = {value for value in values if value is not None and value not in self._text_ids}
+        if missing:
+            self.conn.executemany("INSERT OR IGNORE INTO texts (value) VALUES (?)", [(value,) for value in missing])
+            for value in missing:
+                self._text_ids[value] = self.conn.execute("SELECT id FROM texts WHERE value = ?", (value,)).fetchone()[0]
+        return self._text_ids
+
+    def _to_row(self, table, record, text_ids=None):
+        _, fields = TABLES[table]
+        row = []
+        for field in fields:
+            value = record.get(field, [] if field == 'images' else "N/A")
+            if field == 'images':
+                value = json.dumps(list(value), ensure_ascii=False)
+            elif table == 'details' and field in DICTIONARY_FIELDS:
+                value = text_ids[value]
+            row.append(value)
+        return row
+
+    def _derived_row(self, table, record):
+        if table != 'details':
+            return []
+        return [derive(record.get(source, "N/A")) for source, derive, _ in DERIVED_COLUMNS.values()]
+
+    def _from_row(self, table, row):
+        _, fields = TABLES[table]
+        record = dict(zip(fields, row))
+        if table == 'details':
+            record['images'] = json.loads(record['images'] or "[]")
+        return record
+
+    def _select(self, table):
+        key, fields = TABLES[table]
+        if table != 'details':
+            return f"SELECT {', '.join(fields)} FROM {table} t"
+        columns = [f"d{i}.value" if field in DICTIONARY_FIELDS else f"t.{field}" for i, field in enumerate(fields)]
+        joins = [f"LEFT JOIN texts d{i} ON d{i}.id = t.{field}"
+                 for i, field in enumerate(fields) if field in DICTIONARY_FIELDS]
+        return f"SELECT {', '.join(columns)} FROM details t {' '.join(joins)}"
+
+    # --- Writes ---
+
+    def upsert(self, table, records):
+        """Inserts or replaces records by URL in one transaction. Returns the number of records written."""
+        key, fields = TABLES[table]
+        columns = fields + (tuple(DERIVED_COLUMNS) if table == 'details' else ()) + ('updated_at',)
+        sql = (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+               f"ON CONFLICT ({key}) DO UPDATE SET "
+               + ", ".join(f"{column} = excluded.{column}" for column in columns[1:]))
+
+        written, now = 0, time.time()
+        with self.conn:
+            batch = []
+            for record in records:
+                if record.get(key, "N/A") == "N/A":
+                    continue
+                batch.append(record)
+                if len(batch) >= BATCH_SIZE:
+                    written += self._write_batch(table, sql, batch, now)
+                    batch = []
+            written += self._write_batch(table, sql, batch, now)
+        return written
+
+    def _write_batch(self, table, sql, records, now):
+        text_ids = None
+        if table == 'details':
+            text_ids = self._encode_texts(record.get(field, "N/A") for record in records for field in DICTIONARY_FIELDS)
+        self.conn.executemany(sql, [self._to_row(table, record, text_ids) + self._derived_row(table, record) + [now]
+                                    for record in records])
+        return len(records)
+
+    def update(self, table, url, **fields):
+        """Partial update of one record, e.g. update('details', url, phone_number='0722 000 000')."""
+        key, known = TABLES[table]
+        unknown = set(fields) - set(known[1:])
+        if unknown:
+            raise ValueError(f"Unknown {table} fields: {', '.join(sorted(unknown))}")
+
+        if table == 'details':
+            derived = {column: derive(fields[source])
+                       for column, (source, derive, _) in DERIVED_COLUMNS.items() if source in fields}
+            text_ids = self._encode_texts(value for field, value in fields.items() if field in DICTIONARY_FIELDS)
+            fields = {field: text_ids[value] if field in DICTIONARY_FIELDS
+                      else json.dumps(list(value), ensure_ascii=False) if field == 'images' else value
+                      for field, value in fields.items()}
+            fields.update(derived)
+        with self.conn:
+            cursor = self.conn.execute(
+                f"UPDATE {table} SET {', '.join(f'{field} = ?' for field in fields)}, updated_at = ? WHERE {key} = ?",
+                (*fields.values(), time.time(), url),
+            )
+        return cursor.rowcount > 0
+
+    # --- Reads ---
+
+    def get(self, table, url):
+        """Returns the record for `url`, or None."""
+        key, _ = TABLES[table]
+        row = self.conn.execute(f"{self._select(table)} WHERE t.{key} = ?", (url,)).fetchone()
+        return self._from_row(table, row) if row else None
+
+    def records(self, table):
+        """Yields every record of `table` in URL order."""
+        key, _ = TABLES[table]
+        for row in self.conn.execute(f"{self._select(table)} ORDER BY t.{key}"):
+            yield self._from_row(table, row)
+
+    def count(self, table):
+        return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    # --- Import / Export ---
+
+    def import_json(self, table, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return self.upsert(table, json.load(f))
+
+    def export_json(self, table, path):
+        records = list(self.records(table))
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False, indent=4)
+        return len(records)
+
+    def details_frame(self):
+        """The details table as a DataFrame, with repeated strings as categoricals and the amenity masks as int64."""
+        import pandas as pd
+
+        df = pd.DataFrame(self.records('details'), columns=list(DETAIL_FIELDS))
+        for column in CATEGORY_COLUMNS:
+            df[column] = df[column].astype('category')
+        for column in DERIVED_COLUMNS:
+            values = self.conn.execute(f"SELECT {column} FROM details ORDER BY url").fetchall()
+            df[column] = pd.array([value for value, in values], dtype='int64')
+        return df
+
+    def export_parquet(self, path=PARQUET_FILE):
+        """Writes the details as Parquet (dictionary-encoded categoricals; needs pyarrow). Returns the row count.
+
+        The schema metadata records the amenity vocabulary of the masks, so readers can tell stale ones.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        df = self.details_frame()
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                               VOCABULARY_METADATA_KEY: AMENITY_VOCABULARY_ID.encode()})
+        pq.write_table(table, path)
+        return len(df)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# --- Command Line ---
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load the scraper JSON files into SQLite and export Parquet.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('import', help="upsert the listings, details and contacts JSON files")
+    export = subparsers.add_parser('export-parquet', help="write the details as Parquet for the analysis")
+    export.add_argument('--output', default=PARQUET_FILE)
+    get = subparsers.add_parser('get', help="print one record")
+    get.add_argument('table', choices=list(TABLES))
+    get.add_argument('url')
+    parser.add_argument('--db', default=DB_FILE)
+    args = parser.parse_args()
+
+    with HotelStore(args.db) as store:
+        if args.command == 'import':
+            for table, path in JSON_FILES.items():
+                try:
+                    print(f"✅ {store.import_json(table, path)} {table} upserted from {path}")
+                except FileNotFoundError:
+                    print(f"⚠️ {path} not found, {table} skipped.")
+        elif args.command == 'export-parquet':
+            print(f"✅ {store.export_parquet(args.output)} details written to {args.output}")
+        else:
+            record = store.get(args.table, args.url)
+            print(json.dumps(record, ensure_ascii=False, indent=4) if record else f"❌ {args.url} not in {args.table}.")
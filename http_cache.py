@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+# --- Configuration ---
+CACHE_DIR = ".http_cache"
+MAX_AGE = 0  # Seconds an entry is served without revalidation (0 = always send a conditional GET)
+TTL = 7 * 24 * 3600  # Entries not refreshed for this long are evicted
+MAX_CACHE_BYTES = 500 * 1024 * 1024  # Least recently used bodies are evicted above this size
+PRUNE_EVERY = 200  # Run eviction after this many stores
+
+
+class HttpCache:
+    """On-disk HTTP response cache keyed by URL, revalidated with If-None-Match / If-Modified-Since.
+
+    Each entry is a `<sha256>.body` file (raw response bytes) next to a `<sha256>.json` metadata file
+    holding the URL, ETag, Last-Modified, encoding and fetch time. Files are replaced atomically, so
+    concurrent worker threads and an interrupted run never leave a half-written entry behind.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_age=MAX_AGE, ttl=TTL, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_age = max_age
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._stores = 0
+        os.makedirs(directory, exist_ok=True)
+
+    # --- Entry Storage ---
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key)
+        return f"{base}.json", f"{base}.body"
+
+    @staticmethod
+    def _write_atomic(path, data):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def load(self, url):
+        """Returns (metadata, body bytes) for a cached URL, or (None, None)."""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None, None
+        if meta.get('url') != url or time.time() - meta.get('fetched_at', 0) > self.ttl:
+            return None, None
+        return meta, body
+
+    def store(self, url, body, etag=None, last_modified=None, encoding='utf-8'):
+        meta_path, body_path = self._paths(url)
+        meta = {
+            'url': url, 'etag': etag, 'last_modified': last_modified,
+            'encoding': encoding, 'fetched_at': time.time(), 'size': len(body),
+        }
+        self._write_atomic(body_path, body)
+        self._write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+
+        with self._lock:
+            self._stores += 1
+            prune_now = self._stores % PRUNE_EVERY == 0
+        if prune_now:
+            self.prune()
+
+    def _touch(self, url, meta):
+        """Marks an entry as freshly validated (resets its TTL and LRU position)."""
+        meta_path, body_path = self._paths(url)
+        meta['fetched_at'] = time.time()
+        self._write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+        os.utime(body_path)
+
+    # --- Fetching ---
+
+    def fetch(self, url, session, headers=None, timeout=None):
+        """GETs `url` through the cache and returns the decoded body. 304 responses are served from disk."""
+        meta, body = self.load(url)
+        request_headers = dict(headers or {})
+
+        if meta is not None:
+            if time.time() - meta['fetched_at'] < self.max_age:
+                self.hits += 1
+                return body.decode(meta['encoding'], errors='replace')
+            if meta.get('etag'):
+                request_headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                request_headers['If-Modified-Since'] = meta['last_modified']
+
+        response = session.get(url, headers=request_headers, timeout=timeout)
+
+        if response.status_code == 304 and meta is not None:
+            self.revalidated += 1
+            self._touch(url, meta)
+            return body.decode(meta['encoding'], errors='replace')
+
+        response.raise_for_status()
+        self.misses += 1
+        encoding = response.encoding or 'utf-8'
+        self.store(url, response.content, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                   encoding)
+        return response.content.decode(encoding, errors='replace')
+
+    # --- Eviction ---
+
+    def prune(self):
+        """Deletes expired entries, then the least recently used ones until the cache fits in max_bytes."""
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.body'):
+                continue
+            body_path = os.path.join(self.directory, name)
+            meta_path = body_path[:-len('.body')] + '.json'
+            try:
+                stat = os.stat(body_path)
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.ttl:
+                self._remove(meta_path, body_path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, meta_path, body_path))
+
+        total = sum(size for _, size, _, _ in entries)
+        for _, size, meta_path, body_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(meta_path, body_path)
+            total -= size
+
+    @staticmethod
+    def _remove(*paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def summary(self):
+        return f"HTTP cache: {self.hits} fresh hits, {self.revalidated} revalidated (304), {self.misses} downloaded"
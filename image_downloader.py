@@ -0,0 +1,225 @@
+from checkpoint import CheckpointWriter, iter_json_records, load_checkpoint
+from main_page_scraper import HEADERS, REQUEST_TIMEOUT, create_session
+from urllib.parse import urlsplit
+import argparse
+import concurrent.futures
+import hashlib
+import os
+import threading
+import time
+import requests
+
+# Optional thumbnail support
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# --- Configuration ---
+INPUT_FILE = "hotel_full_details.json"  # The deep scrape output (or its .jsonl checkpoint), streamed record by record
+IMAGE_DIR = "images"
+MANIFEST_NAME = "manifest.jsonl"  # url -> sha256 of every stored image; makes reruns resume
+MAX_CONCURRENT_DOWNLOADS = 16  # Downloads in flight over one keep-alive connection pool
+CHUNK_SIZE = 64 * 1024
+THUMBNAIL_SIZE = (320, 240)
+THUMBNAIL_WORKERS = os.cpu_count() or 2
+
+
+# --- Image URL Source ---
+
+def county_of(url):
+    """First path segment of a detail URL, e.g. "brasov" for https://www.turistinfo.ro/brasov/..."""
+    return urlsplit(url).path.strip('/').split('/')[0]
+
+
+def iter_image_urls(records, county=None):
+    """Yields every gallery URL once, in dataset order (optionally one county only)."""
+    seen = set()
+    for record in records:
+        if county and county_of(record.get('url', '')) != county:
+            continue
+        for url in record.get('images') or []:
+            if url not in seen:
+                seen.add(url)
+                yield url
+
+
+# --- Content-Addressed Store ---
+
+class ImageStore:
+    """Stores images under objects/<aa>/<sha256><ext>, so identical files are kept once.
+
+    Every finished URL is appended to a JSONL manifest; URLs already in it (with their file
+    still on disk) are skipped, so an interrupted mirror resumes where it stopped.
+    """
+
+    def __init__(self, directory=IMAGE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        manifest_path = os.path.join(directory, MANIFEST_NAME)
+        self.entries = load_checkpoint(manifest_path)
+        self._lock = threading.Lock()
+        self._manifest = CheckpointWriter(manifest_path)
+
+    def object_path(self, digest, extension=".jpg"):
+        return os.path.join(self.directory, "objects", digest[:2], digest + extension)
+
+    def thumbnail_path(self, digest):
+        return os.path.join(self.directory, "thumbnails", digest[:2], digest + ".jpg")
+
+    def has(self, url):
+        entry = self.entries.get(url)
+        return entry is not None and os.path.exists(os.path.join(self.directory, entry['path']))
+
+    def add(self, url, tmp_path, digest, size, extension):
+        """Moves a finished download into place. Returns False when the content was already stored."""
+        path = self.object_path(digest, extension)
+        with self._lock:
+            duplicate = os.path.exists(path)
+            if duplicate:
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+            entry = {'url': url, 'sha256': digest, 'path': os.path.relpath(path, self.directory), 'bytes': size}
+            self.entries[url] = entry
+        self._manifest.append(entry)
+        return not duplicate
+
+    def close(self):
+        self._manifest.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def download_image(url, session, store):
+    """Streams one image to a temporary file while hashing it, then hands it to the store.
+
+    Returns (bytes downloaded, True if the content was new). Raises requests.exceptions.RequestException.
+    """
+    extension = os.path.splitext(urlsplit(url).path)[1].lower() or ".jpg"
+    tmp_path = os.path.join(store.directory, f".{hashlib.sha256(url.encode('utf-8')).hexdigest()}.part")
+    digest, size = hashlib.sha256(), 0
+    try:
+        with session.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            with open(tmp_path, 'wb') as f:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    digest.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return size, store.add(url, tmp_path, digest.hexdigest(), size, extension)
+
+
+# --- Thumbnails (process pool) ---
+
+def make_thumbnail(source, destination, size=THUMBNAIL_SIZE):
+    """Writes a JPEG thumbnail of `source`. Runs in a worker process."""
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    with Image.open(source) as image:
+        image.thumbnail(size)
+        image.convert('RGB').save(destination, 'JPEG', quality=85)
+    return destination
+
+
+def generate_thumbnails(store, workers=THUMBNAIL_WORKERS, size=THUMBNAIL_SIZE):
+    """Creates the missing thumbnails for every stored object in a process pool. Returns how many were made."""
+    if Image is None:
+        raise ImportError("Pillow is not installed (pip install Pillow)")
+
+    jobs = {}
+    for entry in store.entries.values():
+        source = os.path.join(store.directory, entry['path'])
+        destination = store.thumbnail_path(entry['sha256'])
+        if os.path.exists(source) and not os.path.exists(destination):
+            jobs[destination] = source
+
+    made = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(make_thumbnail, source, destination, size): source
+                   for destination, source in jobs.items()}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                future.result()
+                made += 1
+            except Exception as e:
+                print(f"  -> ❌ Thumbnail failed for {futures[future]}: {e}")
+    return made
+
+
+# --- Bulk Download ---
+
+def mirror_images(urls, store, session=None, max_workers=MAX_CONCURRENT_DOWNLOADS):
+    """Downloads every URL not yet in the store with at most `max_workers` in flight.
+
+    URLs are consumed lazily, so a dataset of any size never queues more than a few downloads ahead.
+    Returns a stats dict.
+    """
+    session = session or create_session(pool_size=max_workers)
+    stats = {'downloaded': 0, 'duplicates': 0, 'skipped': 0, 'failed': 0, 'bytes': 0}
+    start = time.time()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+
+        def collect(done):
+            for future in done:
+                url = pending.pop(future)
+                try:
+                    size, new = future.result()
+                except requests.exceptions.RequestException as e:
+                    stats['failed'] += 1
+                    print(f"  -> ❌ {url}: {e}")
+                    continue
+                stats['bytes'] += size
+                stats['downloaded' if new else 'duplicates'] += 1
+
+        for url in urls:
+            if store.has(url):
+                stats['skipped'] += 1
+                continue
+            if len(pending) >= max_workers * 2:
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                collect(done)
+            pending[executor.submit(download_image, url, session, store)] = url
+        collect(concurrent.futures.wait(pending).done)
+
+    stats['seconds'] = time.time() - start
+    return stats
+
+
+# --- Main Execution ---
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Mirror gallery images from the deep scrape output.")
+    parser.add_argument('--input', default=INPUT_FILE, help="hotel_full_details.json or its .jsonl checkpoint")
+    parser.add_argument('--output-dir', default=IMAGE_DIR)
+    parser.add_argument('--county', help="only mirror listings of this county, e.g. brasov")
+    parser.add_argument('--concurrency', type=int, default=MAX_CONCURRENT_DOWNLOADS)
+    parser.add_argument('--thumbnails', action='store_true', help="also generate thumbnails (requires Pillow)")
+    args = parser.parse_args()
+
+    with ImageStore(args.output_dir) as store:
+        print(f"Mirroring images from {args.input} into {args.output_dir} "
+              f"({len(store.entries)} already stored, {args.concurrency} concurrent downloads)...")
+        stats = mirror_images(iter_image_urls(iter_json_records(args.input), args.county), store,
+                              max_workers=args.concurrency)
+
+        megabytes = stats['bytes'] / (1024 * 1024)
+        print(f"\n✅ {stats['downloaded']} new images, {stats['duplicates']} duplicates stored once, "
+              f"{stats['skipped']} already on disk, {stats['failed']} failed.")
+        print(f"Downloaded {megabytes:.1f} MB in {stats['seconds']:.1f}s ({megabytes / max(stats['seconds'], 1e-9):.2f} MB/s).")
+        if stats['failed']:
+            print("Rerun the same command to retry the failed images.")
+
+        if args.thumbnails:
+            print(f"Generating thumbnails with {THUMBNAIL_WORKERS} processes...")
+            print(f"✅ {generate_thumbnails(store)} thumbnails written to {os.path.join(args.output_dir, 'thumbnails')}")
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+import time
+
+# --- Configuration ---
+STATE_FILE = "scrape_state.json"
+PREVIOUS_INDEX_FILE = "hotels_for_deep_scrape.previous.json"
+STALE_AFTER_DAYS = 14  # Unchanged hotels are still re-scraped after this many days
+
+# Listing fields whose change means the detail page probably changed too
+FINGERPRINT_FIELDS = ('reviews', 'capacity', 'price', 'image_url')
+
+
+def listing_fingerprint(hotel):
+    """Content fingerprint of the Phase 1 listing fields for one hotel."""
+    payload = "\x1f".join(str(hotel.get(field, "N/A")) for field in FINGERPRINT_FIELDS)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state(state, path=STATE_FILE):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def plan_incremental(new_index, details_by_url, state, previous_index=(), stale_after_days=STALE_AFTER_DAYS,
+                     default_scraped_at=0, now=None):
+    """Decides which hotels need a deep scrape.
+
+    Returns a dict with lists of URLs under 'new', 'changed', 'stale', 'unchanged' and 'removed'.
+    A hotel's baseline fingerprint is the one recorded in `state` at its last deep scrape, or its
+    entry in `previous_index` for hotels scraped before state tracking existed.
+    """
+    now = now or time.time()
+    stale_before = now - stale_after_days * 24 * 3600
+    previous_fingerprints = {
+        hotel['details_url']: listing_fingerprint(hotel) for hotel in previous_index if hotel.get('details_url')
+    }
+
+    plan = {'new': [], 'changed': [], 'stale': [], 'unchanged': [], 'removed': []}
+    current_urls = set()
+
+    for hotel in new_index:
+        url = hotel.get('details_url')
+        if not url or url == 'N/A' or url in current_urls:
+            continue
+        current_urls.add(url)
+
+        entry = state.get(url, {})
+        baseline = entry.get('fingerprint') or previous_fingerprints.get(url)
+
+        if url not in details_by_url or entry.get('removed_at'):
+            plan['new'].append(url)
+        elif baseline is None or baseline != listing_fingerprint(hotel):
+            plan['changed'].append(url)
+        elif entry.get('scraped_at', default_scraped_at) < stale_before:
+            plan['stale'].append(url)
+        else:
+            plan['unchanged'].append(url)
+
+    known_urls = set(details_by_url) | {url for url, entry in state.items() if not entry.get('removed_at')}
+    plan['removed'] = sorted(known_urls - current_urls)
+    return plan
+
+
+def record_scraped(state, hotel, now=None):
+    """Stores the fingerprint a hotel had when it was deep-scraped and clears any tombstone."""
+    state[hotel['details_url']] = {
+        'fingerprint': listing_fingerprint(hotel),
+        'scraped_at': now or time.time(),
+    }
+
+
+def tombstone(state, urls, now=None):
+    """Marks hotels that disappeared from the index as removed (their records are dropped from the output)."""
+    now = now or time.time()
+    for url in urls:
+        entry = state.setdefault(url, {})
+        entry.setdefault('removed_at', now)
@@ -1,8 +1,27 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from urllib.parse import urljoin, urlsplit
+import argparse
+import concurrent.futures
 import json
 import pprint
 import os  # Added for path operations (though not strictly necessary here, good practice)
+import re
+import time
+from http_cache import HttpCache
+from incremental import PREVIOUS_INDEX_FILE
+from scheduler import backoff_delay, is_transient_error
+
+# Optional faster parser backends
+try:
+    import lxml  # noqa: F401 (BeautifulSoup loads it by name)
+except ImportError:
+    lxml = None
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    SelectolaxParser = None
 
 # --- Configuration ---
 # The URL you want to scrape
@@ -10,115 +29,464 @@ URL = "https://www.turistinfo.ro/brasov/cazare-hoteluri-vile-pensiuni-brasov.htm
 BASE_URL = "https://www.turistinfo.ro"
 # Define the output file name
 OUTPUT_FILE = "hotels_for_deep_scrape.json"
+REQUEST_TIMEOUT = 30  # Seconds per HTTP request
+MAX_CONCURRENT_REQUESTS = 8  # Listing pages fetched in parallel over one keep-alive pool
+LISTING_FETCH_ATTEMPTS = 4  # Tries per listing page (timeouts, connection errors, 429/5xx) before the crawl stops
+
+# County listing index pages look like /<county>/cazare-hoteluri-vile-pensiuni-<county>.html
+COUNTY_LISTING_PATTERN = re.compile(r'^/([a-z0-9-]+)/cazare-hoteluri-vile-pensiuni-\1\.html$')
+# Suffix a paginated listing URL adds to the first page's path, e.g. "-2.html", "/pagina-3.html", "_p4.html"
+PAGE_SUFFIX_PATTERN = re.compile(r'^[-_/]?(?:p|pag|pagina)?[-_]?(\d+)(?:\.html)?$')
+PAGE_QUERY_PATTERN = re.compile(r'(?:^|&)(?:p|pag|page|pagina)=(\d+)')
 
-# Set a User-Agent header
-headers = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+# Listing parser backend: "html.parser", "lxml" (BeautifulSoup on lxml), "selectolax" or "auto"
+# (the fastest one installed). All of them give the same hotel_data dicts; bench_listing_parser.py
+# checks that on saved pages.
+PARSER_BACKEND = "auto"
+# A tag, with quoted attribute values that may contain '>' (captured, so re.split keeps the tags)
+TAG_PATTERN = re.compile(r'(<(?:[^>"\']|"[^"]*"|\'[^\']*\')*>)')
+
+# Set a User-Agent header (gzip is negotiated explicitly to keep transfers small)
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Encoding': 'gzip, deflate',
 }
 
-print(f"Attempting to fetch {URL}...")
 
-try:
-    response = requests.get(URL, headers=headers)
+# --- HTTP Helpers ---
+
+class RateLimitedAdapter(HTTPAdapter):
+    """HTTPAdapter that takes a token from a scheduler.HostRateLimiter before every request it sends."""
+
+    def __init__(self, rate_limiter, **kwargs):
+        self.rate_limiter = rate_limiter
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        self.rate_limiter.take(request.url)
+        return super().send(request, **kwargs)
+
+
+def create_session(pool_size=10, rate_limiter=None):
+    """Returns a keep-alive requests Session with the scraper headers and a connection pool of `pool_size`.
+
+    With a `rate_limiter`, every request (redirects and cache revalidations included) takes a token for its host.
+    """
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    if rate_limiter is not None:
+        adapter = RateLimitedAdapter(rate_limiter, pool_connections=pool_size, pool_maxsize=pool_size)
+    else:
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def fetch_page(url, session=None, cache=None):
+    """Fetches a page (through the on-disk HttpCache if given) and returns its HTML.
+
+    Raises requests.exceptions.RequestException on failure.
+    """
+    if cache is not None:
+        return cache.fetch(url, session or requests, headers=HEADERS, timeout=REQUEST_TIMEOUT)
+    response = (session or requests).get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT)
     response.raise_for_status()
-    print("Successfully fetched the page.")
+    return response.text
 
-    soup = BeautifulSoup(response.text, 'html.parser')
-    main_list = soup.find('ul', class_='liste-cazare')
 
-    if not main_list:
-        print("Could not find the main listings container.")
+def fetch_listing_page(url, session=None, cache=None, attempts=LISTING_FETCH_ATTEMPTS):
+    """fetch_page with jittered exponential backoff on transient errors.
+
+    Raises the last requests.exceptions.RequestException once every attempt failed, or at once
+    for a permanent error such as a 404.
+    """
+    for attempt in range(attempts):
+        try:
+            return fetch_page(url, session, cache)
+        except requests.exceptions.RequestException as e:
+            if attempt + 1 >= attempts or not is_transient_error(e):
+                raise
+            delay = backoff_delay(attempt)
+            print(f"  -> ⚠️ {url}: {e}; retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+# --- Listing Parsing ---
+
+class _SoupNode:
+    """A BeautifulSoup tag behind the few lookups parse_hotel_listing makes."""
+
+    __slots__ = ('tag',)
+
+    def __init__(self, tag):
+        self.tag = tag
+
+    def find(self, name, **attrs):
+        tag = self.tag.find(name, attrs=attrs)
+        return _SoupNode(tag) if tag else None
+
+    def count(self, name, **attrs):
+        return len(self.tag.find_all(name, attrs=attrs))
+
+    def text(self, separator="", strip=False):
+        return self.tag.get_text(separator, strip=strip)
+
+    def get(self, attribute):
+        return self.tag.get(attribute)
+
+    def parent_href(self):
+        """href of the closest enclosing <a href>, or None."""
+        link = self.tag.find_parent('a', href=True)
+        return link['href'] if link else None
+
+
+class _LexborNode:
+    """A selectolax node behind the same lookups (attribute filters become CSS selectors)."""
+
+    __slots__ = ('node',)
+
+    def __init__(self, node):
+        self.node = node
+
+    @staticmethod
+    def _selector(name, attrs):
+        return name + "".join(f".{value}" if key == 'class' else f"[{key}='{value}']" for key, value in attrs.items())
+
+    def find(self, name, **attrs):
+        node = self.node.css_first(self._selector(name, attrs))
+        return _LexborNode(node) if node else None
+
+    def count(self, name, **attrs):
+        return len(self.node.css(self._selector(name, attrs)))
+
+    def text(self, separator="", strip=False):
+        return self.node.text(deep=True, separator=separator, strip=strip)
+
+    def get(self, attribute):
+        return self.node.attributes.get(attribute)
+
+    def parent_href(self):
+        parent = self.node.parent
+        while parent is not None:
+            if parent.tag == 'a' and 'href' in parent.attributes:
+                return parent.attributes['href'] or ''
+            parent = parent.parent
+        return None
+
+
+def parse_hotel_listing(hotel):
+    """Extracts one hotel_data dict from an <li class="liste-unitate"> element (BeautifulSoup or selectolax)."""
+    hotel = hotel if isinstance(hotel, (_SoupNode, _LexborNode)) else (
+        _SoupNode(hotel) if isinstance(hotel, Tag) else _LexborNode(hotel))
+
+    # --- Name ---
+    name_tag = hotel.find('span', itemprop='name')
+    name = name_tag.text().strip() if name_tag else "N/A"
+
+    # --- Unique URL (FIXED) ---
+    details_url = "N/A"
+    if name_tag:
+        href = name_tag.parent_href()
+        if href is not None:
+            details_url = f"{BASE_URL}{href}"
+
+    # --- Star Rating ---
+    stars_container = hotel.find('span', style="white-space: nowrap;")
+    star_rating = "N/A"
+    if stars_container:
+        star_count = stars_container.count('i', **{'class': 'stars'})
+        if star_count > 0:
+            star_rating = f"{star_count} stars"
+
+    # --- Address ---
+    address_tag = hotel.find('span', itemprop='address')
+    address = address_tag.text(separator=" ", strip=True) if address_tag else "N/A"
+
+    # --- Reviews (Cleaned Spacing) ---
+    review_tag = hotel.find('div', **{'class': 'ucrecenzii'})
+    reviews = "N/A"
+    if review_tag:
+        reviews = review_tag.text(strip=True)
+        reviews = reviews.replace("question_answer", "").strip()
+        reviews = ' '.join(reviews.split())
+
+    # --- Capacity (Cleaned Spacing) ---
+    capacity_tag = hotel.find('div', **{'class': 'uclocuri'})
+    capacity = "N/A"
+    if capacity_tag:
+        capacity = capacity_tag.text(strip=True)
+        capacity = capacity.replace("supervisor_account", "").strip()
+        capacity = ' '.join(capacity.split())
+        capacity = capacity.replace('spatiude cazare', 'spatiu de cazare')
+
+    # --- Description ---
+    description_tag = hotel.find('p', itemprop='description')
+    description = description_tag.text(strip=True) if description_tag else "N/A"
+
+    # --- Price ---
+    price_tag = hotel.find('div', itemprop='priceRange')
+    price = price_tag.text(strip=True) if price_tag else "N/A"
+
+    # --- Image ---
+    image_tag = hotel.find('img', itemprop='image')
+    image_src = image_tag.get('src') if image_tag else None
+    if image_src:
+        image_url = f"{BASE_URL}{image_src}".replace(BASE_URL + BASE_URL, BASE_URL)
     else:
-        hotel_listings = main_list.find_all('li', class_='liste-unitate')
-        print(f"Found {len(hotel_listings)} hotel listings.")
-
-        all_hotels_data = []
-
-        for hotel in hotel_listings:
-
-            # --- Name ---
-            name_tag = hotel.find('span', itemprop='name')
-            name = name_tag.text.strip() if name_tag else "N/A"
-
-            # --- Unique URL (FIXED) ---
-            details_url = "N/A"
-            if name_tag:
-                link_tag = name_tag.find_parent('a', href=True)
-                if link_tag:
-                    details_url = f"{BASE_URL}{link_tag['href']}"
-
-            # --- Star Rating ---
-            stars_container = hotel.find('span', style="white-space: nowrap;")
-            star_rating = "N/A"
-            if stars_container:
-                star_icons = stars_container.find_all('i', class_='stars')
-                star_count = len(star_icons)
-                if star_count > 0:
-                    star_rating = f"{star_count} stars"
-
-            # --- Address ---
-            address_tag = hotel.find('span', itemprop='address')
-            address = address_tag.get_text(separator=" ", strip=True) if address_tag else "N/A"
-
-            # --- Reviews (Cleaned Spacing) ---
-            review_tag = hotel.find('div', class_='ucrecenzii')
-            reviews = "N/A"
-            if review_tag:
-                reviews = review_tag.get_text(strip=True)
-                reviews = reviews.replace("question_answer", "").strip()
-                reviews = ' '.join(reviews.split())
-
-            # --- Capacity (Cleaned Spacing) ---
-            capacity_tag = hotel.find('div', class_='uclocuri')
-            capacity = "N/A"
-            if capacity_tag:
-                capacity = capacity_tag.get_text(strip=True)
-                capacity = capacity.replace("supervisor_account", "").strip()
-                capacity = ' '.join(capacity.split())
-                capacity = capacity.replace('spatiude cazare', 'spatiu de cazare')
-
-            # --- Description ---
-            description_tag = hotel.find('p', itemprop='description')
-            description = description_tag.get_text(strip=True) if description_tag else "N/A"
-
-            # --- Price ---
-            price_tag = hotel.find('div', itemprop='priceRange')
-            price = price_tag.get_text(strip=True) if price_tag else "N/A"
-
-            # --- Image ---
-            image_tag = hotel.find('img', itemprop='image')
-            image_src = image_tag['src'] if image_tag and image_tag.has_attr('src') else None
-            if image_src:
-                image_url = f"{BASE_URL}{image_src}".replace(BASE_URL + BASE_URL, BASE_URL)
-            else:
-                image_url = "N/A"
-
-            # 6. Add all found data to a dictionary, with URL at the end
-            hotel_data = {
-                'name': name,
-                'star_rating': star_rating,
-                'address': address,
-                'reviews': reviews,
-                'capacity': capacity,
-                'description': description,
-                'price': price,
-                'image_url': image_url,
-                'details_url': details_url,
-            }
-            all_hotels_data.append(hotel_data)
-
-        # 7. Print verification (optional but helpful)
-        print("\n--- Verification of First Detail URL ---")
-        print(f"Name: {all_hotels_data[0]['name']}")
-        print(f"Corrected Detail URL: {all_hotels_data[0]['details_url']}")
-
-        # 8. Save the data to a JSON file
-        print(f"\nSaving {len(all_hotels_data)} hotel entries to {OUTPUT_FILE}...")
-        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-            # Use ensure_ascii=False to preserve Romanian characters correctly
-            json.dump(all_hotels_data, f, indent=4, ensure_ascii=False)
-
-        print(f"✅ Data successfully saved to {OUTPUT_FILE}")
-
-except requests.exceptions.RequestException as e:
-    print(f"An error occurred while fetching the URL: {e}")
\ No newline at end of file
+        image_url = "N/A"
+
+    # Add all found data to a dictionary, with URL at the end
+    return {
+        'name': name,
+        'star_rating': star_rating,
+        'address': address,
+        'reviews': reviews,
+        'capacity': capacity,
+        'description': description,
+        'price': price,
+        'image_url': image_url,
+        'details_url': details_url,
+    }
+
+
+def resolve_parser_backend(backend=None):
+    """Returns the concrete backend name for `backend` (defaults to PARSER_BACKEND)."""
+    backend = backend or PARSER_BACKEND
+    if backend == "auto":
+        if SelectolaxParser is not None:
+            return "selectolax"
+        return "lxml" if lxml is not None else "html.parser"
+    if backend == "selectolax" and SelectolaxParser is None:
+        raise ImportError("selectolax is not installed (pip install selectolax)")
+    if backend == "lxml" and lxml is None:
+        raise ImportError("lxml is not installed (pip install lxml)")
+    if backend not in ("html.parser", "lxml", "selectolax"):
+        raise ValueError(f"Unknown parser backend: {backend}")
+    return backend
+
+
+def escape_text_crs(html):
+    """Writes the carriage returns of text (not of tags) as &#13;.
+
+    lxml and selectolax fold a literal CR or CRLF to LF, as HTML5 parsing does, but keep the
+    character reference, so their texts come out as html.parser reads them.
+    """
+    if '\r' not in html:
+        return html
+    parts = TAG_PATTERN.split(html)
+    parts[::2] = [text.replace('\r', '&#13;') for text in parts[::2]]
+    return "".join(parts)
+
+
+def parse_listing_document(html, backend=None):
+    """Parses a listing page once. Returns (li.liste-unitate elements, or None if the listings container
+    is missing, and the href of every link on the page, for the pagination).
+
+    The BeautifulSoup backends only build the ul and a elements (SoupStrainer).
+    """
+    backend = resolve_parser_backend(backend)
+    if backend == "selectolax":
+        tree = SelectolaxParser(escape_text_crs(html))
+        main_list = tree.css_first('ul.liste-cazare')
+        hrefs = [link.attributes['href'] or '' for link in tree.css('a[href]')]
+        return (main_list.css('li.liste-unitate') if main_list else None), hrefs
+
+    soup = BeautifulSoup(html if backend == "html.parser" else escape_text_crs(html), backend,
+                         parse_only=SoupStrainer(['ul', 'a']))
+    main_list = soup.find('ul', class_='liste-cazare')
+    hrefs = [link['href'] for link in soup.find_all('a', href=True)]
+    return (main_list.find_all('li', class_='liste-unitate') if main_list else None), hrefs
+
+
+def parse_listing_page(html, backend=None):
+    """Parses a listing page and returns its hotel_data dicts, or None if the listings container is missing."""
+    items, _ = parse_listing_document(html, backend)
+    if items is None:
+        return None
+    return [parse_hotel_listing(hotel) for hotel in items]
+
+
+def iter_listing_hotels(items):
+    """Yields the hotel_data dict of each parsed li.liste-unitate element as soon as it is extracted."""
+    for hotel in items or ():
+        yield parse_hotel_listing(hotel)
+
+
+# --- Crawling (pagination and counties) ---
+
+def page_number(url, listing_url):
+    """Returns the page number a paginated URL points to (1 for the listing's first page), or None."""
+    split, root = urlsplit(url), urlsplit(listing_url)
+    if split.netloc and split.netloc != root.netloc:
+        return None
+
+    if split.path == root.path:
+        if not split.query:
+            return 1
+        match = PAGE_QUERY_PATTERN.search(split.query)
+        return int(match.group(1)) if match else None
+
+    stem = root.path[:-len('.html')] if root.path.endswith('.html') else root.path
+    if not split.path.startswith(stem):
+        return None
+    match = PAGE_SUFFIX_PATTERN.match(split.path[len(stem):])
+    return int(match.group(1)) if match else None
+
+
+def find_pagination_urls(hrefs, page_url, listing_url):
+    """Returns absolute URLs of the other pages of `listing_url` among the link hrefs of one of its pages."""
+    urls = []
+    for href in hrefs:
+        url = urljoin(page_url, href).split('#')[0]
+        if page_number(url, listing_url) is not None and url not in urls:
+            urls.append(url)
+    return urls
+
+
+def discover_county_urls(session, index_url=BASE_URL):
+    """Returns the listing index URL of every county linked from the site's home page."""
+    soup = BeautifulSoup(fetch_page(index_url, session), 'html.parser')
+    urls = []
+    for link in soup.find_all('a', href=True):
+        path = urlsplit(urljoin(index_url, link['href'])).path
+        if COUNTY_LISTING_PATTERN.match(path):
+            url = urljoin(index_url, path)
+            if url not in urls:
+                urls.append(url)
+    return urls
+
+
+def iter_listing_pages(listing_urls, session=None, max_workers=MAX_CONCURRENT_REQUESTS, follow_pagination=True,
+                       cache=None, backend=None):
+    """Fetches every (paginated) listing page concurrently and yields ((listing index, page number), url, items).
+
+    items are the page's li.liste-unitate elements (None if the listings container is missing), for
+    iter_listing_hotels; each page is parsed once, for its listings and its pagination links together.
+    Pages are yielded as they arrive; the pages they link to are submitted before the yield.
+    A page that still fails after fetch_listing_page's retries raises its RequestException, so no
+    caller ends up with an index missing that page's hotels.
+    """
+    session = session or create_session(pool_size=max_workers)
+    seen = set(listing_urls)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {
+            executor.submit(fetch_listing_page, url, session, cache): (url, listing_index, url)
+            for listing_index, url in enumerate(listing_urls)
+        }
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                url, listing_index, listing_url = pending.pop(future)
+                try:
+                    html = future.result()
+                except requests.exceptions.RequestException as e:
+                    print(f"  -> ❌ Could not fetch {url}: {e}")
+                    for other in pending:
+                        other.cancel()
+                    raise
+
+                items, hrefs = parse_listing_document(html, backend)
+                if follow_pagination:
+                    for next_url in find_pagination_urls(hrefs, url, listing_url):
+                        if next_url not in seen:
+                            seen.add(next_url)
+                            pending[executor.submit(fetch_listing_page, next_url, session, cache)] = (next_url, listing_index, listing_url)
+
+                yield (listing_index, page_number(url, listing_url) or 0), url, items
+
+
+def crawl_listings(listing_urls, session=None, max_workers=MAX_CONCURRENT_REQUESTS, follow_pagination=True,
+                   cache=None):
+    """Fetches every (paginated) listing page concurrently and returns hotel_data dicts deduplicated by details_url.
+
+    Newly discovered pages are submitted as soon as the page linking to them has been fetched.
+    Results keep listing order, then page order. Raises requests.exceptions.RequestException if
+    any page cannot be fetched, rather than returning a partial index.
+    """
+    pages = {}  # (listing index, page number) -> hotel_data list
+    for key, url, items in iter_listing_pages(listing_urls, session, max_workers, follow_pagination, cache):
+        hotels = list(iter_listing_hotels(items))
+        pages[key] = hotels
+        print(f"  -> ✅ {url}: {len(hotels)} listings")
+
+    return merge_listings(pages[key] for key in sorted(pages))
+
+
+def merge_listings(page_results):
+    """Flattens per-page hotel_data lists, keeping the first entry for each details_url."""
+    merged, seen_urls = [], set()
+    for hotels in page_results:
+        for hotel in hotels:
+            details_url = hotel['details_url']
+            if details_url != "N/A":
+                if details_url in seen_urls:
+                    continue
+                seen_urls.add(details_url)
+            merged.append(hotel)
+    return merged
+
+
+def save_listings(hotels, path=OUTPUT_FILE):
+    """Writes the Phase 1 index, keeping the previous one for the incremental deep scrape to diff against.
+
+    Only pass a complete crawl: the index it replaces becomes PREVIOUS_INDEX_FILE, and the incremental
+    deep scrape tombstones every hotel missing from the new one.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        # Use ensure_ascii=False to preserve Romanian characters correctly
+        json.dump(hotels, f, indent=4, ensure_ascii=False)
+    # Rotate only once the new index is fully written
+    if os.path.exists(path):
+        os.replace(path, PREVIOUS_INDEX_FILE)
+    os.replace(tmp_path, path)
+
+
+# --- Main Execution ---
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Phase 1: collect hotel listings and detail URLs.")
+    parser.add_argument('--all-counties', action='store_true', help="crawl every county index, not only URL")
+    parser.add_argument('--no-pagination', action='store_true', help="only fetch the first listing page")
+    parser.add_argument('--concurrency', type=int, default=MAX_CONCURRENT_REQUESTS,
+                        help="maximum concurrent requests")
+    parser.add_argument('--no-cache', action='store_true', help="bypass the on-disk HTTP cache")
+    args = parser.parse_args()
+
+    session = create_session(pool_size=args.concurrency)
+    cache = None if args.no_cache else HttpCache()
+
+    try:
+        listing_urls = [URL]
+        if args.all_counties:
+            print(f"Discovering county index pages from {BASE_URL}...")
+            listing_urls = discover_county_urls(session) or listing_urls
+            print(f"Found {len(listing_urls)} county index pages.")
+
+        print(f"Crawling {len(listing_urls)} listing index page(s) with {args.concurrency} concurrent requests...")
+        all_hotels_data = crawl_listings(listing_urls, session, max_workers=args.concurrency,
+                                         follow_pagination=not args.no_pagination, cache=cache)
+        if cache:
+            print(cache.summary())
+
+        if not all_hotels_data:
+            print("Could not find any hotel listings.")
+        else:
+            print(f"Found {len(all_hotels_data)} unique hotel listings.")
+
+            # Print verification (optional but helpful)
+            print("\n--- Verification of First Detail URL ---")
+            print(f"Name: {all_hotels_data[0]['name']}")
+            print(f"Corrected Detail URL: {all_hotels_data[0]['details_url']}")
+
+            # Save the data to a JSON file
+            print(f"\nSaving {len(all_hotels_data)} hotel entries to {OUTPUT_FILE}...")
+            save_listings(all_hotels_data)
+
+            print(f"✅ Data successfully saved to {OUTPUT_FILE}")
+
+    except requests.exceptions.RequestException as e:
+        print(f"An error occurred while fetching the URL: {e}")
+        print(f"❌ Crawl stopped; {OUTPUT_FILE} was left unchanged. Rerun to try again.")
@@ -0,0 +1,171 @@
+from contextlib import contextmanager
+from collections import Counter, defaultdict
+import json
+import math
+import threading
+import time
+
+# --- Configuration ---
+METRICS_FILE = "scrape_metrics.jsonl"
+PERCENTILES = (50, 95, 99)
+
+# Details fields counted as failed when they come back as "N/A" (or an empty image list)
+TRACKED_FIELDS = ('property_name', 'address', 'phone_number', 'full_description', 'capacity', 'images',
+                  'politici_copii', 'politici_mese', 'politici_rezervari', 'politici_plata', 'facilities')
+
+
+def failed_fields(record):
+    """The TRACKED_FIELDS of a details record left as "N/A" (or an empty image list)."""
+    if not hasattr(record, 'get'):
+        return []
+    return [field for field in TRACKED_FIELDS if record.get(field) in ('N/A', [])]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class MetricsRecorder:
+    """Per-URL, per-stage timings for a scraper run.
+
+    The scraping functions wrap each step in `with metrics.stage("driver_get"):`; the timings go to
+    the URL currently being processed on that thread (started with `begin_url`). Every finished URL
+    is appended to a JSONL file, and `summary()` / `prometheus_text()` report the whole run.
+    """
+
+    def __init__(self, path=METRICS_FILE):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._file = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stage_seconds = defaultdict(list)
+            self.field_failures = Counter()
+            self.pages = 0
+            self.idle_seconds = 0.0
+            self.started_at = time.time()
+
+    # --- Recording ---
+
+    def begin_url(self, url):
+        self._local.current = {'url': url, 'started': time.perf_counter(), 'stages': defaultdict(float)}
+
+    @contextmanager
+    def stage(self, name):
+        """Times one stage of the URL being processed on this thread (no-op outside begin_url/end_url)."""
+        current = getattr(self._local, 'current', None)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if current is not None:
+                current['stages'][name] += time.perf_counter() - start
+
+    def end_url(self, record=None):
+        current = getattr(self._local, 'current', None)
+        if current is None:
+            return
+        self._local.current = None
+
+        total = time.perf_counter() - current['started']
+        failed = failed_fields(record)
+        line = {
+            'url': current['url'], 'timestamp': time.time(), 'total': round(total, 4),
+            'stages': {name: round(seconds, 4) for name, seconds in current['stages'].items()},
+            'failed_fields': failed,
+        }
+
+        with self._lock:
+            self.pages += 1
+            self.stage_seconds['total'].append(total)
+            for name, seconds in current['stages'].items():
+                self.stage_seconds[name].append(seconds)
+            self.field_failures.update(failed)
+            if self.path:
+                if self._file is None:
+                    self._file = open(self.path, 'a', encoding='utf-8')
+                self._file.write(json.dumps(line) + "\n")
+                self._file.flush()
+
+    @contextmanager
+    def idle(self):
+        """Time spent inside (e.g. a worker waiting for the queue) is left out of the pages/sec figure."""
+        start = time.time()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.idle_seconds += time.time() - start
+
+    def timed(self, func, url_of=lambda args: args[0]):
+        """Wraps a scrape function so every call is recorded as one URL."""
+        def wrapper(args):
+            self.begin_url(url_of(args))
+            result = None
+            try:
+                result = func(args)
+                return result
+            finally:
+                self.end_url(result)
+        return wrapper
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # --- Reporting ---
+
+    def _stage_stats(self):
+        with self._lock:
+            return {name: sorted(values) for name, values in self.stage_seconds.items()}
+
+    def summary(self):
+        """End-of-run report: p50/p95/p99 per stage, pages/sec and failure counts by field.
+
+        Pages/sec counts from the last reset(), so call it when the scraping starts.
+        """
+        elapsed = max(time.time() - self.started_at - self.idle_seconds, 1e-9)
+        lines = ["\n--- Stage Timings (seconds) ---",
+                 f"{'stage':<22}{'count':>7}" + "".join(f"{'p' + str(p):>9}" for p in PERCENTILES)]
+        for name, values in sorted(self._stage_stats().items()):
+            lines.append(f"{name:<22}{len(values):>7}" + "".join(f"{percentile(values, p):>9.3f}" for p in PERCENTILES))
+        lines.append(f"Pages: {self.pages} in {elapsed:.1f}s ({self.pages / elapsed:.2f} pages/sec)")
+        if self.field_failures:
+            lines.append("Failures by field: " + ", ".join(
+                f"{field} {count}" for field, count in self.field_failures.most_common()))
+        return "\n".join(lines)
+
+    def prometheus_text(self, prefix="turistinfo_scraper"):
+        """Prometheus text exposition of the run (summaries per stage, counters for pages and failures)."""
+        lines = [f"# HELP {prefix}_stage_seconds Time spent per URL in each scraping stage.",
+                 f"# TYPE {prefix}_stage_seconds summary"]
+        for name, values in sorted(self._stage_stats().items()):
+            for p in PERCENTILES:
+                lines.append(f'{prefix}_stage_seconds{{stage="{name}",quantile="{p / 100}"}} {percentile(values, p):.6f}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {sum(values):.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {len(values)}')
+
+        lines += [f"# HELP {prefix}_pages_total Pages processed.", f"# TYPE {prefix}_pages_total counter",
+                  f"{prefix}_pages_total {self.pages}",
+                  f"# HELP {prefix}_field_failures_total Records with a field left as N/A.",
+                  f"# TYPE {prefix}_field_failures_total counter"]
+        for field, count in sorted(self.field_failures.items()):
+            lines.append(f'{prefix}_field_failures_total{{field="{field}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+
+
+# Shared recorder used by the scrapers (each mode calls metrics.reset() when its scraping starts)
+metrics = MetricsRecorder()
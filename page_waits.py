@@ -0,0 +1,162 @@
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import (TimeoutException, NoSuchElementException, StaleElementReferenceException,
+                                        WebDriverException)
+from collections import deque
+import threading
+import time
+
+# --- Locators ---
+NAME_LOCATOR = (By.XPATH, "//span[@itemprop='name']")
+DESCRIPTION_LOCATOR = (By.XPATH, "//div[@itemprop='description']")
+DESCRIPTION_BUTTON_LOCATOR = (By.ID, "sLongDesc")
+CONTACT_BUTTON_LOCATOR = (By.XPATH, "//div[@class='phone vezitel']/a[@class='btn blue darken-1']")
+PHONE_LOCATOR = (By.CLASS_NAME, "telnr")
+
+POLL_FREQUENCY = 0.05  # Seconds between DOM checks (Selenium default is 0.5)
+
+# Long-wait profile of the retry pass (seconds); the adaptive timeouts allow 15s at most
+LONG_NAME_TIMEOUT = 20.0
+LONG_DESCRIPTION_TIMEOUT = 8.0
+LONG_CONTACT_TIMEOUT = 10.0
+LONG_PHONE_TIMEOUT = 15.0
+
+
+# --- Adaptive Timeouts ---
+
+class AdaptiveTimeout:
+    """Timeout that follows a rolling percentile of observed wait durations.
+
+    Until `min_samples` waits have been observed the `initial` value is used. Afterwards the
+    timeout is `percentile` of the last `window` samples times `headroom`, clamped to
+    [`minimum`, `maximum`]. A wait that times out is recorded at the current timeout so the
+    next ones get more room on a slow site.
+    """
+
+    def __init__(self, initial, minimum=0.5, maximum=15.0, window=200, percentile=95, headroom=1.5,
+                 min_samples=10):
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.percentile = percentile
+        self.headroom = headroom
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def record_timeout(self):
+        self.record(min(self.timeout() * 2, self.maximum))
+
+    def timeout(self):
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return self.initial
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(self.percentile / 100 * (len(ordered) - 1))))
+        return max(self.minimum, min(self.maximum, ordered[index] * self.headroom))
+
+
+def fixed_timeout(seconds):
+    """An AdaptiveTimeout pinned to `seconds`, whatever the observed latencies."""
+    return AdaptiveTimeout(initial=seconds, minimum=seconds, maximum=seconds)
+
+
+class WaitStrategy:
+    """Event-driven waits on concrete DOM conditions, with one adaptive timeout per condition."""
+
+    def __init__(self, name_timeout=None, description_timeout=None, contact_timeout=None, phone_timeout=None):
+        self.name_timeout = name_timeout or AdaptiveTimeout(initial=5.0)
+        self.description_timeout = description_timeout or AdaptiveTimeout(initial=2.0, minimum=0.2)
+        self.contact_timeout = contact_timeout or AdaptiveTimeout(initial=2.0)
+        self.phone_timeout = phone_timeout or AdaptiveTimeout(initial=3.0)
+
+    def _until(self, driver, adaptive, condition, record_timeouts=True):
+        """Runs one WebDriverWait and feeds its duration (or timeout) back into `adaptive`.
+
+        With `record_timeouts=False` a timeout is not fed back, for conditions that may legitimately never hold.
+        """
+        start = time.perf_counter()
+        try:
+            result = WebDriverWait(driver, adaptive.timeout(), poll_frequency=POLL_FREQUENCY).until(condition)
+        except TimeoutException:
+            if record_timeouts:
+                adaptive.record_timeout()
+            raise
+        adaptive.record(time.perf_counter() - start)
+        return result
+
+    def wait_for_name(self, driver):
+        """Waits until the property name span is present and returns it.
+
+        The name is in the static HTML, so a page that finished loading without it is removed or
+        dead rather than slow: that timeout is not fed back into `name_timeout`.
+        """
+        try:
+            return self._until(driver, self.name_timeout, EC.presence_of_element_located(NAME_LOCATOR),
+                               record_timeouts=False)
+        except TimeoutException:
+            if not page_loaded(driver):
+                self.name_timeout.record_timeout()
+            raise
+
+    def expand_description(self, driver):
+        """Clicks the 'read more' toggle and waits until the description has actually expanded."""
+        desc_button = driver.find_element(*DESCRIPTION_BUTTON_LOCATOR)
+        if not desc_button.is_displayed():
+            # Short descriptions show no toggle: nothing to expand, and nothing to wait for
+            return
+        collapsed_length = len(driver.find_element(*DESCRIPTION_LOCATOR).text)
+        driver.execute_script("arguments[0].click();", desc_button)
+
+        def expanded(driver):
+            try:
+                if not desc_button.is_displayed():
+                    return True
+            except StaleElementReferenceException:
+                return True
+            return len(driver.find_element(*DESCRIPTION_LOCATOR).text) > collapsed_length
+
+        try:
+            # A toggle that changes nothing is not a slow page, so its timeout must not raise the next ones
+            self._until(driver, self.description_timeout, expanded, record_timeouts=False)
+        except TimeoutException:
+            # Keep whatever text is there
+            pass
+
+    def reveal_phone(self, driver):
+        """Clicks the 'vezitel' button and waits until `telnr` no longer contains 'XXX'. Returns the number.
+
+        Returns None without waiting on pages that have no phone button, so they never raise `contact_timeout`.
+        """
+        if not driver.find_elements(*CONTACT_BUTTON_LOCATOR):
+            return None
+        contact_button = self._until(driver, self.contact_timeout, EC.element_to_be_clickable(CONTACT_BUTTON_LOCATOR))
+        contact_button.click()
+
+        def revealed(driver):
+            try:
+                text = driver.find_element(*PHONE_LOCATOR).text.strip()
+            except (NoSuchElementException, StaleElementReferenceException):
+                return False
+            return text if text and "XXX" not in text else False
+
+        return self._until(driver, self.phone_timeout, revealed)
+
+
+def page_loaded(driver):
+    """True once the document has finished loading (False if the browser cannot tell)."""
+    try:
+        return driver.execute_script("return document.readyState") == "complete"
+    except WebDriverException:
+        return False
+
+
+def long_wait_strategy(name=LONG_NAME_TIMEOUT, description=LONG_DESCRIPTION_TIMEOUT, contact=LONG_CONTACT_TIMEOUT,
+                       phone=LONG_PHONE_TIMEOUT):
+    """Fixed, generous timeouts for the retry pass over pages whose fields timed out the first time."""
+    return WaitStrategy(fixed_timeout(name), fixed_timeout(description), fixed_timeout(contact), fixed_timeout(phone))
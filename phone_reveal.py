@@ -0,0 +1,147 @@
+from bs4 import BeautifulSoup
+from urllib.parse import urljoin
+import json
+import re
+import requests
+import threading
+
+# --- Configuration ---
+REQUEST_TIMEOUT = 15  # Seconds per reveal request
+FALLBACK_ALERT_AFTER = 20  # Fallbacks without a single HTTP reveal before warning that the request shape changed
+
+# Optional explicit endpoint, e.g. "/ajax/telefon.php?id={property_id}" (relative to the page URL).
+# When None, the endpoint is discovered from the "vezitel" button markup on every page. The discovery
+# has only been checked against the offline fixture, so pin this from a request captured in the
+# browser's network tab if the run logs fallbacks to Selenium on pages that do show a phone.
+PHONE_REVEAL_URL_TEMPLATE = None
+
+# Property id at the end of detail URLs, e.g. ".../apartament_riccardo-c121795.html" -> 121795
+PROPERTY_ID_PATTERN = re.compile(r'-c(\d+)\.html')
+# First quoted URL-like argument inside an onclick handler
+ONCLICK_URL_PATTERN = re.compile(r"""['"]((?:https?://|/)[^'"]+)['"]""")
+
+PHONE_KEYS = ('telnr', 'phone', 'phone_number', 'telefon', 'tel')
+OWNER_KEYS = ('owner_name', 'owner', 'nume', 'contact')  # Not 'name': that can be the property's name
+
+
+# --- Request Discovery ---
+
+def property_id_from_url(url):
+    """Returns the numeric property id from a detail URL, or None."""
+    match = PROPERTY_ID_PATTERN.search(url)
+    return match.group(1) if match else None
+
+
+def find_reveal_url(html, page_url):
+    """Finds the URL the "vezitel" button requests, from its data attributes, href or onclick handler."""
+    if PHONE_REVEAL_URL_TEMPLATE:
+        property_id = property_id_from_url(page_url)
+        if property_id:
+            return urljoin(page_url, PHONE_REVEAL_URL_TEMPLATE.format(property_id=property_id))
+
+    soup = BeautifulSoup(html, 'html.parser')
+    button = soup.select_one('div.phone.vezitel > a')
+    if not button:
+        return None
+
+    for attribute in ('data-url', 'data-href', 'data-ajax'):
+        if button.get(attribute):
+            return urljoin(page_url, button[attribute])
+
+    href = button.get('href', '')
+    if href and not href.startswith(('#', 'javascript:')):
+        return urljoin(page_url, href)
+
+    match = ONCLICK_URL_PATTERN.search(button.get('onclick', ''))
+    if match:
+        return urljoin(page_url, match.group(1))
+
+    return None
+
+
+# --- Response Parsing ---
+
+def _clean(value):
+    value = value.strip() if isinstance(value, str) else ''
+    return value if value and "XXX" not in value else None
+
+
+def parse_reveal_response(text):
+    """Extracts (phone_number, owner_name) from a JSON or HTML fragment response. Phone is None if still masked."""
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        payload = None
+
+    if isinstance(payload, dict):
+        phone = next((_clean(payload[key]) for key in PHONE_KEYS if _clean(payload.get(key))), None)
+        owner = next((_clean(payload[key]) for key in OWNER_KEYS if _clean(payload.get(key))), None)
+        # Some endpoints wrap the HTML fragment in JSON
+        if phone is None and isinstance(payload.get('html'), str):
+            return parse_reveal_response(payload['html'])
+        return phone, owner
+
+    soup = BeautifulSoup(text, 'html.parser')
+    phone_tag = soup.find(class_='telnr')
+    owner_tag = soup.select_one('.contact-info strong')
+    phone = _clean(phone_tag.get_text(strip=True)) if phone_tag else None
+    owner = _clean(owner_tag.get_text(strip=True)) if owner_tag else None
+    return phone, owner
+
+
+# --- Reveal Client ---
+
+class PhoneRevealClient:
+    """Reveals phone numbers by issuing the background request the "vezitel" button triggers.
+
+    Shares a pooled requests Session. `reveal()` returns None whenever the request shape is not
+    recognized or the number is still masked, so callers can fall back to Selenium. Every fallback
+    is logged with its reason, and once FALLBACK_ALERT_AFTER of them happen without a single HTTP
+    reveal a warning says the endpoint probably changed, so a silent fallback on every page shows.
+    """
+
+    def __init__(self, session=None, log=print):
+        self.session = session or requests.Session()
+        self.log = log
+        self.revealed = 0
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+
+    def _fall_back(self, page_url, reason):
+        with self._lock:
+            self.fallbacks += 1
+            alert = self.fallbacks == FALLBACK_ALERT_AFTER and self.revealed == 0
+        self.log(f"  -> ⚠️ Phone reveal over HTTP fell back to Selenium ({reason}): {page_url}")
+        if alert:
+            self.log(f"  -> ⚠️ {FALLBACK_ALERT_AFTER} phone reveals in a row needed Selenium: the reveal request "
+                     f"has probably changed. Pin it in phone_reveal.PHONE_REVEAL_URL_TEMPLATE.")
+        return None
+
+    def reveal(self, page_url, html=None):
+        """Returns {'phone_number': ..., 'owner_name': ...} or None if the browser fallback is needed."""
+        reveal_url = None
+        try:
+            if html is None:
+                response = self.session.get(page_url, timeout=REQUEST_TIMEOUT)
+                response.raise_for_status()
+                html = response.text
+
+            reveal_url = find_reveal_url(html, page_url)
+            if not reveal_url:
+                return self._fall_back(page_url, "no reveal button or URL on the page")
+
+            response = self.session.get(
+                reveal_url,
+                headers={'Referer': page_url, 'X-Requested-With': 'XMLHttpRequest'},
+                timeout=REQUEST_TIMEOUT,
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            return self._fall_back(page_url, f"{reveal_url or 'page'} request failed: {e}")
+
+        phone, owner = parse_reveal_response(response.text)
+        if not phone:
+            return self._fall_back(page_url, f"no unmasked number in the answer from {reveal_url}")
+        with self._lock:
+            self.revealed += 1
+        return {'phone_number': phone, 'owner_name': owner or 'N/A'}
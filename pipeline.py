@@ -0,0 +1,242 @@
+from anliza_date import CHART_WORKERS, GraphAggregates, iter_record_chunks, render_charts
+from checkpoint import CHECKPOINT_FILE, CheckpointWriter, archive_checkpoint, compact_checkpoint
+from contact_cache import ContactCache
+from driver_pool import DriverPool
+from every_page_scraper import (MAX_PAGES_PER_DRIVER, MAX_WORKERS, OUTPUT_FILE, load_finished, make_scrape_function,
+                                safe_print)
+from hotel_record import HotelRecord
+from http_cache import HttpCache
+from incremental import STATE_FILE, load_json, record_scraped, save_state
+from main_page_scraper import (MAX_CONCURRENT_REQUESTS, URL, create_session, discover_county_urls,
+                               iter_listing_hotels, iter_listing_pages, merge_listings, save_listings)
+from metrics import metrics
+from scheduler import AdaptiveScheduler, HostRateLimiter
+import argparse
+import queue
+import threading
+import time
+
+# --- Configuration ---
+URL_QUEUE_SIZE = 256  # Detail URLs parsed by Phase 1 and not yet taken by Phase 2
+RECORD_QUEUE_SIZE = 256  # Scraped records not yet folded into the analysis aggregates
+PIPELINE_CHUNK_ROWS = 50  # Records per aggregate update, small so Phase 3 keeps up with Phase 2
+POLL_SECONDS = 0.5  # How often a stage blocked on a queue checks whether another stage has failed
+
+_DONE = object()  # End-of-stream marker put on a queue when its producer stage stops
+
+
+def iter_queue(q, stop):
+    """Yields queue items until the producer's end marker, or until the queue is empty once `stop` is set."""
+    while True:
+        try:
+            item = q.get(timeout=POLL_SECONDS)
+        except queue.Empty:
+            if stop.is_set():
+                return
+            continue
+        if item is _DONE:
+            return
+        yield item
+
+
+def put(q, item, stop):
+    """Puts `item` on a bounded queue, giving up once `stop` is set and the queue stays full. Returns True if put."""
+    while True:
+        try:
+            q.put(item, timeout=POLL_SECONDS)
+            return True
+        except queue.Full:
+            if stop.is_set():
+                return False
+
+
+class Stage(threading.Thread):
+    """Runs one phase in its own thread and always ends its output queue, even when the phase fails.
+
+    A failure sets the shared `stop` event, so the other stages stop instead of waiting on a queue
+    nobody serves any more.
+    """
+
+    def __init__(self, name, work, output, stop):
+        super().__init__(name=name, daemon=True)
+        self.work = work
+        self.output = output
+        self.stop = stop
+        self.error = None
+        self.finished_at = None
+
+    def run(self):
+        try:
+            self.work()
+        except Exception as e:
+            self.error = e
+            self.stop.set()
+            safe_print(f"❌ {self.name} stopped: {e}")
+        finally:
+            self.finished_at = time.perf_counter()
+            put(self.output, _DONE, self.stop)
+
+
+def run_pipeline(listing_urls, scrape, scheduler, session=None, cache=None, checkpoint=None,
+                 max_workers=MAX_CONCURRENT_REQUESTS, follow_pagination=True, chunk_rows=PIPELINE_CHUNK_ROWS,
+                 url_queue_size=URL_QUEUE_SIZE, record_queue_size=RECORD_QUEUE_SIZE, finished=None):
+    """Runs Phase 1, Phase 2 and the Phase 3 aggregation concurrently, connected by bounded queues.
+
+    Phase 1 puts each new details_url on the URL queue as soon as its li.liste-unitate is parsed;
+    Phase 2 scrapes them on `scheduler` with `scrape` (which takes a (url, total, index) tuple)
+    and appends every record to `checkpoint`; Phase 3 folds the records into GraphAggregates as
+    they arrive. A full queue blocks its producer, so memory stays bounded whichever stage is slowest.
+    When a stage fails, the others stop at their next queue operation and the run returns early.
+    URLs in `finished` ({url: record}, e.g. from load_finished) are not scraped again; their
+    records go straight to Phase 3.
+
+    Returns a dict with the merged index ('hotels', in the order crawl_listings returns), the
+    'aggregates', the URLs scraped with a property name ('scraped'), the number of records taken
+    from `finished` ('resumed'), per-stage finish times in
+    seconds from the start ('timings') and the stage errors ('errors').
+    """
+    urls = queue.Queue(maxsize=url_queue_size)
+    records = queue.Queue(maxsize=record_queue_size)
+    pages = {}  # (listing index, page number) -> hotel_data list, for the final index order
+    scraped = []
+    resumed = []
+    finished = finished or {}
+    stop = threading.Event()
+    start = time.perf_counter()
+
+    def phase1():
+        queued = set()
+        for key, page_url, items in iter_listing_pages(listing_urls, session, max_workers, follow_pagination, cache):
+            hotels = pages[key] = []
+            for hotel in iter_listing_hotels(items):
+                hotels.append(hotel)
+                details_url = hotel['details_url']
+                if details_url != "N/A" and details_url not in queued:
+                    queued.add(details_url)
+                    if details_url in finished:
+                        # Scraped by an earlier run: Phase 3 still needs the record, Phase 2 does not
+                        resumed.append(details_url)
+                        if not put(records, finished[details_url].to_dict(), stop):
+                            return
+                    elif not put(urls, details_url, stop):  # Blocks while Phase 2 is URL_QUEUE_SIZE behind
+                        return
+            safe_print(f"  -> ✅ {page_url}: {len(hotels)} listings")
+
+    def phase2():
+        tasks = ((url, "?", position) for position, url in enumerate(iter_queue(urls, stop), 1))
+        for result in scheduler.map_unordered(scrape, tasks):
+            if result is None:
+                continue
+            if checkpoint is not None:
+                checkpoint.append(result)
+            if result['property_name'] != 'N/A':
+                scraped.append(result['url'])
+            if not put(records, result, stop):
+                return
+
+    stages = [Stage("Phase 1 (listings)", phase1, urls, stop), Stage("Phase 2 (deep scrape)", phase2, records, stop)]
+    for stage in stages:
+        stage.start()
+
+    # Phase 3 runs here, consuming records while the other two stages are still producing them
+    aggregates = GraphAggregates()
+    try:
+        for chunk in iter_record_chunks(iter_queue(records, stop), chunk_rows):
+            aggregates.update(chunk)
+    except BaseException:
+        stop.set()  # Let Phase 1 and 2 give up on their queues before the joins below
+        raise
+    finally:
+        phase3_finished_at = time.perf_counter()
+        for stage in stages:
+            stage.join()
+
+    return {
+        'hotels': merge_listings(pages[key] for key in sorted(pages)),
+        'aggregates': aggregates,
+        'scraped': scraped,
+        'resumed': len(resumed),
+        'timings': {
+            'phase1': stages[0].finished_at - start,
+            'phase2': stages[1].finished_at - start,
+            'phase3': phase3_finished_at - start,
+        },
+        'errors': [stage.error for stage in stages if stage.error is not None],
+    }
+
+
+# --- Main Execution ---
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run Phase 1, 2 and 3 as one streaming pipeline.")
+    parser.add_argument('--all-counties', action='store_true', help="crawl every county index, not only URL")
+    parser.add_argument('--no-pagination', action='store_true', help="only fetch the first listing page")
+    parser.add_argument('--concurrency', type=int, default=MAX_CONCURRENT_REQUESTS,
+                        help="concurrent listing page requests (Phase 1)")
+    parser.add_argument('--no-cache', action='store_true', help="bypass the on-disk HTTP cache in Phase 1")
+    parser.add_argument('--queue-size', type=int, default=URL_QUEUE_SIZE, help="bound of both stage queues")
+    parser.add_argument('--chunk-rows', type=int, default=PIPELINE_CHUNK_ROWS)
+    parser.add_argument('--workers', type=int, default=CHART_WORKERS, help="chart rendering processes")
+    parser.add_argument('--no-chart-cache', action='store_true', help="redraw every chart")
+    parser.add_argument('--fresh', action='store_true',
+                        help=f"archive {CHECKPOINT_FILE} and scrape every URL instead of resuming")
+    args = parser.parse_args()
+
+    session = create_session(pool_size=args.concurrency)
+    cache = None if args.no_cache else HttpCache()
+    listing_urls = [URL]
+    if args.all_counties:
+        print("Discovering county index pages...")
+        listing_urls = discover_county_urls(session) or listing_urls
+    if args.fresh and archive_checkpoint(CHECKPOINT_FILE):
+        print("🗄️ Archived the previous checkpoint; scraping from scratch.")
+    finished = load_finished(CHECKPOINT_FILE)
+    if finished:
+        print(f"♻️ Resuming from {CHECKPOINT_FILE}: {len(finished)} detail pages already scraped.")
+    metrics.reset()
+    print(f"🚰 Streaming {len(listing_urls)} listing index page(s) through Phase 1 -> 2 -> 3 "
+          f"(queues of {args.queue_size})...")
+
+    rate_limiter = HostRateLimiter()  # Shared by the HTTP session, the browsers and the scheduler
+    with DriverPool(size=MAX_WORKERS, max_pages=MAX_PAGES_PER_DRIVER, rate_limiter=rate_limiter) as pool, \
+            CheckpointWriter(CHECKPOINT_FILE) as checkpoint, ContactCache() as contact_cache:
+        scrape, worker_count = make_scrape_function(pool, contact_cache, rate_limiter)
+        scheduler = AdaptiveScheduler(initial_concurrency=MAX_WORKERS, max_concurrency=worker_count, log=safe_print,
+                                      rate_limiter=rate_limiter)
+        result = run_pipeline(listing_urls, scrape, scheduler, session=session, cache=cache, checkpoint=checkpoint,
+                              max_workers=args.concurrency, follow_pagination=not args.no_pagination,
+                              chunk_rows=args.chunk_rows, url_queue_size=args.queue_size,
+                              record_queue_size=args.queue_size, finished=finished)
+        safe_print(scheduler.summary())
+
+    hotels = result['hotels']
+    if hotels:
+        state = load_json(STATE_FILE, {})
+        hotels_by_url = {hotel['details_url']: hotel for hotel in hotels}
+        for url in result['scraped']:
+            if url in hotels_by_url:
+                record_scraped(state, hotels_by_url[url])
+        save_state(state, STATE_FILE)
+    if hotels and not result['errors']:
+        # Only a complete index may replace the saved one and decide which records the output keeps
+        save_listings(hotels)
+        written = compact_checkpoint(OUTPUT_FILE, CHECKPOINT_FILE, url_order=[hotel['details_url'] for hotel in hotels],
+                                     factory=HotelRecord.from_dict, merge=True)
+        safe_print(f"✅ {len(hotels)} listings saved, {written} detail records compacted into {OUTPUT_FILE} "
+                   f"({result['resumed']} resumed from the checkpoint)")
+        # Complete run: the next one starts a new checkpoint instead of resuming this one
+        archive_checkpoint(CHECKPOINT_FILE)
+
+    timings = result['timings']
+    safe_print(f"\n⏱️ Phase 1 done at {timings['phase1']:.1f}s, Phase 2 at {timings['phase2']:.1f}s, "
+               f"Phase 3 aggregates at {timings['phase3']:.1f}s.")
+    safe_print(metrics.summary())
+    metrics.close()
+
+    aggregates = result['aggregates']
+    if aggregates.rows:
+        render_charts(aggregates.charts(), workers=args.workers, use_cache=not args.no_chart_cache)
+        print(f"\n✅ Pipeline complete: 8 graphs drawn from {aggregates.rows} records.")
+    if result['errors']:
+        print(f"⚠️ Some stages stopped early, so the index and {OUTPUT_FILE} were left as they were. "
+              f"Rerun to complete: pages already scraped are resumed from {CHECKPOINT_FILE}.")
@@ -0,0 +1,240 @@
+from selenium.common.exceptions import WebDriverException
+from urllib.parse import urlsplit
+import concurrent.futures
+import random
+import requests
+import threading
+import time
+
+# --- Configuration ---
+MIN_CONCURRENCY = 1
+INITIAL_CONCURRENCY = 4
+MAX_CONCURRENCY = 16
+REQUESTS_PER_SECOND_PER_HOST = 4.0  # Token bucket refill rate
+BURST_PER_HOST = 8  # Token bucket capacity
+TARGET_LATENCY = 5.0  # Seconds; tasks slower than this and than SLOW_FACTOR x the usual latency signal congestion
+SLOW_FACTOR = 3.0  # A task counts as slow only when it also takes this many times the baseline latency
+BASELINE_ALPHA = 0.1  # Weight of each finished task in the baseline latency (exponential moving average)
+DECREASE_FACTOR = 0.5  # Multiplicative decrease on errors, timeouts or slow tasks
+DECREASE_COOLDOWN = 5.0  # Seconds between two decreases, so one burst of failures halves only once
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0  # Seconds; retry n waits about BACKOFF_BASE * 2**n, with jitter
+BACKOFF_CAP = 30.0
+
+
+# --- Transient Failure Detection ---
+
+def is_transient_error(error):
+    """True for errors worth retrying: timeouts, connection errors, 429/5xx responses and driver failures."""
+    if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, WebDriverException)
+
+
+def is_dead_page(error):
+    """True for a 4xx response other than 408/429: the page is gone or forbidden, and no retry or browser helps."""
+    if not isinstance(error, requests.exceptions.HTTPError) or error.response is None:
+        return False
+    return 400 <= error.response.status_code < 500 and error.response.status_code not in (408, 429)
+
+
+def missing_property_name(result):
+    """Default result check: a record without a property name means the name span never appeared."""
+    return isinstance(result, dict) and result.get('property_name', 'N/A') == 'N/A'
+
+
+def backoff_delay(attempt):
+    """Jittered exponential backoff for retry number `attempt` (0-based)."""
+    return min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+
+# --- Per-Host Rate Limiting ---
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, at most `capacity` banked."""
+
+    def __init__(self, rate=REQUESTS_PER_SECOND_PER_HOST, capacity=BURST_PER_HOST):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        """Blocks until a token is available and consumes it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostRateLimiter:
+    """One TokenBucket per host, shared by everything that sends requests to that host.
+
+    take(url) is called before every request (the HTTP session adapter and the browser page loads
+    do it), so a task that makes several requests pays for each of them. The time each thread spends
+    waiting is summed in waited(), so the scheduler can leave it out of task latency.
+    """
+
+    def __init__(self, rate=REQUESTS_PER_SECOND_PER_HOST, capacity=BURST_PER_HOST):
+        self.rate = rate
+        self.capacity = capacity
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def take(self, url):
+        """Blocks until the host of `url` has a token and consumes it."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.capacity)
+            bucket = self._buckets[host]
+        start = time.monotonic()
+        bucket.take()
+        self._local.waited = self.waited() + time.monotonic() - start
+
+    def waited(self):
+        """Seconds the calling thread has spent waiting for tokens so far."""
+        return getattr(self._local, 'waited', 0.0)
+
+
+# --- Adaptive Scheduler ---
+
+class AdaptiveScheduler:
+    """Runs tasks on a thread pool with an AIMD concurrency limit, per-host rate limiting and retries.
+
+    The limit grows by one after a full "window" of healthy tasks (additive increase) and is cut by
+    DECREASE_FACTOR after an error, timeout or a slow task (multiplicative decrease). A task is slow
+    when it takes longer than `target_latency` and SLOW_FACTOR times the moving-average latency of
+    the run, so steady waits inside the task (e.g. for a pooled browser) do not read as congestion.
+    The tasks take their per-host tokens themselves, one per request, from `rate_limiter` (pass the
+    same HostRateLimiter to create_session and the DriverPool); the rate limit's own waits never
+    count as latency. Transient failures are retried with jittered exponential backoff.
+    """
+
+    def __init__(self, min_concurrency=MIN_CONCURRENCY, initial_concurrency=INITIAL_CONCURRENCY,
+                 max_concurrency=MAX_CONCURRENCY, rate_per_host=REQUESTS_PER_SECOND_PER_HOST,
+                 burst_per_host=BURST_PER_HOST, target_latency=TARGET_LATENCY, max_retries=MAX_RETRIES,
+                 is_failure=missing_property_name, log=print, rate_limiter=None):
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter or HostRateLimiter(rate_per_host, burst_per_host)
+        self.target_latency = target_latency
+        self.max_retries = max_retries
+        self.is_failure = is_failure
+        self.log = log
+
+        self.limit = float(max(min_concurrency, min(initial_concurrency, max_concurrency)))
+        self.active = 0
+        self.retries = 0
+        self.failures = 0
+        self.baseline_latency = None
+        self._healthy_streak = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    # --- Concurrency Limit ---
+
+    def _acquire_slot(self):
+        with self._condition:
+            while self.active >= int(self.limit):
+                self._condition.wait()
+            self.active += 1
+
+    def _release_slot(self, healthy):
+        with self._condition:
+            self.active -= 1
+            if healthy:
+                self._healthy_streak += 1
+                if self._healthy_streak >= int(self.limit) and self.limit < self.max_concurrency:
+                    self.limit += 1
+                    self._healthy_streak = 0
+            else:
+                self._healthy_streak = 0
+                now = time.monotonic()
+                if now - self._last_decrease >= DECREASE_COOLDOWN:
+                    old_limit = int(self.limit)
+                    self.limit = max(self.min_concurrency, self.limit * DECREASE_FACTOR)
+                    self._last_decrease = now
+                    if int(self.limit) != old_limit:
+                        self.log(f"  -> ⚠️ Backing off: concurrency {old_limit} -> {int(self.limit)}")
+            self._condition.notify_all()
+
+    def _is_slow(self, latency):
+        """Compares `latency` with the targets, then folds it into the baseline."""
+        with self._condition:
+            baseline = self.baseline_latency
+            slow = latency > self.target_latency and (baseline is None or latency > baseline * SLOW_FACTOR)
+            self.baseline_latency = latency if baseline is None else baseline + BASELINE_ALPHA * (latency - baseline)
+        return slow
+
+    # --- Task Execution ---
+
+    def _run_task(self, func, item):
+        for attempt in range(self.max_retries + 1):
+            self._acquire_slot()
+            waited = self.rate_limiter.waited()
+            start = time.monotonic()
+            error, result = None, None
+            try:
+                result = func(item)
+            except Exception as e:
+                error = e
+            latency = time.monotonic() - start - (self.rate_limiter.waited() - waited)
+
+            failed = (error is not None and is_transient_error(error)) or (error is None and self.is_failure(result))
+            self._release_slot(healthy=not failed and not self._is_slow(latency))
+
+            if error is not None and not is_transient_error(error):
+                break
+            if not failed:
+                return result
+            if attempt < self.max_retries:
+                with self._condition:
+                    self.retries += 1
+                time.sleep(backoff_delay(attempt))
+
+        with self._condition:
+            self.failures += 1
+        if error is not None:
+            # One bad item must not stop the run: it is reported as failed and yields None
+            self.log(f"  -> ❌ Giving up on {item[0] if isinstance(item, tuple) else item}: {error!r}")
+            return None
+        return result
+
+    def map_unordered(self, func, items):
+        """Yields func(item) for every item as tasks complete (with retries applied).
+
+        An item whose task still raises after its retries, or raises a non-transient error (e.g. a
+        dead page, see is_dead_page), yields None and counts in `failures`; it never ends the iteration.
+
+        `items` is consumed lazily, at most 2 * max_concurrency ahead of the finished tasks, so it
+        can be a generator fed by another stage (the pipeline's URL queue).
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            pending = set()
+            for item in items:
+                if len(pending) >= self.max_concurrency * 2:
+                    done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                pending.add(executor.submit(self._run_task, func, item))
+                done = {future for future in pending if future.done()}
+                pending -= done
+                for future in done:
+                    yield future.result()
+            for future in concurrent.futures.as_completed(pending):
+                yield future.result()
+
+    def summary(self):
+        return (f"Scheduler: final concurrency {int(self.limit)}, {self.retries} retries, "
+                f"{self.failures} tasks still failing after {self.max_retries} retries")
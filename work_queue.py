@@ -0,0 +1,380 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+import argparse
+import hmac
+import json
+import os
+import requests
+import socket
+import sqlite3
+import threading
+import time
+
+# --- Configuration ---
+# The queue's store. Worker processes on the machine that holds it can open it directly; keep it on a
+# local disk, since SQLite's WAL mode needs shared memory and does not work over network filesystems.
+# Workers on other machines reach it through `python work_queue.py serve` (QueueServer) instead.
+QUEUE_FILE = "scrape_queue.sqlite3"
+LEASE_SECONDS = 300  # A claimed batch returns to the queue if its worker stops heartbeating for this long
+MAX_ATTEMPTS = 3  # A URL whose lease expires or fails this many times is marked failed
+BUSY_TIMEOUT_MS = 30000
+SERVE_HOST = "127.0.0.1"  # Pass --host 0.0.0.0 to `serve` so workers on other machines can connect
+SERVE_PORT = 8765
+QUEUE_TOKEN = os.environ.get("SCRAPE_QUEUE_TOKEN")  # Shared secret between the queue server and its workers
+REMOTE_TIMEOUT = 30  # Seconds per queue server request
+REMOTE_ATTEMPTS = 3  # Tries for the queue calls that are safe to repeat (everything but claim)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    url TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS tasks_status_position ON tasks (status, position);
+"""
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+    """Durable SQLite work queue with lease/heartbeat semantics for the deep scrape.
+
+    Workers claim batches of URLs under a lease, extend it with heartbeats while they work and
+    report each result. Leases that expire (crashed or killed worker) are re-queued, so any
+    number of workers can share one queue without scraping a URL twice. Processes on the machine
+    holding the file use it directly; other machines go through QueueServer and RemoteWorkQueue.
+    """
+
+    def __init__(self, path=QUEUE_FILE, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connection(self):
+        """One connection per thread (heartbeats run on their own thread)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self, statements):
+        """Runs `statements(conn)` inside BEGIN IMMEDIATE so concurrent claimers never see the same rows."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = statements(conn)
+            conn.execute("COMMIT")
+            return result
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    # --- Producer Side ---
+
+    def enqueue(self, urls):
+        """Adds URLs (ignoring ones already queued, in any state). Returns how many were new."""
+        def insert(conn):
+            start = conn.execute("SELECT COALESCE(MAX(position), 0) FROM tasks").fetchone()[0]
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO tasks (url, position, updated_at) VALUES (?, ?, ?)",
+                [(url, start + i + 1, time.time()) for i, url in enumerate(urls)],
+            )
+            return conn.total_changes - before
+        return self._transaction(insert)
+
+    # --- Worker Side ---
+
+    def _requeue_expired(self, conn, now):
+        conn.execute(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "worker = NULL, lease_expires = NULL, error = 'lease expired', updated_at = ? "
+            "WHERE status = 'leased' AND lease_expires < ?",
+            (self.max_attempts, now, now),
+        )
+
+    def claim(self, worker_id, batch_size):
+        """Leases up to `batch_size` pending URLs to `worker_id`. Returns [(url, position), ...]."""
+        def lease(conn):
+            now = time.time()
+            self._requeue_expired(conn, now)
+            rows = conn.execute(
+                "SELECT url, position FROM tasks WHERE status = 'pending' ORDER BY position LIMIT ?",
+                (batch_size,),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE tasks SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE url = ?",
+                [(worker_id, now + self.lease_seconds, now, url) for url, _ in rows],
+            )
+            return rows
+        return self._transaction(lease)
+
+    def heartbeat(self, worker_id):
+        """Extends every lease held by `worker_id`."""
+        now = time.time()
+        self._connection().execute(
+            "UPDATE tasks SET lease_expires = ? WHERE status = 'leased' AND worker = ?",
+            (now + self.lease_seconds, worker_id),
+        )
+
+    def complete(self, worker_id, url, result):
+        """Stores a result. Ignored if the lease was lost and the URL already completed elsewhere."""
+        self._connection().execute(
+            "UPDATE tasks SET status = 'done', result = ?, error = NULL, worker = ?, lease_expires = NULL, "
+            "updated_at = ? WHERE url = ? AND status != 'done'",
+            (json.dumps(result, ensure_ascii=False), worker_id, time.time(), url),
+        )
+
+    def fail(self, worker_id, url, error):
+        """Returns a URL to the queue after an error, or marks it failed after MAX_ATTEMPTS."""
+        self._connection().execute(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "worker = NULL, lease_expires = NULL, error = ?, updated_at = ? "
+            "WHERE url = ? AND status = 'leased' AND worker = ?",
+            (self.max_attempts, str(error), time.time(), url, worker_id),
+        )
+
+    # --- Reporting ---
+
+    def counts(self):
+        rows = self._connection().execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        counts.update(dict(rows))
+        return counts
+
+    def results(self):
+        """Yields completed records in enqueue order."""
+        for (result,) in self._connection().execute(
+                "SELECT result FROM tasks WHERE status = 'done' ORDER BY position"):
+            yield json.loads(result)
+
+
+class Heartbeat:
+    """Background thread that keeps a worker's leases alive while it scrapes a batch."""
+
+    def __init__(self, queue, worker_id, interval=None):
+        self.queue = queue
+        self.worker_id = worker_id
+        self.interval = interval or max(1.0, queue.lease_seconds / 3)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.queue.heartbeat(self.worker_id)
+            except Exception as e:
+                # A missed beat is harmless while the lease lasts; the next one may get through
+                print(f"  -> ⚠️ Heartbeat for {self.worker_id} failed: {e}")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        self._thread.join()
+
+
+# --- Network Access (workers on other machines) ---
+
+class QueueServer:
+    """Serves a WorkQueue over HTTP/JSON, so workers on any machine can share it through RemoteWorkQueue.
+
+    The SQLite file stays on this machine's local disk and lease expiry uses this machine's clock
+    only. With a `token`, every request must carry it as "Authorization: Bearer <token>".
+    """
+
+    def __init__(self, queue, host=SERVE_HOST, port=SERVE_PORT, token=QUEUE_TOKEN):
+        self.queue = queue
+        self.token = token
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        server, queue = self, self.queue
+        routes = {
+            ('GET', '/info'): lambda body: {'lease_seconds': queue.lease_seconds, 'max_attempts': queue.max_attempts},
+            ('GET', '/counts'): lambda body: queue.counts(),
+            ('POST', '/enqueue'): lambda body: {'added': queue.enqueue(body['urls'])},
+            ('POST', '/claim'): lambda body: {'tasks': queue.claim(body['worker'], int(body['batch_size']))},
+            ('POST', '/heartbeat'): lambda body: queue.heartbeat(body['worker']) or {},
+            ('POST', '/complete'): lambda body: queue.complete(body['worker'], body['url'], body['result']) or {},
+            ('POST', '/fail'): lambda body: queue.fail(body['worker'], body['url'], body['error']) or {},
+        }
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, status, payload):
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _dispatch(self, method):
+                expected = f"Bearer {server.token}" if server.token else None
+                if expected and not hmac.compare_digest(self.headers.get('Authorization', ''), expected):
+                    return self._reply(401, {'error': "missing or wrong queue token"})
+                path = urlsplit(self.path).path
+                if (method, path) == ('GET', '/results'):
+                    # One JSON record per line, streamed until the connection closes
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.end_headers()
+                    for record in queue.results():
+                        self.wfile.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b"\n")
+                    return
+                route = routes.get((method, path))
+                if route is None:
+                    return self._reply(404, {'error': f"unknown endpoint {method} {path}"})
+                try:
+                    body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b"{}")
+                    payload = route(body)
+                except (ValueError, KeyError, TypeError) as e:
+                    return self._reply(400, {'error': f"bad request: {e!r}"})
+                except sqlite3.Error as e:
+                    return self._reply(503, {'error': f"queue store: {e}"})
+                self._reply(200, payload)
+
+            def do_GET(self):
+                self._dispatch('GET')
+
+            def do_POST(self):
+                self._dispatch('POST')
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+class RemoteWorkQueue:
+    """WorkQueue interface for a queue served by QueueServer (`python work_queue.py serve`).
+
+    Connection errors and timeouts are retried for every call except claim: a claim whose answer
+    was lost may already have leased rows, which simply expire and return to the queue.
+    """
+
+    def __init__(self, url, token=QUEUE_TOKEN, timeout=REMOTE_TIMEOUT):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        if token:
+            self.session.headers['Authorization'] = f"Bearer {token}"
+        info = self._call('GET', 'info')
+        self.lease_seconds = info['lease_seconds']
+        self.max_attempts = info['max_attempts']
+
+    def _call(self, method, endpoint, payload=None, attempts=REMOTE_ATTEMPTS, stream=False):
+        for attempt in range(attempts):
+            try:
+                response = self.session.request(method, f"{self.url}/{endpoint}", json=payload,
+                                                timeout=self.timeout, stream=stream)
+                response.raise_for_status()
+                return response if stream else response.json()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt + 1 >= attempts:
+                    raise
+                time.sleep(2 ** attempt)
+
+    def enqueue(self, urls):
+        return self._call('POST', 'enqueue', {'urls': list(urls)})['added']
+
+    def claim(self, worker_id, batch_size):
+        tasks = self._call('POST', 'claim', {'worker': worker_id, 'batch_size': batch_size}, attempts=1)['tasks']
+        return [(url, position) for url, position in tasks]
+
+    def heartbeat(self, worker_id):
+        self._call('POST', 'heartbeat', {'worker': worker_id})
+
+    def complete(self, worker_id, url, result):
+        self._call('POST', 'complete', {'worker': worker_id, 'url': url, 'result': result})
+
+    def fail(self, worker_id, url, error):
+        self._call('POST', 'fail', {'worker': worker_id, 'url': url, 'error': str(error)})
+
+    def counts(self):
+        return self._call('GET', 'counts')
+
+    def results(self):
+        for line in self._call('GET', 'results', stream=True).iter_lines():
+            if line:
+                yield json.loads(line)
+
+
+def open_queue(location=QUEUE_FILE):
+    """WorkQueue for a file path, RemoteWorkQueue for an http(s):// queue server URL."""
+    if location.startswith(('http://', 'https://')):
+        return RemoteWorkQueue(location)
+    return WorkQueue(location)
+
+
+# --- Command Line (serve, status and export) ---
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve, inspect or export the shared deep scrape queue.")
+    parser.add_argument('command', choices=['serve', 'status', 'export'])
+    parser.add_argument('--queue', default=QUEUE_FILE,
+                        help="queue file, or the http:// URL of a queue server (status and export)")
+    parser.add_argument('--output', default="hotel_full_details.json")
+    parser.add_argument('--host', default=SERVE_HOST, help="address to serve on (0.0.0.0 for other machines)")
+    parser.add_argument('--port', type=int, default=SERVE_PORT)
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        server = QueueServer(WorkQueue(args.queue), args.host, args.port)
+        print(f"🛰️ Serving {args.queue} at {server.url}{' (token required)' if server.token else ''}. "
+              f"Workers join with: python every_page_scraper.py --worker --queue http://<this machine>:{args.port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("Queue server stopped.")
+        raise SystemExit(0)
+
+    queue = open_queue(args.queue)
+    if args.command == 'status':
+        print(" | ".join(f"{status}: {count}" for status, count in queue.counts().items()))
+    else:
+        records = list(queue.results())
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False, indent=4)
+        print(f"✅ {len(records)} results exported to {args.output}")